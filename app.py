@@ -7,6 +7,9 @@ from routes.worker import worker_bp
 from routes.process import process_bp
 from routes.spec_model import spec_model_bp
 from routes.wagelog import wagelog_bp
+from routes.payroll import payroll_bp
+from routes.analytics import analytics_bp
+from routes.ref_merge import ref_merge_bp
 from routes.company_ledger.company import company_bp
 from routes.company_ledger.customer import customer_bp
 from routes.company_ledger.customer_account import customer_account_bp
@@ -16,8 +19,10 @@ from routes.company_ledger.transaction_routes import transaction_bp
 from routes.inventory.inventoryApi import inventory_bp
 
 from models import User
+from utils.token_cache import token_cache, CurrentUser
 import exModels
 import jwt
+from sqlalchemy.orm import joinedload
 
 app = Flask(__name__)
 CORS(app)
@@ -34,6 +39,9 @@ app.register_blueprint(worker_bp, url_prefix="/api/workers")
 app.register_blueprint(process_bp, url_prefix='/api/processes')
 app.register_blueprint(spec_model_bp, url_prefix='/api/specmodels')
 app.register_blueprint(wagelog_bp, url_prefix='/api/wage_logs')
+app.register_blueprint(payroll_bp, url_prefix='/api/payroll')
+app.register_blueprint(analytics_bp, url_prefix='/api/analytics')
+app.register_blueprint(ref_merge_bp, url_prefix='/api/ref_merges')
 app.register_blueprint(company_bp, url_prefix='/api/company')
 app.register_blueprint(customer_bp, url_prefix='/api/customer')
 app.register_blueprint(customer_account_bp, url_prefix='/api/customer_account')
@@ -59,6 +67,12 @@ def load_current_user():
     else:
         token = auth_header
 
+    # 先查进程内缓存，命中就不用再查 users 表
+    cached = token_cache.get(token)
+    if cached is not None:
+        g.current_user = cached
+        return
+
     try:
         data = jwt.decode(
             token,
@@ -67,7 +81,8 @@ def load_current_user():
         )
 
         #user = User.query.get(data.get('user_id'))
-        user = db.session.get(User, data.get('user_id'))
+        # 角色随用户一起查出来（一次 JOIN），之后由 token 缓存带着走
+        user = db.session.get(User, data.get('user_id'), options=[joinedload(User.roles)])
 
         if not user:
             return
@@ -76,7 +91,10 @@ def load_current_user():
         if user.last_login_token != token:
             return
 
-        g.current_user = user
+        role_names = [r.name for r in user.roles]
+        token_cache.set(token, user, role_names, exp=data.get('exp'))
+
+        g.current_user = CurrentUser(user.id, user.username, user.company_id, role_names, user=user)
         # print('当前用户:', user.username)
 
     except jwt.ExpiredSignatureError:
@@ -0,0 +1,38 @@
+"""工序和规格型号停用标记
+
+Revision ID: 01e099ea482b
+Revises: 6febb91fc575
+Create Date: 2026-10-17 18:02:37.415826
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '01e099ea482b'
+down_revision = '6febb91fc575'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('processes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('is_active', sa.Boolean(), server_default=sa.true(), nullable=False))
+
+    with op.batch_alter_table('spec_models', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('is_active', sa.Boolean(), server_default=sa.true(), nullable=False))
+
+    with op.batch_alter_table('wage_logs_archive', schema=None) as batch_op:
+        batch_op.create_index('ix_wage_logs_archive_spec', ['spec_model_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('wage_logs_archive', schema=None) as batch_op:
+        batch_op.drop_index('ix_wage_logs_archive_spec')
+
+    with op.batch_alter_table('spec_models', schema=None) as batch_op:
+        batch_op.drop_column('is_active')
+
+    with op.batch_alter_table('processes', schema=None) as batch_op:
+        batch_op.drop_column('is_active')
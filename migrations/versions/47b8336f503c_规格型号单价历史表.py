@@ -0,0 +1,46 @@
+"""规格型号单价历史表
+
+Revision ID: 47b8336f503c
+Revises: 8abe29cf1b43
+Create Date: 2026-10-17 14:26:09.731204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '47b8336f503c'
+down_revision = '8abe29cf1b43'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('spec_model_prices',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('spec_model_id', sa.Integer(), nullable=False),
+    sa.Column('price', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('effective_from', sa.Date(), nullable=True),
+    sa.Column('effective_to', sa.Date(), nullable=True),
+    sa.Column('remark', sa.String(length=100), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['spec_model_id'], ['spec_models.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('spec_model_prices', schema=None) as batch_op:
+        batch_op.create_index('ix_spec_model_prices_spec_from', ['spec_model_id', 'effective_from'], unique=False)
+
+    # 现有规格型号的当前单价作为“最早以来”生效的单价
+    op.execute(
+        'INSERT INTO spec_model_prices (spec_model_id, price, effective_from, effective_to, created_at, updated_at) '
+        'SELECT id, price, NULL, NULL, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP FROM spec_models'
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('spec_model_prices', schema=None) as batch_op:
+        batch_op.drop_index('ix_spec_model_prices_spec_from')
+
+    op.drop_table('spec_model_prices')
@@ -0,0 +1,48 @@
+"""工序和规格型号合并记录表
+
+Revision ID: 5e3fe3f1b852
+Revises: 01e099ea482b
+Create Date: 2026-10-17 18:41:09.562317
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e3fe3f1b852'
+down_revision = '01e099ea482b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('ref_merges',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('source_id', sa.Integer(), nullable=False),
+    sa.Column('target_id', sa.Integer(), nullable=False),
+    sa.Column('source_name', sa.String(length=50), nullable=True),
+    sa.Column('target_name', sa.String(length=50), nullable=True),
+    sa.Column('status', sa.Enum('合并中', '已合并', '撤销中', '已撤销', name='ref_merge_status'), nullable=False),
+    sa.Column('row_count', sa.Integer(), nullable=False),
+    sa.Column('merged_at', sa.DateTime(), nullable=True),
+    sa.Column('merged_by', sa.Integer(), nullable=True),
+    sa.Column('undone_at', sa.DateTime(), nullable=True),
+    sa.Column('undone_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('ref_merge_rows',
+    sa.Column('merge_id', sa.Integer(), nullable=False),
+    sa.Column('table_name', sa.String(length=30), nullable=False),
+    sa.Column('row_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['merge_id'], ['ref_merges.id'], ),
+    sa.PrimaryKeyConstraint('merge_id', 'table_name', 'row_id')
+    )
+
+
+def downgrade():
+    op.drop_table('ref_merge_rows')
+    op.drop_table('ref_merges')
@@ -0,0 +1,28 @@
+"""库存规格树缓存版本号
+
+Revision ID: 666d5f321df1
+Revises: 5e3fe3f1b852
+Create Date: 2026-10-17 19:20:48.903511
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '666d5f321df1'
+down_revision = '5e3fe3f1b852'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    cache_versions = sa.table('cache_versions',
+    sa.column('name', sa.String(length=50)),
+    sa.column('version', sa.BigInteger())
+    )
+    op.bulk_insert(cache_versions, [{'name': 'inventory_spec', 'version': 1}])
+
+
+def downgrade():
+    op.execute("DELETE FROM cache_versions WHERE name = 'inventory_spec'")
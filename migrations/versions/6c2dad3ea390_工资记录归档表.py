@@ -0,0 +1,56 @@
+"""工资记录归档表
+
+Revision ID: 6c2dad3ea390
+Revises: fa57bb68e977
+Create Date: 2026-10-17 16:20:37.904512
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6c2dad3ea390'
+down_revision = 'fa57bb68e977'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 只建表；已有数据在对应月份结账后用 scripts/archive_wage_logs.py 分块搬过来
+    op.create_table('wage_logs_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('is_special', sa.Boolean(), nullable=True),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('actual_price', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('total_wage', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('actual_group_size', sa.Integer(), nullable=False),
+    sa.Column('remark', sa.String(length=100), nullable=True),
+    sa.Column('worker_id', sa.Integer(), nullable=False),
+    sa.Column('process_id', sa.Integer(), nullable=False),
+    sa.Column('spec_model_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('wage_logs_archive', schema=None) as batch_op:
+        batch_op.create_index('ix_wage_logs_archive_date', ['date'], unique=False)
+        batch_op.create_index('ix_wage_logs_archive_worker_date', ['worker_id', 'date'], unique=False)
+        batch_op.create_index('ix_wage_logs_archive_process_date_spec', ['process_id', 'date', 'spec_model_id'], unique=False)
+
+
+def downgrade():
+    # 降级前先把归档数据搬回 wage_logs，否则会丢数据
+    op.execute(
+        'INSERT INTO wage_logs (id, is_special, date, actual_price, quantity, total_wage, actual_group_size, '
+        'remark, worker_id, process_id, spec_model_id, created_at, updated_at) '
+        'SELECT id, is_special, date, actual_price, quantity, total_wage, actual_group_size, '
+        'remark, worker_id, process_id, spec_model_id, created_at, updated_at FROM wage_logs_archive'
+    )
+    with op.batch_alter_table('wage_logs_archive', schema=None) as batch_op:
+        batch_op.drop_index('ix_wage_logs_archive_process_date_spec')
+        batch_op.drop_index('ix_wage_logs_archive_worker_date')
+        batch_op.drop_index('ix_wage_logs_archive_date')
+
+    op.drop_table('wage_logs_archive')
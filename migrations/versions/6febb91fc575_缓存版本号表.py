@@ -0,0 +1,30 @@
+"""缓存版本号表
+
+Revision ID: 6febb91fc575
+Revises: 6c2dad3ea390
+Create Date: 2026-10-17 17:08:52.640193
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6febb91fc575'
+down_revision = '6c2dad3ea390'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    cache_versions = op.create_table('cache_versions',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.bulk_insert(cache_versions, [{'name': 'reference', 'version': 1}])
+
+
+def downgrade():
+    op.drop_table('cache_versions')
@@ -0,0 +1,30 @@
+"""工资记录表增加组合索引
+
+Revision ID: 8abe29cf1b43
+Revises: d044c8285f9f
+Create Date: 2026-10-17 11:03:27.518842
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8abe29cf1b43'
+down_revision = 'd044c8285f9f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('wage_logs', schema=None) as batch_op:
+        batch_op.create_index('ix_wage_logs_date', ['date'], unique=False)
+        batch_op.create_index('ix_wage_logs_worker_date', ['worker_id', 'date'], unique=False)
+        batch_op.create_index('ix_wage_logs_process_date_spec', ['process_id', 'date', 'spec_model_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('wage_logs', schema=None) as batch_op:
+        batch_op.drop_index('ix_wage_logs_process_date_spec')
+        batch_op.drop_index('ix_wage_logs_worker_date')
+        batch_op.drop_index('ix_wage_logs_date')
@@ -0,0 +1,28 @@
+"""工人名单缓存版本号
+
+Revision ID: 8f675b6bd194
+Revises: 666d5f321df1
+Create Date: 2026-10-17 20:05:31.278640
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8f675b6bd194'
+down_revision = '666d5f321df1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    cache_versions = sa.table('cache_versions',
+    sa.column('name', sa.String(length=50)),
+    sa.column('version', sa.BigInteger())
+    )
+    op.bulk_insert(cache_versions, [{'name': 'roster', 'version': 1}])
+
+
+def downgrade():
+    op.execute("DELETE FROM cache_versions WHERE name = 'roster'")
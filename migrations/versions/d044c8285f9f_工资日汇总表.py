@@ -0,0 +1,48 @@
+"""工资日汇总表
+
+Revision ID: d044c8285f9f
+Revises: 9554a83fad98
+Create Date: 2026-10-17 10:12:41.305518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd044c8285f9f'
+down_revision = '9554a83fad98'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('wage_daily_summary',
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('worker_id', sa.Integer(), nullable=False),
+    sa.Column('process_id', sa.Integer(), nullable=False),
+    sa.Column('spec_model_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.BigInteger(), nullable=False),
+    sa.Column('total_wage', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('log_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('date', 'worker_id', 'process_id', 'spec_model_id')
+    )
+    with op.batch_alter_table('wage_daily_summary', schema=None) as batch_op:
+        batch_op.create_index('ix_wage_daily_summary_worker_date', ['worker_id', 'date'], unique=False)
+        batch_op.create_index('ix_wage_daily_summary_process_date', ['process_id', 'date'], unique=False)
+
+    # 用现有工资记录回填（之后也可用 scripts/rebuild_wage_summary.py 按区间重建）
+    op.execute(
+        'INSERT INTO wage_daily_summary '
+        '(date, worker_id, process_id, spec_model_id, quantity, total_wage, log_count) '
+        'SELECT date, worker_id, process_id, spec_model_id, SUM(quantity), SUM(total_wage), COUNT(id) '
+        'FROM wage_logs GROUP BY date, worker_id, process_id, spec_model_id'
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('wage_daily_summary', schema=None) as batch_op:
+        batch_op.drop_index('ix_wage_daily_summary_process_date')
+        batch_op.drop_index('ix_wage_daily_summary_worker_date')
+
+    op.drop_table('wage_daily_summary')
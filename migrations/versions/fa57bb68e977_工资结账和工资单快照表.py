@@ -0,0 +1,73 @@
+"""工资结账和工资单快照表
+
+Revision ID: fa57bb68e977
+Revises: 47b8336f503c
+Create Date: 2026-10-17 15:02:44.183620
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'fa57bb68e977'
+down_revision = '47b8336f503c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('payroll_periods',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('month', sa.String(length=7), nullable=False),
+    sa.Column('status', sa.Enum('已结账', '已重开', name='payroll_period_status'), nullable=False),
+    sa.Column('worker_count', sa.Integer(), nullable=False),
+    sa.Column('log_count', sa.Integer(), nullable=False),
+    sa.Column('total_quantity', sa.BigInteger(), nullable=False),
+    sa.Column('total_wage', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('closed_at', sa.DateTime(), nullable=True),
+    sa.Column('closed_by', sa.Integer(), nullable=True),
+    sa.Column('reopened_at', sa.DateTime(), nullable=True),
+    sa.Column('reopened_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('month')
+    )
+    op.create_table('payslip_snapshots',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('period_id', sa.Integer(), nullable=False),
+    sa.Column('worker_id', sa.Integer(), nullable=False),
+    sa.Column('worker_name', sa.String(length=50), nullable=True),
+    sa.Column('quantity', sa.BigInteger(), nullable=False),
+    sa.Column('total_wage', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('log_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['period_id'], ['payroll_periods.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('period_id', 'worker_id', name='uq_payslip_period_worker')
+    )
+    op.create_table('payslip_snapshot_lines',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('period_id', sa.Integer(), nullable=False),
+    sa.Column('worker_id', sa.Integer(), nullable=False),
+    sa.Column('process_id', sa.Integer(), nullable=False),
+    sa.Column('process_name', sa.String(length=50), nullable=True),
+    sa.Column('spec_model_id', sa.Integer(), nullable=False),
+    sa.Column('spec_model_name', sa.String(length=50), nullable=True),
+    sa.Column('quantity', sa.BigInteger(), nullable=False),
+    sa.Column('total_wage', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('log_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['period_id'], ['payroll_periods.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('payslip_snapshot_lines', schema=None) as batch_op:
+        batch_op.create_index('ix_payslip_snapshot_lines_period_worker', ['period_id', 'worker_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('payslip_snapshot_lines', schema=None) as batch_op:
+        batch_op.drop_index('ix_payslip_snapshot_lines_period_worker')
+
+    op.drop_table('payslip_snapshot_lines')
+    op.drop_table('payslip_snapshots')
+    op.drop_table('payroll_periods')
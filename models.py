@@ -1,8 +1,9 @@
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import check_password_hash
 from sqlalchemy import Numeric, func
 from datetime import datetime, date
 from db_config import db
+from utils.passwords import hash_password
 
 # 基类：自动添加时间戳字段
 class TimestampMixin:
@@ -46,7 +47,8 @@ class User(db.Model):
     )
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password, method='pbkdf2:sha256')
+        # 迭代次数见 utils/passwords.py（可配置 / 按本机速度自动校准）
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
@@ -79,9 +81,7 @@ class UserRegister(db.Model):
     reviewed_by = db.Column(db.Integer)  # 管理员 user.id
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(
-            password, method='pbkdf2:sha256'
-        )
+        self.password_hash = hash_password(password)
 
 
 #角色表
@@ -127,6 +127,7 @@ class Process(db.Model, TimestampMixin):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(50), unique=True, nullable=False)
     description = db.Column(db.String(100))
+    is_active = db.Column(db.Boolean, nullable=False, default=True, server_default=db.true())  # 停用后不能再录入，历史记录保留
 
     workers = db.relationship('Worker', back_populates='process')
     spec_models = db.relationship('SpecModel', back_populates='process')
@@ -141,6 +142,7 @@ class SpecModel(db.Model, TimestampMixin):
     name = db.Column(db.String(50), nullable=False)
     category = db.Column(db.String(50))
     price = db.Column(Numeric(10, 2), nullable=False)
+    is_active = db.Column(db.Boolean, nullable=False, default=True, server_default=db.true())  # 停用后不能再录入，历史记录保留
 
     process_id = db.Column(db.Integer, db.ForeignKey('processes.id'), nullable=False)
     process = db.relationship('Process', back_populates='spec_models')
@@ -154,6 +156,61 @@ class SpecModel(db.Model, TimestampMixin):
         }
 
 
+# 规格型号单价历史：每条记录在 [effective_from, effective_to] 区间内生效
+# effective_from 为空表示“最早以来”，effective_to 为空表示“至今”
+# 工资录入 / 导入按工资日期取当时的单价（见 utils/spec_prices.py）
+class SpecModelPrice(db.Model, TimestampMixin):
+    __tablename__ = 'spec_model_prices'
+    id = db.Column(db.Integer, primary_key=True)
+    spec_model_id = db.Column(db.Integer, db.ForeignKey('spec_models.id'), nullable=False)
+    price = db.Column(Numeric(10, 2), nullable=False)
+    effective_from = db.Column(db.Date, nullable=True)  # 生效日期（含）
+    effective_to = db.Column(db.Date, nullable=True)  # 失效日期（含），由下一条记录的生效日期推出
+    remark = db.Column(db.String(100))
+
+    __table_args__ = (
+        db.Index('ix_spec_model_prices_spec_from', 'spec_model_id', 'effective_from'),
+    )
+
+
+# 缓存版本号：改了被缓存的数据就把对应版本号加 1，各进程据此判断进程内缓存是否过期
+class CacheVersion(db.Model):
+    __tablename__ = 'cache_versions'
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+# 工序 / 规格型号合并记录：被合并的一方（source）停用，引用它的数据改指向 target，
+# 每一行被改动的数据记入 ref_merge_rows，撤销时按记录改回（见 utils/ref_merge.py）
+class RefMerge(db.Model, TimestampMixin):
+    __tablename__ = 'ref_merges'
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)  # spec_model / process
+    source_id = db.Column(db.Integer, nullable=False)
+    target_id = db.Column(db.Integer, nullable=False)
+    source_name = db.Column(db.String(50))
+    target_name = db.Column(db.String(50))
+    status = db.Column(
+        db.Enum('合并中', '已合并', '撤销中', '已撤销', name='ref_merge_status'),
+        nullable=False, default='合并中'
+    )
+    row_count = db.Column(db.Integer, nullable=False, default=0)  # 改动的行数（各表合计）
+
+    merged_at = db.Column(db.DateTime)
+    merged_by = db.Column(db.Integer)  # 用户ID
+    undone_at = db.Column(db.DateTime)
+    undone_by = db.Column(db.Integer)
+
+
+# 合并时改动过的行：(合并记录, 表名, 行 id)
+class RefMergeRow(db.Model):
+    __tablename__ = 'ref_merge_rows'
+    merge_id = db.Column(db.Integer, db.ForeignKey('ref_merges.id'), primary_key=True)
+    table_name = db.Column(db.String(30), primary_key=True)
+    row_id = db.Column(db.Integer, primary_key=True)
+
+
 # 工价表
 '''
 class WagePrice(db.Model, TimestampMixin):
@@ -190,6 +247,118 @@ class WageLog(db.Model, TimestampMixin):
     process = db.relationship('Process', back_populates='wage_logs')
     spec_model = db.relationship('SpecModel', back_populates='wage_logs')
 
+    # 按实际查询条件建的组合索引：
+    # - date: 按天查询 / (date, id) 游标分页（InnoDB 二级索引自带主键 id）
+    # - worker_id, date: 按工人 + 日期区间查询
+    # - process_id, date, spec_model_id: 按工序 + 日期区间查询，并覆盖 ORDER BY date, process_id, spec_model_id
+    __table_args__ = (
+        db.Index('ix_wage_logs_date', 'date'),
+        db.Index('ix_wage_logs_worker_date', 'worker_id', 'date'),
+        db.Index('ix_wage_logs_process_date_spec', 'process_id', 'date', 'spec_model_id'),
+    )
+
+
+# 工资记录归档表：已结账且超过 WAGE_ARCHIVE_HORIZON_MONTHS 的月份从 wage_logs 整月搬到这里，
+# 字段、id 与 wage_logs 相同；查询时按日期区间自动决定查哪张表（见 utils/wage_archive.py）
+# 不建外键（冷数据只读，搬运时不用逐行校验外键）
+class WageLogArchive(db.Model, TimestampMixin):
+    __tablename__ = 'wage_logs_archive'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    is_special = db.Column(db.Boolean, default=False)
+    date = db.Column(db.Date, nullable=False)
+    actual_price = db.Column(Numeric(10, 2), nullable=False)
+    quantity = db.Column(db.Integer, nullable=False)
+    total_wage = db.Column(Numeric(10, 2), nullable=False)
+    actual_group_size = db.Column(db.Integer, nullable=False, default=1)
+    remark = db.Column(db.String(100))
+
+    worker_id = db.Column(db.Integer, nullable=False)
+    process_id = db.Column(db.Integer, nullable=False)
+    spec_model_id = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_wage_logs_archive_date', 'date'),
+        db.Index('ix_wage_logs_archive_worker_date', 'worker_id', 'date'),
+        db.Index('ix_wage_logs_archive_process_date_spec', 'process_id', 'date', 'spec_model_id'),
+        db.Index('ix_wage_logs_archive_spec', 'spec_model_id'),  # 删除 / 合并规格型号前的引用检查（归档表没有外键索引）
+    )
+
+
+# 工资日汇总表：按 (日期, 工人, 工序, 规格) 汇总的数量和工资
+# 由 wage_logs 的新增 / 修改 / 删除 / 批量导入增量维护（见 utils/wage_summary.py），
+# 月度工资统计直接读这张表；数据不一致时用 scripts/rebuild_wage_summary.py 重建
+class WageDailySummary(db.Model):
+    __tablename__ = 'wage_daily_summary'
+    date = db.Column(db.Date, primary_key=True)
+    worker_id = db.Column(db.Integer, primary_key=True)
+    process_id = db.Column(db.Integer, primary_key=True)
+    spec_model_id = db.Column(db.Integer, primary_key=True)
+
+    quantity = db.Column(db.BigInteger, nullable=False, default=0)  # 数量合计
+    total_wage = db.Column(Numeric(14, 2), nullable=False, default=0)  # 工资合计
+    log_count = db.Column(db.Integer, nullable=False, default=0)  # 汇总的工资记录条数，为 0 时删除该行
+
+    __table_args__ = (
+        db.Index('ix_wage_daily_summary_worker_date', 'worker_id', 'date'),
+        db.Index('ix_wage_daily_summary_process_date', 'process_id', 'date'),
+    )
+
+
+# 工资结账月份：结账时把当月工资单算好存入快照表，之后该月工资记录不能再改，
+# 需要调整时先重开（reopen），改完重新结账
+class PayrollPeriod(db.Model, TimestampMixin):
+    __tablename__ = 'payroll_periods'
+    id = db.Column(db.Integer, primary_key=True)
+    month = db.Column(db.String(7), unique=True, nullable=False)  # YYYY-MM
+    status = db.Column(
+        db.Enum('已结账', '已重开', name='payroll_period_status'),
+        nullable=False, default='已结账'
+    )
+    worker_count = db.Column(db.Integer, nullable=False, default=0)
+    log_count = db.Column(db.Integer, nullable=False, default=0)
+    total_quantity = db.Column(db.BigInteger, nullable=False, default=0)
+    total_wage = db.Column(Numeric(14, 2), nullable=False, default=0)
+
+    closed_at = db.Column(db.DateTime)
+    closed_by = db.Column(db.Integer)  # 用户ID
+    reopened_at = db.Column(db.DateTime)
+    reopened_by = db.Column(db.Integer)
+
+
+# 工资单快照：结账月份每个工人一行
+class PayslipSnapshot(db.Model):
+    __tablename__ = 'payslip_snapshots'
+    id = db.Column(db.Integer, primary_key=True)
+    period_id = db.Column(db.Integer, db.ForeignKey('payroll_periods.id'), nullable=False)
+    worker_id = db.Column(db.Integer, nullable=False)
+    worker_name = db.Column(db.String(50))  # 结账时的名称，之后改名不影响已结账工资单
+    quantity = db.Column(db.BigInteger, nullable=False, default=0)
+    total_wage = db.Column(Numeric(14, 2), nullable=False, default=0)
+    log_count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.UniqueConstraint('period_id', 'worker_id', name='uq_payslip_period_worker'),
+    )
+
+
+# 工资单快照明细：按工序、规格型号拆分
+class PayslipSnapshotLine(db.Model):
+    __tablename__ = 'payslip_snapshot_lines'
+    id = db.Column(db.Integer, primary_key=True)
+    period_id = db.Column(db.Integer, db.ForeignKey('payroll_periods.id'), nullable=False)
+    worker_id = db.Column(db.Integer, nullable=False)
+    process_id = db.Column(db.Integer, nullable=False)
+    process_name = db.Column(db.String(50))
+    spec_model_id = db.Column(db.Integer, nullable=False)
+    spec_model_name = db.Column(db.String(50))
+    quantity = db.Column(db.BigInteger, nullable=False, default=0)
+    total_wage = db.Column(Numeric(14, 2), nullable=False, default=0)
+    log_count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index('ix_payslip_snapshot_lines_period_worker', 'period_id', 'worker_id'),
+    )
+
 
 
 # 12。04 #
@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta
+from flask import Blueprint, request, jsonify
+from sqlalchemy import func, select
+from db_config import db
+from models import WageDailySummary, Worker, Process
+from utils.decorators import login_required
+from utils import roster_index
+
+analytics_bp = Blueprint('analytics', __name__)
+
+# 最长查询天数（约十年）
+MAX_DAYS = 3700
+
+
+def _wage_series(start, end, by, days):
+    """
+    从工资日汇总表按 天 × 分组 汇总工资和数量，一条 GROUP BY 查询
+    返回 {分组: ([每天工资], [每天数量])}
+    """
+    if by == 'group':
+        key_col = func.coalesce(Worker.group, '')
+    elif by == 'process_id':
+        key_col = WageDailySummary.process_id
+    else:
+        key_col = None
+
+    columns = [WageDailySummary.date]
+    if key_col is not None:
+        columns.append(key_col.label('key'))
+    query = select(
+        *columns,
+        func.sum(WageDailySummary.total_wage).label('total_wage'),
+        func.sum(WageDailySummary.quantity).label('quantity'),
+    ).where(WageDailySummary.date >= start, WageDailySummary.date <= end)
+    if by == 'group':
+        query = query.outerjoin(Worker, Worker.id == WageDailySummary.worker_id)
+    query = query.group_by(*columns)
+
+    series = {}
+    for row in db.session.execute(query):
+        key = row.key if key_col is not None else None
+        wages, quantities = series.get(key) or series.setdefault(key, ([0.0] * days, [0] * days))
+        i = (row.date - start).days
+        wages[i] = float(row.total_wage or 0)
+        quantities[i] = int(row.quantity or 0)
+    return series
+
+
+# 每天在职人数与工资（按班组 / 工序）
+@analytics_bp.route('/labor', methods=['GET'])
+@login_required
+def labor_timeseries():
+    """
+    查询参数：
+    - start_date / end_date: YYYY-MM-DD，必填，含两端
+    - by: group（按班组，默认）/ process（按工序）/ all（不分组）
+
+    在职人数来自工人在职区间索引（utils/roster_index.py，按入职 / 离职日期做差分累加），
+    工资和数量来自工资日汇总表；按班组统计时以工人当前所在班组为准。
+    返回的每个序列与 dates 一一对应
+    """
+    try:
+        start = datetime.strptime(request.args['start_date'], '%Y-%m-%d').date()
+        end = datetime.strptime(request.args['end_date'], '%Y-%m-%d').date()
+    except KeyError:
+        return jsonify({'message': 'start_date and end_date are required'}), 400
+    except ValueError:
+        return jsonify({'message': 'Invalid date format. Use YYYY-MM-DD.'}), 400
+
+    by = request.args.get('by', 'group')
+    if by not in ('group', 'process', 'all'):
+        return jsonify({'message': 'by must be group, process or all'}), 400
+    key = {'group': 'group', 'process': 'process_id', 'all': None}[by]
+
+    days = (end - start).days + 1
+    if days <= 0:
+        return jsonify({'message': 'end_date must not be earlier than start_date'}), 400
+    if days > MAX_DAYS:
+        return jsonify({'message': f'date range must not exceed {MAX_DAYS} days'}), 400
+
+    headcounts = roster_index.headcount(start, end, key, roster_index.roster_version())
+    wages = _wage_series(start, end, key, days)
+
+    names = {}
+    if key == 'process_id':
+        names = dict(db.session.execute(select(Process.id, Process.name)).all())
+
+    zero_wages = ([0.0] * days, [0] * days)
+    series = []
+    for k in sorted(set(headcounts) | set(wages), key=lambda k: (k is None, str(k))):
+        wage, quantity = wages.get(k, zero_wages)
+        series.append({
+            'key': k,
+            'name': names.get(k, k) if key == 'process_id' else k,
+            'headcount': headcounts.get(k, [0] * days),
+            'total_wage': [round(w, 2) for w in wage],
+            'quantity': quantity,
+        })
+
+    return jsonify({
+        'start_date': start.strftime('%Y-%m-%d'),
+        'end_date': end.strftime('%Y-%m-%d'),
+        'by': by,
+        'dates': [(start + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(days)],
+        'series': series
+    }), 200
@@ -5,6 +5,10 @@ from db_config import db
 import jwt
 from datetime import datetime, timedelta
 from utils.decorators import login_required, roles_required
+from utils.token_cache import token_cache
+from utils.password_pool import get_password_pool, PasswordPoolBusy
+from utils.passwords import hash_password, needs_rehash, current_hash_iterations
+from werkzeug.security import check_password_hash
 
 auth_bp = Blueprint('auth', __name__)
 SECRET_KEY = 'dao-hao-shi-gou'
@@ -21,22 +25,29 @@ def login():
 
     user = User.query.filter_by(username=username).first()
 
-    if not user or not user.check_password(password):
+    if not user or not password:
         return jsonify({'code': 401, 'msg': '用户名或密码错误'}), 401
 
+    # 密码哈希放到独立线程池里算，池满直接 429，避免登录高峰占满所有 worker
+    try:
+        password_ok = get_password_pool().run(check_password_hash, user.password_hash, password)
+    except PasswordPoolBusy:
+        return jsonify({'code': 429, 'msg': '登录请求过多，请稍后重试'}), 429, {'Retry-After': '1'}
+
+    if not password_ok:
+        return jsonify({'code': 401, 'msg': '用户名或密码错误'}), 401
+
+    # 哈希参数已过时（迭代次数调整过），趁这次登录用明文重新生成，不需要统一重置密码
+    iterations = current_hash_iterations()
+    if needs_rehash(user.password_hash, iterations):
+        try:
+            user.password_hash = get_password_pool().run(hash_password, password, iterations)
+        except PasswordPoolBusy:
+            pass  # 繁忙时不影响本次登录，下次再重算
+
     # 获取角色名
     role_names = [r.name for r in user.roles]
 
-    # 打印调试信息
-    '''
-    
-    '''
-    print('===== 登录用户信息 =====')
-    print('user_id:', user.id)
-    print('username:', user.username)
-    print('roles:', role_names)
-    print('========================')
-
     # 生成 JWT token
     token_payload = {
         'user_id': user.id,
@@ -53,6 +64,9 @@ def login():
     user.last_login_time = datetime.utcnow()
     db.session.commit()
 
+    # 旧 token 已被顶掉，清掉本进程里该用户的校验缓存
+    token_cache.invalidate_user(user.id)
+
     return jsonify({
         'code': 200,
         'token': token,
@@ -4,6 +4,7 @@ from utils.decorators import login_required, roles_required
 from sqlalchemy import func, and_
 from datetime import datetime, timedelta
 from models import User
+from utils import spec_tree, http_cache
 from exModels.inventory import InventoryLog, Inventory, Product
 
 from exModels.inventory import (
@@ -25,28 +26,12 @@ inventory_bp = Blueprint('inventory', __name__)
 # 获取全部规格（仅启用）
 @inventory_bp.route('/spec/list', methods=['GET'])
 def get_specs():
-    categories = SpecCategory.query.filter_by(
-        is_active=True
-    ).order_by(SpecCategory.sort_order).all()
-
-    result = []
-    for c in categories:
-        options = SpecOption.query.filter_by(
-            category_id=c.id,
-            is_active=True
-        ).order_by(SpecOption.sort_order).all()
-
-        result.append({
-            'id': c.id,
-            'code': c.code,
-            'name': c.name,
-            'options': [
-                {'id': o.id, 'value': o.value}
-                for o in options
-            ]
-        })
-
-    return jsonify(success=True, data=result)
+    # 规格树缓存（utils/spec_tree.py），ETag 取缓存的版本号，平时不查库
+    tree = spec_tree.get()
+    not_modified = http_cache.not_modified(tree.etag)
+    if not_modified is not None:
+        return not_modified
+    return http_cache.with_etag(jsonify(success=True, data=tree.categories), tree.etag)
 
 
 # 新增规格分类
@@ -63,7 +48,9 @@ def add_spec_category():
         sort_order=data.get('sort_order', 0)
     )
     db.session.add(category)
+    spec_tree.changed()
     db.session.commit()
+    spec_tree.refresh()
 
     return jsonify(success=True, data={'id': category.id})
 
@@ -77,7 +64,9 @@ def update_spec_category():
     category.name = data.get('name', category.name)
     category.sort_order = data.get('sort_order', category.sort_order)
 
+    spec_tree.changed()
     db.session.commit()
+    spec_tree.refresh()
     return jsonify(success=True)
 
 
@@ -95,7 +84,9 @@ def disable_spec_category():
         return jsonify(success=False, message='该规格分类已被产品使用，禁止停用')
 
     category.is_active = False
+    spec_tree.changed()
     db.session.commit()
+    spec_tree.refresh()
     return jsonify(success=True)
 
 
@@ -110,7 +101,9 @@ def add_spec_option():
         sort_order=data.get('sort_order', 0)
     )
     db.session.add(option)
+    spec_tree.changed()
     db.session.commit()
+    spec_tree.refresh()
 
     return jsonify(success=True, data={'id': option.id})
 
@@ -124,7 +117,9 @@ def update_spec_option():
     option.value = data.get('value', option.value)
     option.sort_order = data.get('sort_order', option.sort_order)
 
+    spec_tree.changed()
     db.session.commit()
+    spec_tree.refresh()
     return jsonify(success=True)
 
 
@@ -142,7 +137,9 @@ def disable_spec_option():
         return jsonify(success=False, message='该规格值已被产品使用，禁止停用')
 
     option.is_active = False
+    spec_tree.changed()
     db.session.commit()
+    spec_tree.refresh()
     return jsonify(success=True)
 
 
@@ -0,0 +1,90 @@
+from flask import Blueprint, request, jsonify, g
+from db_config import db
+from models import PayrollPeriod
+from utils.decorators import login_required, roles_required
+from utils import payroll, wage_archive
+
+payroll_bp = Blueprint('payroll', __name__)
+
+
+def _check_month(month):
+    try:
+        payroll.month_range(month)
+    except ValueError:
+        return jsonify({'message': 'Invalid month format. Use YYYY-MM.'}), 400
+    return None
+
+
+# 结账月份列表
+@payroll_bp.route('/periods', methods=['GET'])
+@login_required
+def get_periods():
+    periods = PayrollPeriod.query.order_by(PayrollPeriod.month.desc()).all()
+    return jsonify({'periods': [payroll.period_to_dict(p) for p in periods]}), 200
+
+
+# 结账：生成当月工资单快照，之后该月工资记录不能再修改
+@payroll_bp.route('/periods/<month>/close', methods=['POST'])
+@roles_required('管理员')
+def close_period(month):
+    error = _check_month(month)
+    if error:
+        return error
+
+    try:
+        period = payroll.close(month, g.current_user.id)
+        db.session.commit()
+    except payroll.PeriodClosed as e:
+        db.session.rollback()
+        return jsonify({'message': str(e)}), 409
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': str(e)}), 400
+
+    return jsonify({'message': 'Payroll period closed', 'period': payroll.period_to_dict(period)}), 200
+
+
+# 重开：删除工资单快照，恢复该月工资记录的修改（已归档的记录搬回 wage_logs）
+@payroll_bp.route('/periods/<month>/reopen', methods=['POST'])
+@roles_required('管理员')
+def reopen_period(month):
+    error = _check_month(month)
+    if error:
+        return error
+
+    try:
+        period = payroll.reopen(month, g.current_user.id)
+        if period is None:
+            return jsonify({'message': 'Payroll period is not closed'}), 404
+        restored = wage_archive.restore_month(month, commit=False)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': str(e)}), 400
+
+    return jsonify({
+        'message': 'Payroll period reopened',
+        'period': payroll.period_to_dict(period),
+        'restored': restored
+    }), 200
+
+
+# 工资单：已结账月份读快照，未结账月份按当前数据现算
+@payroll_bp.route('/periods/<month>/payslips', methods=['GET'])
+@login_required
+def get_payslips(month):
+    """
+    查询参数：
+    - worker_id: 可选，只看某个工人
+    """
+    error = _check_month(month)
+    if error:
+        return error
+
+    closed, slips = payroll.payslips(month, request.args.get('worker_id', type=int))
+    return jsonify({
+        'month': month,
+        'closed': closed,
+        'payslips': slips,
+        'total_wage': round(sum(s['total_wage'] for s in slips), 2)
+    }), 200
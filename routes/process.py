@@ -1,7 +1,9 @@
 from flask import Blueprint, request, jsonify
+from sqlalchemy import delete
 from db_config import db
 from models import Process
 from utils.decorators import login_required
+from utils import roster_index, ref_data, ref_usage
 
 process_bp = Blueprint('process', __name__)
 
@@ -10,15 +12,10 @@ process_bp = Blueprint('process', __name__)
 @login_required
 def get_processes():
     try:
-        processes = Process.query.all()
-        process_list = [
-            {
-                'id': p.id,
-                'name': p.name,
-                'description': p.description
-            } for p in processes
-        ]
-        return jsonify({'processes': process_list}), 200
+        # 参考数据缓存（utils/ref_data.py），不查库；include_inactive=1 时包含已停用的工序
+        ref = ref_data.get()
+        include_inactive = request.args.get('include_inactive', '0') != '0'
+        return jsonify({'processes': ref.all_processes if include_inactive else ref.processes}), 200
     except Exception as e:
         print(f"Error fetching processes: {e}")
         return jsonify({'message': 'Failed to fetch processes', 'error': str(e)}), 400
@@ -33,7 +30,8 @@ def get_process(id):
     return jsonify({
         'id': process.id,
         'name': process.name,
-        'description': process.description
+        'description': process.description,
+        'is_active': process.is_active
     }), 200
 
 
@@ -50,7 +48,9 @@ def add_process():
             description=data.get('description', '')
         )
         db.session.add(new_process)
+        ref_data.changed()
         db.session.commit()
+        ref_data.refresh()
 
         return jsonify({
             'message': 'Process created successfully',
@@ -74,9 +74,16 @@ def update_process(id):
     data = request.get_json()
     process.name = data.get('name', process.name)
     process.description = data.get('description', process.description)
+    if 'is_active' in data:
+        process.is_active = bool(data['is_active'])
 
     try:
+        ref_data.changed()
+        # 工人列表里带着工序名
+        roster_index.changed()
         db.session.commit()
+        ref_data.refresh()
+        roster_index.refresh()
         return jsonify({
             'message': 'Process updated successfully',
             'process': {
@@ -89,16 +96,55 @@ def update_process(id):
         return jsonify({'message': str(e)}), 400
 
 
+# 工序被哪些数据引用（各表引用数）
+@process_bp.route('/<int:id>/usage', methods=['GET'])
+@login_required
+def get_process_usage(id):
+    process = Process.query.get(id)
+    if not process:
+        return jsonify({'message': 'Process not found'}), 404
+    usage = ref_usage.process_usage(id)
+    return jsonify({
+        'id': id,
+        'in_use': ref_usage.in_use(usage),
+        'usage': usage,
+        'usage_limit': ref_usage.USAGE_COUNT_LIMIT
+    }), 200
+
+
 # 删除工序
 @process_bp.route('/<int:id>', methods=['DELETE'])
 def delete_process(id):
+    """
+    查询参数 soft=1：只停用（is_active=false），工人、规格型号、工资记录都保留
+    否则先逐表探测引用（utils/ref_usage.py）：没有引用才真正删除；
+    有引用时返回 409 和各表引用数，可以改为停用，或把它合并到另一个工序
+    """
     process = Process.query.get(id)
     if not process:
         return jsonify({'message': 'Process not found'}), 404
 
+    soft = request.args.get('soft', '0') != '0'
     try:
-        db.session.delete(process)
+        if soft:
+            process.is_active = False
+        else:
+            usage = ref_usage.process_usage(id)
+            if ref_usage.in_use(usage):
+                return jsonify({
+                    'message': 'Process is in use; disable it (soft=1) or merge it into another process',
+                    'usage': usage,
+                    'usage_limit': ref_usage.USAGE_COUNT_LIMIT
+                }), 409
+            # Core DELETE，不经过 ORM 关系（否则会加载 workers / spec_models / wage_logs）
+            db.session.execute(delete(Process).where(Process.id == id))
+        ref_data.changed()
+        roster_index.changed()
         db.session.commit()
+        ref_data.refresh()
+        roster_index.refresh()
+        if soft:
+            return jsonify({'message': 'Process disabled successfully'}), 200
         return jsonify({'message': 'Process deleted successfully'}), 200
     except Exception as e:
         db.session.rollback()
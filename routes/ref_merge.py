@@ -0,0 +1,92 @@
+from flask import Blueprint, request, jsonify, g
+from db_config import db
+from models import RefMerge
+from utils.decorators import roles_required
+from utils import payroll, ref_merge
+
+ref_merge_bp = Blueprint('ref_merge', __name__)
+
+
+def _merge(kind):
+    data = request.get_json() or {}
+    try:
+        source_id = int(data['source_id'])
+        target_id = int(data['target_id'])
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'message': 'source_id and target_id are required'}), 400
+
+    if data.get('dry_run'):
+        try:
+            result = ref_merge.preview(kind, source_id, target_id)
+        except ref_merge.MergeError as e:
+            return jsonify({'message': str(e)}), 400
+        result['dry_run'] = True
+        return jsonify(result), 200
+
+    # 涉及已结账月份时拒绝合并，先重开这些月份
+    try:
+        record, counts = ref_merge.merge(kind, source_id, target_id, g.current_user.id)
+    except payroll.PeriodClosed as e:
+        db.session.rollback()
+        return jsonify({'message': str(e), 'closed_months': e.months}), 409
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': str(e)}), 400
+
+    return jsonify({
+        'message': 'Merged successfully',
+        'merge': ref_merge.merge_to_dict(record),
+        'updated': counts
+    }), 200
+
+
+# 合并记录列表
+@ref_merge_bp.route('/', methods=['GET'])
+@roles_required('管理员')
+def get_merges():
+    merges = RefMerge.query.order_by(RefMerge.id.desc()).all()
+    return jsonify({'merges': [ref_merge.merge_to_dict(m) for m in merges]}), 200
+
+
+# 合并规格型号：source 的工资记录（含归档）改到 target，source 停用
+@ref_merge_bp.route('/spec_models', methods=['POST'])
+@roles_required('管理员')
+def merge_spec_models():
+    """JSON 参数：source_id（被合并、停用的规格型号）、target_id（保留的规格型号），须属于同一工序；
+    dry_run=true 时只返回各表要改的行数和涉及的已结账月份"""
+    return _merge(ref_merge.SPEC_MODEL)
+
+
+# 合并工序：source 下的工人、规格型号、工资记录（含归档）改到 target，source 停用
+@ref_merge_bp.route('/processes', methods=['POST'])
+@roles_required('管理员')
+def merge_processes():
+    """JSON 参数：source_id（被合并、停用的工序）、target_id（保留的工序）；dry_run 同上"""
+    return _merge(ref_merge.PROCESS)
+
+
+# 撤销合并：合并时改过的行改回 source，source 重新启用
+@ref_merge_bp.route('/<int:id>/undo', methods=['POST'])
+@roles_required('管理员')
+def undo_merge(id):
+    record = RefMerge.query.get(id)
+    if not record:
+        return jsonify({'message': 'Merge record not found'}), 404
+
+    try:
+        counts = ref_merge.undo(record, g.current_user.id)
+    except payroll.PeriodClosed as e:
+        db.session.rollback()
+        return jsonify({'message': str(e), 'closed_months': e.months}), 409
+    except ref_merge.MergeError as e:
+        db.session.rollback()
+        return jsonify({'message': str(e)}), 409
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': str(e)}), 400
+
+    return jsonify({
+        'message': 'Merge undone',
+        'merge': ref_merge.merge_to_dict(record),
+        'restored': counts
+    }), 200
@@ -1,7 +1,11 @@
 from flask import Blueprint, request, jsonify
+from sqlalchemy import delete
 from db_config import db
-from models import SpecModel
-from utils.decorators import login_required
+from models import SpecModel, SpecModelPrice
+from utils.decorators import login_required, roles_required
+from utils import wage_reprice, spec_prices, payroll, ref_data, ref_usage
+from datetime import datetime, date
+from decimal import Decimal, InvalidOperation
 
 spec_model_bp = Blueprint('spec_model', __name__, url_prefix='/api/specmodels')
 
@@ -11,18 +15,10 @@ spec_model_bp = Blueprint('spec_model', __name__, url_prefix='/api/specmodels')
 @login_required
 def get_spec_models():
     try:
-        spec_models = SpecModel.query.order_by(SpecModel.process_id).all()
-        result = [
-            {
-                'id': s.id,
-                'name': s.name,
-                'category': s.category,
-                'process_id': s.process_id,
-                'process_name':s.process.name,
-                'price': s.price
-            } for s in spec_models
-        ]
-        return jsonify({'specModels': result}), 200
+        # 参考数据缓存（utils/ref_data.py），不查库；include_inactive=1 时包含已停用的规格型号
+        ref = ref_data.get()
+        include_inactive = request.args.get('include_inactive', '0') != '0'
+        return jsonify({'specModels': ref.all_spec_models if include_inactive else ref.spec_models}), 200
     except Exception as e:
         print(f"Error fetching spec models: {e}")
         return jsonify({'message': 'Failed to fetch spec models', 'error': str(e)}), 400
@@ -39,7 +35,8 @@ def get_spec_model(id):
         'name': spec.name,
         'category': spec.category,
         'process_id': spec.process_id,
-        'price': spec.price
+        'price': spec.price,
+        'is_active': spec.is_active
     }), 200
 
 
@@ -59,7 +56,13 @@ def add_spec_model():
             price = data['price']
         )
         db.session.add(new_spec)
+        db.session.flush()
+        # 初始单价从“最早以来”生效
+        spec_prices.record_price(new_spec.id, new_spec.price)
+        ref_data.changed()
         db.session.commit()
+        spec_prices.price_index.invalidate()
+        ref_data.refresh()
         return jsonify({
             'message': 'Spec model created successfully',
             'specModel': {
@@ -86,10 +89,20 @@ def update_spec_model(id):
     spec.name = data.get('name', spec.name)
     spec.category = data.get('category', spec.category)
     spec.process_id = data.get('process_id', spec.process_id)
-    spec.price = data.get('price', spec.price)
+    if 'is_active' in data:
+        spec.is_active = bool(data['is_active'])
 
     try:
+        # 单价有变化时记入单价历史：effective_from 不传默认今天生效，之前日期的工资仍按原单价
+        if data.get('price') not in (None, '') and Decimal(str(data['price'])) != spec.price:
+            effective_from = _parse_date(data.get('effective_from')) or date.today()
+            record = spec_prices.record_price(spec.id, data['price'], effective_from)
+            if _covers_today(record):
+                spec.price = data['price']
+        ref_data.changed()
         db.session.commit()
+        spec_prices.price_index.invalidate()
+        ref_data.refresh()
         return jsonify({
             'message': 'Spec model updated successfully',
             'specModel': {
@@ -105,17 +118,55 @@ def update_spec_model(id):
         return jsonify({'message': str(e)}), 400
 
 
+# 规格型号被哪些数据引用（各表引用数）
+@spec_model_bp.route('/<int:id>/usage', methods=['GET'])
+@login_required
+def get_spec_model_usage(id):
+    spec = SpecModel.query.get(id)
+    if not spec:
+        return jsonify({'message': 'Spec model not found'}), 404
+    usage = ref_usage.spec_model_usage(id)
+    return jsonify({
+        'id': id,
+        'in_use': ref_usage.in_use(usage),
+        'usage': usage,
+        'usage_limit': ref_usage.USAGE_COUNT_LIMIT
+    }), 200
+
+
 # 删除规格型号
 @spec_model_bp.route('/<int:id>', methods=['DELETE'])
 def delete_spec_model(id):
+    """
+    查询参数 soft=1：只停用（is_active=false），工资记录和单价历史都保留
+    否则先探测工资记录（含归档表）是否引用：没有引用才连同单价历史一起删除；
+    有引用时返回 409 和各表引用数，可以改为停用，或把它合并到另一个规格型号
+    """
     spec = SpecModel.query.get(id)
-    print("删除的规格型号：", spec.id,spec.name,spec.price)
     if not spec:
         return jsonify({'message': 'Spec model not found'}), 404
 
+    soft = request.args.get('soft', '0') != '0'
     try:
-        db.session.delete(spec)
+        if soft:
+            spec.is_active = False
+        else:
+            usage = ref_usage.spec_model_usage(id)
+            if ref_usage.in_use(usage):
+                return jsonify({
+                    'message': 'Spec model is in use; disable it (soft=1) or merge it into another spec model',
+                    'usage': usage,
+                    'usage_limit': ref_usage.USAGE_COUNT_LIMIT
+                }), 409
+            # Core DELETE，不经过 ORM 关系（否则会加载 wage_logs）
+            db.session.execute(delete(SpecModelPrice).where(SpecModelPrice.spec_model_id == id))
+            db.session.execute(delete(SpecModel).where(SpecModel.id == id))
+        ref_data.changed()
         db.session.commit()
+        spec_prices.price_index.invalidate()
+        ref_data.refresh()
+        if soft:
+            return jsonify({'message': 'Spec model disabled successfully'}), 200
         return jsonify({'message': 'Spec model deleted successfully'}), 200
     except Exception as e:
         db.session.rollback()
@@ -124,7 +175,152 @@ def delete_spec_model(id):
 # 获取指定工序下的所有规格型号
 @spec_model_bp.route('/by_process/<int:process_id>', methods=['GET'])
 def get_spec_models_by_process(process_id):
-    spec_models = SpecModel.query.filter_by(process_id=process_id).all()
-    result = [sm.to_dict() for sm in spec_models]
+    result = ref_data.get().specs_by_process.get(process_id, [])
     return jsonify({'spec_models': result}), 200
 
+
+
+# 按新单价批量重算某规格型号的工资记录
+@spec_model_bp.route('/<int:id>/reprice', methods=['POST'])
+@roles_required('管理员')
+def reprice_spec_model(id):
+    """
+    JSON 参数：
+    - start_date / end_date: YYYY-MM-DD，工资记录日期区间（含两端），可省略
+    - price: 新单价，省略时使用规格型号当前单价
+    - dry_run: true 时只返回受影响行数和工资差额，不修改数据
+    - batch_size: 每批更新行数，默认 1000
+    """
+    spec = SpecModel.query.get(id)
+    if not spec:
+        return jsonify({'message': 'Spec model not found'}), 404
+
+    data = request.get_json() or {}
+    try:
+        start = datetime.strptime(data['start_date'], '%Y-%m-%d').date() if data.get('start_date') else None
+        end = datetime.strptime(data['end_date'], '%Y-%m-%d').date() if data.get('end_date') else None
+    except (TypeError, ValueError):
+        return jsonify({'message': 'Invalid date format. Use YYYY-MM-DD.'}), 400
+
+    try:
+        price = Decimal(str(data['price'])) if data.get('price') not in (None, '') else spec.price
+    except InvalidOperation:
+        return jsonify({'message': 'price must be a number'}), 400
+
+    try:
+        batch_size = min(max(int(data.get('batch_size') or wage_reprice.DEFAULT_BATCH_SIZE), 1), 10000)
+    except (TypeError, ValueError):
+        return jsonify({'message': 'batch_size must be an integer'}), 400
+
+    # 已结账月份的工资不能改价，需要时先重开或缩小日期区间
+    try:
+        payroll.ensure_range_open(start, end)
+    except payroll.PeriodClosed as e:
+        return jsonify({'message': str(e)}), 409
+
+    result = wage_reprice.preview(spec.id, start, end, price)
+    result.update({
+        'spec_model_id': spec.id,
+        'price': float(price),
+        'dry_run': bool(data.get('dry_run'))
+    })
+    if data.get('dry_run'):
+        return jsonify(result), 200
+
+    try:
+        result['updated'] = wage_reprice.apply(spec.id, start, end, price, batch_size)
+    except wage_reprice.RepriceInterrupted as e:
+        # 前面的批次已提交，告诉调用方改了多少；用同样参数重新调用会接着改剩下的行
+        return jsonify({
+            'message': 'Reprice interrupted; earlier batches are committed, call again with the same parameters to continue',
+            'error': str(e),
+            'partial': True,
+            'updated': e.updated,
+            'last_id': e.last_id
+        }), 500
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': str(e)}), 400
+
+    return jsonify(result), 200
+
+
+def _parse_date(value):
+    if not value:
+        return None
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+def _covers_today(record):
+    """规格型号上的单价始终是今天生效的那条"""
+    today = date.today()
+    return (record.effective_from is None or record.effective_from <= today) and \
+        (record.effective_to is None or record.effective_to >= today)
+
+
+def _price_to_dict(p):
+    return {
+        'id': p.id,
+        'spec_model_id': p.spec_model_id,
+        'price': float(p.price),
+        'effective_from': p.effective_from.strftime('%Y-%m-%d') if p.effective_from else None,
+        'effective_to': p.effective_to.strftime('%Y-%m-%d') if p.effective_to else None,
+        'remark': p.remark
+    }
+
+
+# 规格型号单价历史
+@spec_model_bp.route('/<int:id>/prices', methods=['GET'])
+@login_required
+def get_spec_model_prices(id):
+    spec = SpecModel.query.get(id)
+    if not spec:
+        return jsonify({'message': 'Spec model not found'}), 404
+
+    prices = SpecModelPrice.query.filter_by(spec_model_id=id).all()
+    prices.sort(key=lambda p: p.effective_from or date.min)
+    return jsonify({
+        'spec_model_id': id,
+        'current_price': float(spec.price),
+        'prices': [_price_to_dict(p) for p in prices]
+    }), 200
+
+
+# 新增 / 修改某日起生效的单价
+@spec_model_bp.route('/<int:id>/prices', methods=['POST'])
+@roles_required('管理员')
+def add_spec_model_price(id):
+    """
+    JSON 参数：
+    - price: 单价
+    - effective_from: YYYY-MM-DD，生效日期，省略表示最早以来；同一生效日期已有记录时覆盖
+    - remark: 备注，可省略
+    已录入的工资记录不会自动改价，需要时调用 /<id>/reprice
+    """
+    spec = SpecModel.query.get(id)
+    if not spec:
+        return jsonify({'message': 'Spec model not found'}), 404
+
+    data = request.get_json() or {}
+    try:
+        price = Decimal(str(data['price']))
+    except (KeyError, InvalidOperation):
+        return jsonify({'message': 'price must be a number'}), 400
+    try:
+        effective_from = _parse_date(data.get('effective_from'))
+    except ValueError:
+        return jsonify({'message': 'Invalid date format. Use YYYY-MM-DD.'}), 400
+
+    try:
+        record = spec_prices.record_price(spec.id, price, effective_from, data.get('remark'))
+        if _covers_today(record):
+            spec.price = price
+        ref_data.changed()
+        db.session.commit()
+        spec_prices.price_index.invalidate()
+        ref_data.refresh()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': str(e)}), 400
+
+    return jsonify({'message': 'Spec model price saved', 'price': _price_to_dict(record)}), 201
@@ -1,8 +1,13 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, current_app, stream_with_context
+from sqlalchemy import and_, or_, func, select
 from db_config import db
-from models import WageLog, Worker, Process, SpecModel
+from models import WageLog, WageLogArchive, Worker, Process, WageDailySummary
 from utils.decorators import login_required
-from datetime import datetime
+from utils.wage_import import WageImporter, iter_csv_rows, iter_ndjson_rows
+from utils import wage_calc, wage_summary, wage_export, spec_prices, payroll, wage_archive, ref_data
+from utils import roster_index, cache_versions, http_cache
+from datetime import datetime, date
+import calendar
 import pytz
 
 wagelog_bp = Blueprint('wagelog', __name__)
@@ -10,44 +15,201 @@ wagelog_bp = Blueprint('wagelog', __name__)
 utc = pytz.utc
 china = pytz.timezone('Asia/Shanghai')
 
+# 影响工资日汇总表的字段
+SUMMARY_FIELDS = ('date', 'worker_id', 'process_id', 'spec_model_id', 'quantity', 'total_wage')
+# 修改时请求里有这些字段才重算 / 比对工资，否则保留原来的 total_wage
+WAGE_FIELDS = ('actual_price', 'quantity', 'actual_group_size', 'total_wage')
+
+PAGE_SIZE_DEFAULT = 500
+PAGE_SIZE_MAX = 2000
+STREAM_CHUNK_SIZE = 1000
+
+
+def _wage_log_list_query(source=None):
+    """
+    工资记录列表的列投影：工人名用 OUTER JOIN 一次取出，不逐行懒加载 ORM 对象；
+    工序名、规格名不再 JOIN，序列化时从参考数据缓存里取（见 _wage_log_row_to_dict）
+    source: 工资记录来源（wage_archive.wage_log_source() 的结果），默认只查 wage_logs
+    """
+    logs = WageLog.__table__ if source is None else source
+
+    query = (
+        db.session.query(
+            logs.c.id,
+            logs.c.worker_id,
+            Worker.name.label('worker'),
+            logs.c.process_id,
+            logs.c.spec_model_id,
+            logs.c.date,
+            logs.c.actual_price,
+            logs.c.actual_group_size,
+            logs.c.quantity,
+            logs.c.total_wage,
+            logs.c.remark,
+            logs.c.created_at,
+            logs.c.updated_at,
+        )
+        .select_from(logs)
+        .outerjoin(Worker, logs.c.worker_id == Worker.id)
+    )
+    return query
+
+
+def _wage_log_row_to_dict(row, ref=None):
+    """ref: 参考数据（ref_data.get()），传了就带上工序名、规格名"""
+    item = {
+        'id': row.id,
+        'worker_id': row.worker_id,
+        'worker': row.worker,
+        'process_id': row.process_id,
+        'spec_model_id': row.spec_model_id,
+    }
+    if ref is not None:
+        item['process'] = ref.process_names.get(row.process_id)
+        item['spec_model'] = ref.spec_names.get(row.spec_model_id)
+    item.update({
+        'date': row.date.strftime('%Y-%m-%d'),
+        'actual_price': float(row.actual_price),
+        'actual_group_size': row.actual_group_size,
+        'quantity': row.quantity,
+        'total_wage': float(row.total_wage),
+        'remark': row.remark,
+        'created_at': row.created_at.strftime('%Y-%m-%d %H:%M'),
+        'updated_at': row.updated_at.strftime('%Y-%m-%d %H:%M')
+    })
+    return item
+
+
+def _filter_wage_logs(args):
+    """
+    综合查询 / 导出共用的过滤条件：start_date、end_date、worker_id、process_id
+    按日期区间决定查 wage_logs、归档表还是两者合并，返回 (query, 工资记录来源)
+    """
+    start_date_str = args.get('start_date')
+    end_date_str = args.get('end_date')
+    worker_id = args.get('worker_id')
+    process_id = args.get('process_id')
+
+    start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date() if start_date_str else None
+    end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date() if end_date_str else None
+
+    logs = wage_archive.wage_log_source(start_date, end_date)
+    query = _wage_log_list_query(logs)
+
+    # 日期区间过滤
+    if start_date:
+        query = query.filter(logs.c.date >= start_date)
+    if end_date:
+        query = query.filter(logs.c.date <= end_date)
+
+    # 工人姓名模糊查询
+    if worker_id:
+        # query = query.join(Worker).filter(Worker.name.ilike(f'%{worker_name}%'))
+        query = query.filter(logs.c.worker_id == worker_id)
+    # 工序过滤
+    if process_id:
+        query = query.filter(logs.c.process_id == process_id)
+    return query, logs
+
+
+def _parse_cursor(cursor):
+    """游标格式: 'YYYY-MM-DD_id'，即上一页最后一条的 (date, id)"""
+    date_part, id_part = cursor.rsplit('_', 1)
+    return datetime.strptime(date_part, '%Y-%m-%d').date(), int(id_part)
+
+
+def _stream_wage_logs(query):
+    """
+    分块流式输出 {"wage_logs": [...]}
+    yield_per 走服务端游标，每次只取 STREAM_CHUNK_SIZE 行，内存占用与总行数无关
+    """
+    dumps = current_app.json.dumps
+
+    def generate():
+        yield '{"wage_logs":['
+        first = True
+        chunk = []
+        for row in query.yield_per(STREAM_CHUNK_SIZE):
+            chunk.append(dumps(_wage_log_row_to_dict(row)))
+            if len(chunk) >= STREAM_CHUNK_SIZE:
+                yield ('' if first else ',') + ','.join(chunk)
+                first = False
+                chunk = []
+        if chunk:
+            yield ('' if first else ',') + ','.join(chunk)
+        yield ']}'
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+
 # 获取所有工资记录
+# - date=YYYY-MM-DD: 查询某一天
+# - limit / cursor: 按 (date, id) 游标分页，返回 next_cursor，没有下一页时为 null
+# - 都不传: 按 (date, id) 顺序流式返回全部记录（格式与原来一致）
 @wagelog_bp.route('/', methods=['GET'])
 @login_required
 def get_wage_logs():
     try:
         date_str = request.args.get('date')  # 获取查询参数中的日期
+        cursor = request.args.get('cursor')
+        limit = request.args.get('limit')
 
+        query_date = last_date = last_id = None
         if date_str:
             try:
                 query_date = datetime.strptime(date_str, '%Y-%m-%d').date()
             except ValueError:
                 return jsonify({'message': 'Invalid date format. Use YYYY-MM-DD.'}), 400
-
-            logs = WageLog.query.filter_by(date=query_date).all()
-        else:
-            logs = WageLog.query.all()
+        if cursor:
+            try:
+                last_date, last_id = _parse_cursor(cursor)
+            except ValueError:
+                return jsonify({'message': 'Invalid cursor'}), 400
+        # limit=0 / 非数字不能当作没传，否则会走到下面的全表流式输出
+        if limit is not None:
+            try:
+                limit = int(limit)
+            except ValueError:
+                return jsonify({'message': 'limit must be a positive integer'}), 400
+            if limit <= 0:
+                return jsonify({'message': 'limit must be a positive integer'}), 400
+
+        # 查某一天 / 从游标往后翻页时，早于该日期的归档数据不用查
+        logs = wage_archive.wage_log_source(query_date or last_date, query_date)
+        query = _wage_log_list_query(source=logs)
+        if query_date:
+            query = query.filter(logs.c.date == query_date)
+
+        query = query.order_by(logs.c.date, logs.c.id)
+
+        if cursor or limit is not None:
+            limit = min(limit or PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX)
+
+            if cursor:
+                query = query.filter(or_(
+                    logs.c.date > last_date,
+                    and_(logs.c.date == last_date, logs.c.id > last_id)
+                ))
+
+            rows = query.limit(limit + 1).all()
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            next_cursor = None
+            if has_more:
+                last = rows[-1]
+                next_cursor = f"{last.date.strftime('%Y-%m-%d')}_{last.id}"
+
+            return jsonify({
+                'wage_logs': [_wage_log_row_to_dict(row) for row in rows],
+                'next_cursor': next_cursor
+            }), 200
+
+        if not date_str:
+            return _stream_wage_logs(query)
 
         # print('工资记录：', logs)
 
-        log_list = [
-            {
-                'id': log.id,
-                'worker_id': log.worker_id,
-                'worker': log.worker.name if log.worker else None,
-                'process_id': log.process_id,
-                # 'process': log.process.name if log.process else None,
-                'spec_model_id': log.spec_model_id,
-                # 'spec_model': log.spec_model.name if log.spec_model else None,
-                'date': log.date.strftime('%Y-%m-%d'),
-                'actual_price': float(log.actual_price),
-                'actual_group_size': log.actual_group_size,
-                'quantity': log.quantity,
-                'total_wage': float(log.total_wage),
-                'remark': log.remark,
-                'created_at': log.created_at.strftime('%Y-%m-%d %H:%M'),
-                'updated_at': log.updated_at.strftime('%Y-%m-%d %H:%M')
-            } for log in logs
-        ]
+        log_list = [_wage_log_row_to_dict(row) for row in query.all()]
         return jsonify({'wage_logs': log_list}), 200
     except Exception as e:
         print(f"Error fetching wage logs: {e}")
@@ -55,24 +217,85 @@ def get_wage_logs():
 
 
 
+# 工资录入页面打开时需要的全部数据，一次请求返回
+@wagelog_bp.route('/bootstrap', methods=['GET'])
+@login_required
+def wage_entry_bootstrap():
+    """
+    查询参数：date=YYYY-MM-DD，必填
+
+    返回工序、规格型号（specs_by_process 为 工序 id -> 规格 id 列表）、当天在职工人、当天已录入的工资记录，
+    代替原来的 /api/processes、/api/specmodels、逐个工序的 /by_process、/api/workers?date= 几次串行请求。
+    工序 / 规格 / 工人都来自进程内缓存，工资记录一条查询；
+    ETag 由参考数据版本号、工人版本、当天工资记录的条数和最后修改时间决定，未变化时返回 304；响应 gzip 压缩
+    """
+    date_str = request.args.get('date')
+    if not date_str:
+        return jsonify({'message': 'date is required, format YYYY-MM-DD'}), 400
+    try:
+        query_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+    except ValueError:
+        return jsonify({'message': 'Invalid date format. Use YYYY-MM-DD.'}), 400
+
+    ref_version = cache_versions.reference_version()
+    roster_version = roster_index.roster_version()
+    logs = wage_archive.wage_log_source(query_date, query_date)
+    log_stats = db.session.execute(
+        select(func.count(logs.c.id), func.max(logs.c.id), func.max(logs.c.updated_at))
+        .where(logs.c.date == query_date)
+    ).one()
+
+    etag = http_cache.make_etag('wage_entry', date_str, ref_version, roster_version, *log_stats)
+    not_modified = http_cache.not_modified(etag)
+    if not_modified is not None:
+        return not_modified
+
+    ref = ref_data.get(ref_version)
+    rows = (
+        _wage_log_list_query(logs)
+        .filter(logs.c.date == query_date)
+        .order_by(logs.c.id)
+        .all()
+    )
+
+    response = jsonify({
+        'date': date_str,
+        'processes': ref.processes,
+        'spec_models': ref.spec_models,
+        'specs_by_process': {
+            process_id: [s['id'] for s in specs] for process_id, specs in ref.specs_by_process.items()
+        },
+        'workers': roster_index.active_on(query_date, roster_version),
+        'wage_logs': [_wage_log_row_to_dict(row) for row in rows]
+    })
+    return http_cache.gzip_response(http_cache.with_etag(response, etag))
+
+
 # 获取单条工资记录
 @wagelog_bp.route('/<int:id>', methods=['GET'])
 def get_wage_log(id):
     log = WageLog.query.get(id)
+    # 不在 wage_logs 里的再查归档表（归档时 id 不变）；归档的记录只读，修改 / 删除仍只查 wage_logs
+    archived = log is None
+    if archived:
+        log = db.session.get(WageLogArchive, id)
     if not log:
         return jsonify({'message': 'Wage log not found'}), 404
 
     created_at_utc = utc.localize(log.created_at)
     updated_at_utc = utc.localize(log.updated_at)
+    # 归档表没有外键关系，名称统一按 id 取：工人按主键查一次，工序 / 规格名取自参考数据缓存
+    worker = db.session.get(Worker, log.worker_id)
+    ref = ref_data.get()
 
     return jsonify({
         'id': log.id,
         'worker_id': log.worker_id,
-        'worker': log.worker.name if log.worker else None,
+        'worker': worker.name if worker else None,
         'process_id': log.process_id,
-        'process': log.process.name if log.process else None,
+        'process': ref.process_names.get(log.process_id),
         'spec_model_id': log.spec_model_id,
-        'spec_model': log.spec_model.name if log.spec_model else None,
+        'spec_model': ref.spec_names.get(log.spec_model_id),
         'date': log.date.strftime('%Y-%m-%d'),
         'actual_price': float(log.actual_price),
         'actual_group_size': log.actual_group_size,
@@ -80,7 +303,8 @@ def get_wage_log(id):
         'total_wage': float(log.total_wage),
         'remark': log.remark,
         'created_at': created_at_utc.astimezone(china).strftime('%Y-%m-%d %H:%M'),
-        'updated_at': updated_at_utc.astimezone(china).strftime('%Y-%m-%d %H:%M')
+        'updated_at': updated_at_utc.astimezone(china).strftime('%Y-%m-%d %H:%M'),
+        'archived': archived
     }), 200
 
 
@@ -88,27 +312,66 @@ def get_wage_log(id):
 @wagelog_bp.route('/', methods=['POST'])
 def add_wage_log():
     data = request.get_json()
-    print("data:",data)
-    required_fields = ['worker_id', 'process_id', 'spec_model_id', 'actual_price', 'quantity', 'total_wage']
-    if not all(field in data for field in required_fields):
+    # actual_price 不传时取规格型号单价，total_wage 由服务端计算（前端传了则做比对）
+    required_fields = ['worker_id', 'process_id', 'spec_model_id', 'date', 'quantity']
+    if not data or not all(field in data for field in required_fields):
         return jsonify({'message': 'Missing required fields'}), 400
 
     try:
+        log_date = datetime.strptime(data['date'], '%Y-%m-%d').date()
+        payroll.ensure_open(log_date)
+
+        ref = ref_data.get()
+        if int(data['process_id']) in ref.disabled_process_ids:
+            return jsonify({'message': 'Process is disabled'}), 400
+        if int(data['spec_model_id']) in ref.disabled_spec_ids:
+            return jsonify({'message': 'Spec model is disabled'}), 400
+
+        actual_price = data.get('actual_price')
+        if actual_price in (None, ''):
+            spec_model_id = int(data['spec_model_id'])
+            current_prices = ref.spec_prices
+            if spec_model_id not in current_prices:
+                return jsonify({'message': 'Spec model not found'}), 400
+            # 按工资日期取当时的单价，没有历史单价时用规格型号当前单价
+            actual_price = spec_prices.price_at(spec_model_id, log_date)
+            if actual_price is None:
+                actual_price = current_prices[spec_model_id]
+
+        wage = {
+            'actual_price': actual_price,
+            'quantity': int(data['quantity']),
+            'actual_group_size': int(data.get('actual_group_size') or 1),
+            'total_wage': data.get('total_wage'),
+        }
+        mismatches, rejected = wage_calc.reconcile([wage])
+        if rejected:
+            return jsonify({'message': '工资与服务端计算结果不一致', 'wage_mismatch': mismatches[0]}), 400
+
         new_log = WageLog(
             worker_id=data['worker_id'],
             process_id=data['process_id'],
             spec_model_id=data['spec_model_id'],
-            date=datetime.strptime(data['date'], '%Y-%m-%d').date(),
-            actual_price=data['actual_price'],
-            actual_group_size=data['actual_group_size'],
-            quantity=data['quantity'],
-            total_wage=data['total_wage'],
+            date=log_date,
+            actual_price=wage['actual_price'],
+            actual_group_size=wage['actual_group_size'],
+            quantity=wage['quantity'],
+            total_wage=wage['total_wage'],
             remark=data.get('remark', '')
         )
         db.session.add(new_log)
+        wage_summary.add_logs([new_log])
         db.session.commit()
 
-        return jsonify({'message': 'Wage log created successfully', 'id': new_log.id}), 201
+        return jsonify({
+            'message': 'Wage log created successfully',
+            'id': new_log.id,
+            'total_wage': float(new_log.total_wage),
+            'wage_mismatch': mismatches[0] if mismatches else None
+        }), 201
+    except payroll.PeriodClosed as e:
+        db.session.rollback()
+        return jsonify({'message': str(e)}), 409
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': str(e)}), 400
@@ -123,20 +386,58 @@ def update_wage_log(id):
 
     data = request.get_json()
     try:
+        # 记下修改前的汇总键和数值，提交前把汇总表从旧格子挪到新格子
+        old_values = {f: getattr(log, f) for f in SUMMARY_FIELDS}
+
         log.worker_id = data.get('worker_id', log.worker_id)
         log.process_id = data.get('process_id', log.process_id)
         log.spec_model_id = data.get('spec_model_id', log.spec_model_id)
+        # 改到已停用的工序 / 规格型号时与新增一样拒绝；没改这两个字段的照常修改
+        ref = ref_data.get()
+        if int(log.process_id) != old_values['process_id'] and int(log.process_id) in ref.disabled_process_ids:
+            db.session.rollback()
+            return jsonify({'message': 'Process is disabled'}), 400
+        if int(log.spec_model_id) != old_values['spec_model_id'] and int(log.spec_model_id) in ref.disabled_spec_ids:
+            db.session.rollback()
+            return jsonify({'message': 'Spec model is disabled'}), 400
         if 'date' in data:
             log.date = datetime.strptime(data['date'], '%Y-%m-%d').date()
+        # 原日期和新日期所在月份都不能已结账
+        payroll.ensure_open(old_values['date'], log.date)
         log.actual_price = data.get('actual_price', log.actual_price)
         log.actual_group_size = data.get('actual_group_size', log.actual_group_size)
         log.quantity = data.get('quantity', log.quantity)
-        log.total_wage = data.get('total_wage', log.total_wage)
         log.remark = data.get('remark', log.remark)
-        
 
+        # 传了单价 / 数量 / 组人数时工资一并重算，传了 total_wage 则做比对；
+        # 只改备注、日期等其他字段时不动 total_wage（按当前规则重算可能改掉历史金额）
+        mismatches = []
+        if any(f in data for f in WAGE_FIELDS):
+            wage = {
+                'actual_price': log.actual_price,
+                'quantity': int(log.quantity),
+                'actual_group_size': int(log.actual_group_size),
+                'total_wage': data.get('total_wage'),
+            }
+            mismatches, rejected = wage_calc.reconcile([wage])
+            if rejected:
+                db.session.rollback()
+                return jsonify({'message': '工资与服务端计算结果不一致', 'wage_mismatch': mismatches[0]}), 400
+            log.quantity = wage['quantity']
+            log.actual_group_size = wage['actual_group_size']
+            log.total_wage = wage['total_wage']
+
+        deltas = wage_summary.collect([old_values], -1)
+        wage_summary.apply_deltas(wage_summary.collect([log], 1, deltas))
         db.session.commit()
-        return jsonify({'message': 'Wage log updated successfully'}), 200
+        return jsonify({
+            'message': 'Wage log updated successfully',
+            'total_wage': float(log.total_wage),
+            'wage_mismatch': mismatches[0] if mismatches else None
+        }), 200
+    except payroll.PeriodClosed as e:
+        db.session.rollback()
+        return jsonify({'message': str(e)}), 409
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': str(e)}), 400
@@ -150,9 +451,13 @@ def delete_wage_log(id):
         return jsonify({'message': 'Wage log not found'}), 404
 
     try:
+        payroll.ensure_open(log.date)
+        wage_summary.remove_logs([log])
         db.session.delete(log)
         db.session.commit()
         return jsonify({'message': 'Wage log deleted successfully'}), 200
+    except payroll.PeriodClosed as e:
+        return jsonify({'message': str(e)}), 409
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': str(e)}), 400
@@ -162,58 +467,60 @@ def delete_wage_log(id):
 @login_required
 def query_wage_logs():
     try:
-        start_date_str = request.args.get('start_date')
-        end_date_str = request.args.get('end_date')
-        worker_id = request.args.get('worker_id')
-        process_id = request.args.get('process_id')
-
-        query = WageLog.query
-
-        # 日期区间过滤
-        if start_date_str:
-            start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
-            query = query.filter(WageLog.date >= start_date)
-        if end_date_str:
-            end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
-            query = query.filter(WageLog.date <= end_date)
-
-        # 工人姓名模糊查询
-        if worker_id:
-            # query = query.join(Worker).filter(Worker.name.ilike(f'%{worker_name}%'))
-            query = query.filter(WageLog.worker_id == worker_id)
-        # 工序过滤
-        if process_id:
-            query = query.filter(WageLog.process_id == process_id)
+        # 一条 SQL 取出记录和工人名称，工序 / 规格名称取自参考数据缓存，不再逐行懒加载（原来是 3N+1 条查询）
+        query, logs = _filter_wage_logs(request.args)
 
         #logs = query.all()
-        logs = query.order_by(WageLog.date, WageLog.process_id, WageLog.spec_model_id).all()
+        rows = query.order_by(logs.c.date, logs.c.process_id, logs.c.spec_model_id).all()
 
-        log_list = [
-            {
-                'id': log.id,
-                'worker_id': log.worker_id,
-                'worker': log.worker.name if log.worker else None,
-                'process_id': log.process_id,
-                'process': log.process.name if log.process else None,
-                'spec_model_id': log.spec_model_id,
-                'spec_model': log.spec_model.name if log.spec_model else None,
-                'date': log.date.strftime('%Y-%m-%d'),
-                'actual_price': float(log.actual_price),
-                'actual_group_size': log.actual_group_size,
-                'quantity': log.quantity,
-                'total_wage': float(log.total_wage),
-                'remark': log.remark,
-                'created_at': log.created_at.strftime('%Y-%m-%d %H:%M'),
-                'updated_at': log.updated_at.strftime('%Y-%m-%d %H:%M')
-            } for log in logs
-        ]
-        print("综合查询:", log_list)
+        ref = ref_data.get()
+        log_list = [_wage_log_row_to_dict(row, ref) for row in rows]
         return jsonify({'wage_logs': log_list}), 200
 
     except Exception as e:
         print(f"Error querying wage logs: {e}")
         return jsonify({'message': 'Failed to query wage logs', 'error': str(e)}), 400
 
+# 按期间导出工资记录（CSV / Excel），按工人分组并带小计
+@wagelog_bp.route('/export', methods=['GET'])
+@login_required
+def export_wage_logs():
+    """
+    过滤参数同 /query: start_date、end_date、worker_id、process_id
+    format: csv（默认）/ xlsx（openpyxl，见 requirements.txt）
+    """
+    fmt = request.args.get('format', 'csv')
+    if fmt not in ('csv', 'xlsx'):
+        return jsonify({'message': 'format must be csv or xlsx'}), 400
+    if fmt == 'xlsx' and not wage_export.xlsx_available():
+        return jsonify({'message': '服务器未安装 openpyxl，请使用 format=csv'}), 400
+
+    try:
+        query, logs = _filter_wage_logs(request.args)
+    except ValueError:
+        return jsonify({'message': 'Invalid date format. Use YYYY-MM-DD.'}), 400
+
+    # 按工人分组才能在每组结束时输出小计
+    query = query.order_by(logs.c.worker_id, logs.c.date, logs.c.process_id, logs.c.spec_model_id)
+
+    start = request.args.get('start_date') or 'all'
+    end = request.args.get('end_date') or 'all'
+    filename = f'wage_logs_{start}_{end}.{fmt}'
+
+    if fmt == 'csv':
+        body = wage_export.stream_csv(query, ref_data.get())
+        mimetype = 'text/csv; charset=utf-8'
+    else:
+        body = wage_export.stream_xlsx(query, ref_data.get())
+        mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+
 # 批量导入工资记录
 @wagelog_bp.route('/batch_import', methods=['POST'])
 @login_required
@@ -224,52 +531,200 @@ def batch_import_wage_logs():
     {
         worker_id, process_id, spec_model_id, date, actual_price, quantity, total_wage, actual_group_size, remark
     }
+    actual_price 可省略（取规格型号单价），actual_group_size 可省略（默认 1）；
+    total_wage 由服务端整批计算，前端传了且不一致的行列在 wage_mismatches 中（处理方式见 WAGE_TOTAL_POLICY）
+
+    查询参数：
+    - atomic=1（默认）: 整批一个事务，全部校验写入后一次提交
+    - atomic=0: 每 batch_size 行提交一次，失败时返回 committed（已提交到第几行），
+      修正后带 offset=committed 重新提交同一份数据即可从断点继续
+    - offset: 跳过数组前 offset 行
+
+    被拒绝的行不会写入，返回 rejected: [{line, reason}]，line 为数组下标（从 0 开始）
     """
+    data = request.get_json(silent=True)
+    if not isinstance(data, list):
+        return jsonify({'success': False, 'message': '数据格式错误，需为数组'}), 400
+
+    atomic = request.args.get('atomic', '1') != '0'
+    offset = request.args.get('offset', 0, type=int)
+    total = len(data)
+
+    importer = WageImporter()
+    committed = offset
+    committed_inserted = 0
     try:
-        data = request.get_json()
-        if not isinstance(data, list):
-            return jsonify({'success': False, 'message': '数据格式错误，需为数组'}), 400
-
-        batch_size = 500  # 每次插入数量，防止一次插入过大
-        total = len(data)
-        inserted_count = 0
-        print("准备批量导入的数据：", data)
-        for i in range(0, total, batch_size):
-            chunk = data[i:i+batch_size]
-            wage_objs = []
-
-            for row in chunk:
-                # 必填字段检查
-                required_fields = ['worker_id', 'process_id', 'spec_model_id', 'date', 'actual_price', 'quantity', 'total_wage', 'actual_group_size']
-                if not all(field in row for field in required_fields):
-                    continue  # 跳过缺失字段的行
-
-                # 构建 WageLog 对象
-                wage = WageLog(
-                    worker_id=row['worker_id'],
-                    process_id=row['process_id'],
-                    spec_model_id=row['spec_model_id'],
-                    date=datetime.strptime(row['date'], '%Y-%m-%d').date(),
-                    actual_price=row['actual_price'],
-                    quantity=row['quantity'],
-                    total_wage=row['total_wage'],
-                    actual_group_size=row.get('actual_group_size', 1),
-                    remark=row.get('remark', '')
-                )
-                wage_objs.append(wage)
-
-            # 批量写入
-            if wage_objs:
-                db.session.bulk_save_objects(wage_objs)
+        for i in range(offset, total):
+            importer.add(data[i], i)
+            if not atomic and not importer.pending:
+                # 前面的行都已写入或被拒绝，分批模式下立即提交
                 db.session.commit()
-                inserted_count += len(wage_objs)
+                committed = i + 1
+                committed_inserted = importer.inserted
+
+        importer.flush()
+        db.session.commit()
+        committed = total
 
+    except Exception as e:
+        db.session.rollback()
         return jsonify({
-            'success': True,
-            'inserted': inserted_count,
-            'total': total
-        }), 200
+            'success': False,
+            'message': str(e),
+            'total': total,
+            'committed': committed,
+            **importer.report(),
+            'inserted': committed_inserted
+        }), 500
+
+    return jsonify({
+        'success': True,
+        'total': total,
+        'committed': committed,
+        **importer.report()
+    }), 200
+
+
+# 流式导入工资记录（CSV / NDJSON）
+@wagelog_bp.route('/import_stream', methods=['POST'])
+@login_required
+def import_wage_logs_stream():
+    """
+    从请求体流式导入工资记录，边读边解析边写入，内存占用与文件大小无关
+    - format=csv: 第一行为表头，字段名同 batch_import；Content-Type 为 text/csv 时可省略
+    - format=ndjson: 每行一个 JSON 对象；Content-Type 为 application/x-ndjson 时可省略
+
+    每写入一批（batch_size 行）提交一次，返回 committed_line（已提交到文件第几行）；
+    中途失败时修正后带 skip=committed_line 重新上传整个文件即可从断点继续。
+    rejected 中的 line 为文件行号（CSV 表头是第 1 行）
+    """
+    fmt = request.args.get('format')
+    if not fmt:
+        mimetype = request.mimetype or ''
+        fmt = 'ndjson' if 'ndjson' in mimetype or 'jsonlines' in mimetype else 'csv'
+    if fmt not in ('csv', 'ndjson'):
+        return jsonify({'success': False, 'message': 'format 只支持 csv / ndjson'}), 400
+
+    skip = request.args.get('skip', 0, type=int)
+    batch_size = min(request.args.get('batch_size', 1000, type=int), 5000)
+    rows = iter_csv_rows(request.stream) if fmt == 'csv' else iter_ndjson_rows(request.stream)
+
+    importer = WageImporter(batch_size=max(batch_size, 1))
+    processed = 0
+    last_line = skip
+    committed_line = skip
+    committed_inserted = 0
+    try:
+        for line_no, row in rows:
+            last_line = line_no
+            if line_no <= skip:
+                continue
+            processed += 1
+            importer.add(row, line_no)
+            if not importer.pending:
+                db.session.commit()
+                committed_line = line_no
+                committed_inserted = importer.inserted
+
+        importer.flush()
+        db.session.commit()
+        committed_line = last_line
+        committed_inserted = importer.inserted
 
     except Exception as e:
         db.session.rollback()
-        return jsonify({'success': False, 'message': str(e)}), 500
+        return jsonify({
+            'success': False,
+            'message': str(e),
+            'processed': processed,
+            'committed_line': committed_line,
+            **importer.report(),
+            'inserted': committed_inserted
+        }), 500
+
+    return jsonify({
+        'success': True,
+        'processed': processed,
+        'committed_line': committed_line,
+        **importer.report()
+    }), 200
+
+
+def _month_range(month_str):
+    """'YYYY-MM' -> (当月第一天, 当月最后一天)"""
+    month_start = datetime.strptime(month_str, '%Y-%m').date()
+    last_day = calendar.monthrange(month_start.year, month_start.month)[1]
+    return month_start, date(month_start.year, month_start.month, last_day)
+
+
+# 月度工资汇总（读工资日汇总表，不扫明细）
+@wagelog_bp.route('/summary/monthly', methods=['GET'])
+@login_required
+def monthly_wage_summary():
+    """
+    查询参数：
+    - month: YYYY-MM，必填
+    - by: worker（默认，按工人汇总）/ process（按工序汇总）
+    - worker_id / process_id: 可选过滤
+    """
+    month_str = request.args.get('month')
+    by = request.args.get('by', 'worker')
+    worker_id = request.args.get('worker_id', type=int)
+    process_id = request.args.get('process_id', type=int)
+
+    if not month_str:
+        return jsonify({'message': 'month is required, format YYYY-MM'}), 400
+    try:
+        month_start, month_end = _month_range(month_str)
+    except ValueError:
+        return jsonify({'message': 'Invalid month format. Use YYYY-MM.'}), 400
+
+    if by == 'worker':
+        group_col, name_model = WageDailySummary.worker_id, Worker
+    elif by == 'process':
+        group_col, name_model = WageDailySummary.process_id, Process
+    else:
+        return jsonify({'message': 'by must be worker or process'}), 400
+
+    # 已结账月份直接读工资单快照
+    period = payroll.get_closed_period(month_str)
+    if period is not None:
+        rows = payroll.monthly_summary(period, by, worker_id, process_id)
+        return _monthly_summary_response(month_str, by, rows, closed=True)
+
+    query = (
+        db.session.query(
+            group_col.label('id'),
+            name_model.name.label('name'),
+            func.sum(WageDailySummary.quantity).label('quantity'),
+            func.sum(WageDailySummary.total_wage).label('total_wage'),
+            func.sum(WageDailySummary.log_count).label('log_count'),
+        )
+        .outerjoin(name_model, name_model.id == group_col)
+        .filter(WageDailySummary.date >= month_start, WageDailySummary.date <= month_end)
+    )
+    if worker_id:
+        query = query.filter(WageDailySummary.worker_id == worker_id)
+    if process_id:
+        query = query.filter(WageDailySummary.process_id == process_id)
+
+    rows = query.group_by(group_col, name_model.name).order_by(group_col).all()
+    return _monthly_summary_response(month_str, by, rows, closed=False)
+
+
+def _monthly_summary_response(month_str, by, rows, closed):
+    return jsonify({
+        'month': month_str,
+        'by': by,
+        'closed': closed,
+        'items': [
+            {
+                f'{by}_id': row.id,
+                by: row.name,
+                'quantity': int(row.quantity or 0),
+                'total_wage': float(row.total_wage or 0),
+                'log_count': int(row.log_count or 0)
+            } for row in rows
+        ],
+        'total_wage': float(sum((row.total_wage or 0) for row in rows))
+    }), 200
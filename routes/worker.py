@@ -1,9 +1,10 @@
 from datetime import datetime
 from flask import Blueprint, request, jsonify
-from sqlalchemy import or_
+from sqlalchemy.orm import joinedload
 from db_config import db
 from models import Worker,Process
 from utils.decorators import login_required
+from utils import roster_index, http_cache, worker_upsert
 import pytz
 
 worker_bp = Blueprint('worker', __name__)
@@ -12,48 +13,38 @@ utc = pytz.utc
 china = pytz.timezone('Asia/Shanghai')
 
 # 工人列表
+# 各录入终端会轮询这个接口：先按主键查一次工人名单版本号（每次写入都会递增）算 ETag，未变化时返回 304，不查明细也不序列化
 @worker_bp.route('/', methods=['GET'])
 @login_required
 def get_workers():
     try:
-        # 查询所有工人数据
         date_str = request.args.get('date')  # 获取查询参数中的日期
 
+        query_date = None
         if date_str:
             try:
                 query_date = datetime.strptime(date_str, '%Y-%m-%d').date()
             except ValueError:
                 return jsonify({'message': 'Invalid date format. Use YYYY-MM-DD.'}), 400
 
-            workers = Worker.query.filter(
-                Worker.entry_date <= query_date,
-                or_(Worker.leave_date.is_(None), Worker.leave_date >= query_date)
-            ).all()
+        version = roster_index.roster_version()
+        etag = http_cache.make_etag('workers', date_str, version)
+        not_modified = http_cache.not_modified(etag)
+        if not_modified is not None:
+            return not_modified
 
+        if query_date:
+            # 某天在职的工人走内存里的在职区间索引，不查库
+            worker_list = roster_index.active_on(query_date, version)
         else:
-            workers = Worker.query.all()
-        #workers = Worker.query.all()
-        #print("所有工人：", workers)
-        # 构造返回的数据
-        worker_list = [
-            {
-                'id': worker.id,
-                'name': worker.name,
-                'id_card': worker.id_card,
-                'remark': worker.remark,
-                'group': worker.group,
-                'entry_date': worker.entry_date.strftime('%Y-%m-%d'),
-                'leave_date': worker.leave_date.strftime('%Y-%m-%d') if worker.leave_date else None,
-                'status': worker.status,
-                'process': {
-                    'id': worker.process.id,
-                    'name': worker.process.name
-                } if worker.process else None
-            }
-            for worker in workers
-        ]
-        #print("序列化工人列表:",worker_list)
-        return jsonify({'workers': worker_list}), 200
+            # 工序随工人一起查出来（一次 JOIN），不再逐行懒加载
+            workers = Worker.query.options(joinedload(Worker.process)).order_by(Worker.id).all()
+            worker_list = [
+                roster_index.worker_to_dict(worker, worker.process.name if worker.process else None)
+                for worker in workers
+            ]
+
+        return http_cache.with_etag(jsonify({'workers': worker_list}), etag)
     except Exception as e:
         # 记录详细错误信息
         print(f"Error occurred: {e}")
@@ -119,7 +110,9 @@ def add_worker():
         )
 
         db.session.add(new_worker)
+        roster_index.changed()
         db.session.commit()
+        roster_index.refresh()
 
         return jsonify({
             'message': '工人创建成功',
@@ -136,6 +129,48 @@ def add_worker():
 
 
 
+# 批量新增 / 更新工人（按姓名判重），一条多行 INSERT ... ON DUPLICATE KEY UPDATE
+@worker_bp.route('/bulk_upsert', methods=['POST'])
+@login_required
+def bulk_upsert_workers():
+    """
+    接收 JSON 数组，每条记录包含：
+    {
+        name, process_id 或 process（工序名）, id_card, remark, group, entry_date, leave_date, status
+    }
+    除 name 外都可省略：新工人必须指定工序，入职日期默认今天、状态默认在职；已有工人省略的字段保持不变
+
+    查询参数：
+    - overwrite=1（默认）: 同名工人按提交的数据更新
+    - overwrite=0: 同名工人不修改，只在 conflicts 中列出差异
+
+    返回 inserted / updated / unchanged / skipped（姓名列表）、
+    rejected: [{line, reason}]、conflicts: [{line, id, name, changes: {字段: {old, new}}}]，line 为数组下标
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, list):
+        return jsonify({'message': '数据格式错误，需为数组'}), 400
+    if len(data) > worker_upsert.MAX_ROWS:
+        return jsonify({'message': f'单次最多 {worker_upsert.MAX_ROWS} 条'}), 400
+
+    overwrite = request.args.get('overwrite', '1') != '0'
+    try:
+        report = worker_upsert.bulk_upsert(data, overwrite=overwrite)
+        roster_index.changed()
+        db.session.commit()
+        roster_index.refresh()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': '批量保存工人失败', 'error': str(e)}), 400
+
+    return jsonify({
+        'message': '批量保存完成',
+        'inserted_count': len(report['inserted']),
+        'updated_count': len(report['updated']),
+        **report
+    }), 200
+
+
 # 更新工人信息
 @worker_bp.route('/<int:id>', methods=['PUT'])
 def update_worker(id):
@@ -157,7 +192,9 @@ def update_worker(id):
     worker.process_id = data.get('process_id', worker.process_id)
 
     try:
+        roster_index.changed()
         db.session.commit()
+        roster_index.refresh()
         return jsonify({
             'message': 'Worker updated successfully',
             'worker': {
@@ -180,7 +217,9 @@ def delete_worker(id):
 
     try:
         db.session.delete(worker)
+        roster_index.changed()
         db.session.commit()
+        roster_index.refresh()
         return jsonify({'message': 'Worker deleted successfully'}), 200
     except Exception as e:
         db.session.rollback()
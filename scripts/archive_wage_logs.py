@@ -0,0 +1,59 @@
+# scripts/archive_wage_logs.py
+"""
+工资记录归档：把已结账且早于 WAGE_ARCHIVE_HORIZON_MONTHS 个月前的月份从 wage_logs 搬到 wage_logs_archive
+
+用法:
+    python scripts/archive_wage_logs.py                  # 按配置的归档线归档所有符合条件的月份
+    python scripts/archive_wage_logs.py --dry-run        # 只列出会归档的月份
+    python scripts/archive_wage_logs.py --horizon 6      # 临时指定归档线（月）
+    python scripts/archive_wage_logs.py --restore 2024-05  # 把某月搬回 wage_logs
+
+适合放到每月初的定时任务里；每搬 WAGE_ARCHIVE_CHUNK_SIZE 行提交一次，中断后重跑即可继续
+"""
+import sys
+import os
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app import app
+from db_config import db
+from utils import wage_archive
+
+
+def main():
+    parser = argparse.ArgumentParser(description='工资记录归档')
+    parser.add_argument('--horizon', type=int, help='保留最近几个月在 wage_logs（默认取配置）')
+    parser.add_argument('--chunk-size', type=int, help='每次搬动的行数（默认取配置）')
+    parser.add_argument('--dry-run', action='store_true', help='只列出会归档的月份')
+    parser.add_argument('--restore', metavar='YYYY-MM', help='把某月从归档表搬回 wage_logs')
+    args = parser.parse_args()
+
+    with app.app_context():
+        if args.restore:
+            moved = wage_archive.restore_month(args.restore, args.chunk_size)
+            print(f"✅ {args.restore} 已搬回 wage_logs，共 {moved} 条")
+            return
+
+        months = wage_archive.archivable_months(args.horizon)
+        cutoff = wage_archive.horizon_cutoff(args.horizon)
+        if not months:
+            print(f"没有需要归档的月份（归档线 {cutoff} 之前、已结账且 wage_logs 中仍有数据）")
+            return
+
+        print(f"归档线 {cutoff}，待归档月份: {', '.join(months)}")
+        if args.dry_run:
+            return
+
+        for month in months:
+            try:
+                moved = wage_archive.archive_month(month, args.chunk_size)
+                print(f"✅ {month} 归档完成，共 {moved} 条")
+            except Exception as e:
+                db.session.rollback()
+                print(f"❌ {month} 归档失败: {e}")
+                return
+
+
+if __name__ == "__main__":
+    main()
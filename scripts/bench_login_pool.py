@@ -0,0 +1,69 @@
+# scripts/bench_login_pool.py
+"""
+登录密码校验线程池压测：不同线程池大小下每秒可完成的登录数
+
+模拟早班集中登录：N 个并发客户端不停地做密码校验，统计成功数、被 429 拒绝数和吞吐。
+不连数据库，只测 pbkdf2 校验本身。
+
+用法: python scripts/bench_login_pool.py [并发客户端数] [每组测试秒数] [线程池大小,...]
+示例: python scripts/bench_login_pool.py 32 5 1,2,4,8
+"""
+import sys
+import os
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from werkzeug.security import generate_password_hash, check_password_hash
+from utils.password_pool import PasswordPool, PasswordPoolBusy
+
+
+def bench(pool_size, clients, seconds, pw_hash, queue_size):
+    pool = PasswordPool(workers=pool_size, queue_size=queue_size, timeout=30)
+    ok = [0]
+    busy = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def client():
+        while time.perf_counter() < deadline:
+            try:
+                pool.run(check_password_hash, pw_hash, 'secret')
+                with lock:
+                    ok[0] += 1
+            except PasswordPoolBusy:
+                with lock:
+                    busy[0] += 1
+                time.sleep(0.05)  # 模拟前端收到 429 后的重试间隔
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    pool.shutdown()
+    return ok[0] / elapsed, busy[0]
+
+
+def main():
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 5
+    sizes = [int(x) for x in sys.argv[3].split(',')] if len(sys.argv) > 3 else [1, 2, 4, 8]
+
+    pw_hash = generate_password_hash('secret', method='pbkdf2:sha256')
+    t0 = time.perf_counter()
+    check_password_hash(pw_hash, 'secret')
+    print(f'单次校验耗时: {(time.perf_counter() - t0) * 1000:.1f} ms, CPU 核数: {os.cpu_count()}')
+    print(f'并发客户端: {clients}, 每组 {seconds:g} 秒')
+    print(f"{'pool':>6} {'登录/秒':>10} {'429次数':>10}")
+
+    for size in sizes:
+        rate, busy = bench(size, clients, seconds, pw_hash, queue_size=size * 4)
+        print(f'{size:>6} {rate:>10.1f} {busy:>10}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+# scripts/bench_wage_calc.py
+"""
+工资计算引擎压测：整批计算并校验 N 行工资的耗时
+
+用法: python scripts/bench_wage_calc.py [行数]
+"""
+import sys
+import os
+import random
+import time
+from decimal import Decimal
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from utils import wage_calc
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    random.seed(1)
+    rows = []
+    for _ in range(n):
+        price = Decimal(random.randint(10, 999)) / 100
+        qty = random.randint(1, 500)
+        group = random.randint(1, 4)
+        total = (price * qty / group).quantize(Decimal('0.01'))
+        if random.random() < 0.01:
+            total += Decimal('0.50')  # 约 1% 的行故意算错
+        rows.append({'actual_price': price, 'quantity': qty, 'actual_group_size': group, 'total_wage': total})
+
+    t0 = time.perf_counter()
+    mismatches, _ = wage_calc.reconcile(rows, policy='server', tolerance=Decimal('0.01'))
+    elapsed = time.perf_counter() - t0
+    print(f'{n} 行: {elapsed * 1000:.1f} ms, 不一致 {len(mismatches)} 行')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+# scripts/check_payroll.py
+"""
+工资结账 / 重开的回归检查
+
+在内存 SQLite 里结账一个月，检查：快照与结账前现算的工资单一致；已结账月份的新增 / 修改 / 删除 / 导入
+都被拒绝（409 或列入 rejected），快照不变；重开后可以修改，重新结账的快照包含新数据（见 utils/payroll.py）。
+不符时以非 0 退出。
+
+用法: python scripts/check_payroll.py
+"""
+from check_support import Checker, create_app, log_row, seed
+
+from sqlalchemy import func, select
+
+from db_config import db
+from models import WageLog
+from routes.payroll import payroll_bp
+from routes.wagelog import wagelog_bp
+from utils import payroll, wage_summary
+
+MONTH = '2025-03'
+NEXT_MONTH = '2025-04'
+
+
+def _slips(client, month):
+    data = client.get(f'/api/payroll/periods/{month}/payslips').get_json()
+    slips = [(s['worker_id'], s['quantity'], round(s['total_wage'], 2), s['log_count']) for s in data['payslips']]
+    return data['closed'], slips
+
+
+def _month_log_count(month):
+    month_start, month_end = payroll.month_range(month)
+    return db.session.scalar(
+        select(func.count(WageLog.id)).where(WageLog.date >= month_start, WageLog.date <= month_end)
+    )
+
+
+def main():
+    app = create_app((wagelog_bp, '/api/wage_logs'), (payroll_bp, '/api/payroll'))
+    checker = Checker()
+
+    with app.app_context():
+        seed()
+        wage_summary.rebuild()
+        db.session.commit()
+        client = app.test_client()
+
+        _, live_slips = _slips(client, MONTH)
+        resp = client.post(f'/api/payroll/periods/{MONTH}/close')
+        period = resp.get_json().get('period') or {}
+        closed_count = period.get('log_count')
+        checker.check('结账', resp.status_code == 200, f'HTTP {resp.status_code}')
+        checker.check(
+            '结账记录的条数', period.get('log_count') == _month_log_count(MONTH),
+            f"{period.get('log_count')} / {_month_log_count(MONTH)}"
+        )
+        closed, snapshot = _slips(client, MONTH)
+        checker.check('已结账月份读快照', closed)
+        checker.check('快照与结账前现算的工资单一致', snapshot == live_slips)
+        resp = client.post(f'/api/payroll/periods/{MONTH}/close')
+        checker.check('重复结账返回 409', resp.status_code == 409, f'HTTP {resp.status_code}')
+
+        month_start, _ = payroll.month_range(MONTH)
+        next_start, _ = payroll.month_range(NEXT_MONTH)
+        march_id = db.session.scalar(select(WageLog.id).where(WageLog.date == month_start).limit(1))
+        april_id = db.session.scalar(select(WageLog.id).where(WageLog.date == next_start).limit(1))
+        new_march = log_row(1, 2, 21, f'{MONTH}-15', 5)
+        blocked = [
+            ('已结账月份新增', client.post('/api/wage_logs/', json=new_march)),
+            ('已结账月份修改', client.put(f'/api/wage_logs/{march_id}', json={'quantity': 1})),
+            ('其他月份的记录改到已结账月份', client.put(f'/api/wage_logs/{april_id}', json={'date': f'{MONTH}-20'})),
+            ('已结账月份删除', client.delete(f'/api/wage_logs/{march_id}')),
+        ]
+        for name, resp in blocked:
+            checker.check(f'{name}返回 409', resp.status_code == 409, f'HTTP {resp.status_code}')
+        report = client.post('/api/wage_logs/batch_import', json=[new_march]).get_json()
+        checker.check(
+            '已结账月份的导入行被拒绝', report['inserted'] == 0 and report['rejected_count'] == 1,
+            f"写入 {report['inserted']}，拒绝 {report['rejected_count']}"
+        )
+        checker.check('被拒绝的改动不影响快照', _slips(client, MONTH)[1] == snapshot)
+
+        resp = client.post('/api/wage_logs/', json=dict(new_march, date=f'{NEXT_MONTH}-15'))
+        checker.check('未结账月份照常新增', resp.status_code == 201, f'HTTP {resp.status_code}')
+
+        resp = client.post(f'/api/payroll/periods/{MONTH}/reopen')
+        checker.check('重开', resp.status_code == 200, f'HTTP {resp.status_code}')
+        closed, slips = _slips(client, MONTH)
+        checker.check('重开后按当前数据现算', not closed and slips == live_slips)
+        resp = client.post('/api/wage_logs/', json=new_march)
+        checker.check('重开后可以新增', resp.status_code == 201, f'HTTP {resp.status_code}')
+
+        resp = client.post(f'/api/payroll/periods/{MONTH}/close')
+        period = resp.get_json().get('period') or {}
+        checker.check(
+            '重新结账包含重开后的改动', period.get('log_count') == closed_count + 1 == _month_log_count(MONTH),
+            f"{period.get('log_count')} / {_month_log_count(MONTH)}"
+        )
+        resp = client.post(f'/api/payroll/periods/{NEXT_MONTH}/reopen')
+        checker.check('重开未结账的月份返回 404', resp.status_code == 404, f'HTTP {resp.status_code}')
+        checker.summary_matches('结账 / 重开后汇总表')
+
+    checker.exit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+# scripts/check_query_count.py
+"""
+接口 SQL 条数回归检查
+
+在内存 SQLite 里造两份不同数据量的数据，分别请求接口并统计执行的 SQL 条数，
+条数随返回行数增长（N+1）或超过上限时以非 0 退出，可以直接挂在 CI 里。
+
+用法: python scripts/check_query_count.py
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+from check_support import Checker, create_app
+
+from sqlalchemy import event
+
+from db_config import db
+from models import Worker, Process, SpecModel, WageLog
+from routes.wagelog import wagelog_bp
+from utils import ref_data
+
+
+# (接口, 查询参数, 允许的最大 SQL 条数)
+# 列表查询前先查一次归档表的最大日期，决定是否要合并归档数据（见 utils/wage_archive.py）
+CHECKS = [
+    ('/api/wage_logs/query', {'start_date': '2025-01-01', 'end_date': '2025-12-31'}, 2),
+    ('/api/wage_logs/', {'limit': 1000}, 2),
+]
+
+SIZES = (10, 300)
+
+
+def seed(size):
+    """关联的工人 / 规格数量也随数据量增长，这样逐行懒加载才会体现在 SQL 条数上"""
+    db.drop_all()
+    db.create_all()
+    n_workers = max(size // 2, 1)
+    n_specs = max(size // 10, 2)
+    for p in (1, 2):
+        db.session.add(Process(id=p, name=f'工序{p}'))
+    for s in range(1, n_specs + 1):
+        db.session.add(SpecModel(id=s, name=f'规格{s}', category='板', price=Decimal('1.20'), process_id=1 + s % 2))
+    for w in range(1, n_workers + 1):
+        db.session.add(Worker(id=w, name=f'工人{w}', process_id=1 + w % 2, entry_date=date(2025, 1, 1)))
+    db.session.flush()
+
+    rows = []
+    for i in range(size):
+        s = 1 + i % n_specs
+        rows.append({
+            'worker_id': 1 + i % n_workers, 'process_id': 1 + s % 2, 'spec_model_id': s,
+            'date': date(2025, 1, 1) + timedelta(days=i % 300),
+            'actual_price': Decimal('1.20'), 'quantity': 10, 'total_wage': Decimal('12.00'),
+            'actual_group_size': 1, 'remark': '',
+        })
+    db.session.execute(WageLog.__table__.insert(), rows)
+    db.session.commit()
+
+    # 工序 / 规格名称来自进程内参考数据缓存：换了数据要重新加载，并预热，只统计稳定状态下每次请求的 SQL
+    ref_data.refresh()
+    ref_data.get()
+
+
+def count_queries(client, url, params):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        resp = client.get(url, query_string=params)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+    return resp.status_code, len(statements)
+
+
+def main():
+    app = create_app((wagelog_bp, '/api/wage_logs'))
+    checker = Checker()
+
+    with app.app_context():
+        results = {}
+        for size in SIZES:
+            seed(size)
+            client = app.test_client()
+            for url, params, _ in CHECKS:
+                results[(url, size)] = count_queries(client, url, params)
+
+        for url, params, limit in CHECKS:
+            counts = [results[(url, size)] for size in SIZES]
+            ok = all(status == 200 for status, _ in counts)
+            ok = ok and len({n for _, n in counts}) == 1 and counts[0][1] <= limit
+            detail = ', '.join(f'{size}行={n}条(HTTP {status})' for size, (status, n) in zip(SIZES, counts))
+            checker.check(url, ok, f'{detail}，上限 {limit}')
+
+    checker.exit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+# scripts/check_query_plans.py
+"""
+工资记录主要查询的执行计划检查
+
+对 wage_logs 的几条主要查询跑 EXPLAIN，只要有一条对 wage_logs / wage_logs_archive 走了全表扫描
+就以非 0 退出，防止以后改查询 / 删索引时悄悄退化。
+日期区间跨过归档线时，接口查的是两张表 UNION ALL 的 wage_logs_all（见 utils/wage_archive.py），
+这条路径也一并检查：每个分支都要走索引。
+
+用法:
+    python scripts/check_query_plans.py            # 连接 app 配置的 MySQL（建议在有真实数据量的库上跑）
+    python scripts/check_query_plans.py --sqlite   # 内存 SQLite，按模型建表建索引，适合 CI
+"""
+import sys
+import re
+from datetime import date
+
+from check_support import Checker, create_app
+
+from sqlalchemy import and_, or_, text
+
+from db_config import db
+from models import WageLog
+from routes.wagelog import _wage_log_list_query
+from utils import wage_archive
+
+DAY = date(2025, 3, 15)
+MONTH_START = date(2025, 3, 1)
+MONTH_END = date(2025, 3, 31)
+
+# 只查 wage_logs_all 子查询本身不算全表扫描
+SCANNED_TABLES = ('wage_logs', 'wage_logs_archive')
+SQLITE_FULL_SCAN = re.compile(r'^SCAN (wage_logs|wage_logs_archive)\b(?!_)')
+
+
+def main_queries():
+    """与 routes/wagelog.py 中各接口实际发出的查询保持一致"""
+    return [
+        ('GET /api/wage_logs?date=', _wage_log_list_query()
+            .filter(WageLog.date == DAY)
+            .order_by(WageLog.date, WageLog.id)),
+        ('GET /api/wage_logs?cursor=', _wage_log_list_query()
+            .filter(or_(WageLog.date > DAY, and_(WageLog.date == DAY, WageLog.id > 1000)))
+            .order_by(WageLog.date, WageLog.id)
+            .limit(500)),
+        ('GET /api/wage_logs/query 日期区间', _wage_log_list_query()
+            .filter(WageLog.date >= MONTH_START, WageLog.date <= MONTH_END)
+            .order_by(WageLog.date, WageLog.process_id, WageLog.spec_model_id)),
+        ('GET /api/wage_logs/query 工人+日期', _wage_log_list_query()
+            .filter(WageLog.date >= MONTH_START, WageLog.date <= MONTH_END)
+            .filter(WageLog.worker_id == 1)
+            .order_by(WageLog.date, WageLog.process_id, WageLog.spec_model_id)),
+        ('GET /api/wage_logs/query 工序+日期', _wage_log_list_query()
+            .filter(WageLog.date >= MONTH_START, WageLog.date <= MONTH_END)
+            .filter(WageLog.process_id == 1)
+            .order_by(WageLog.date, WageLog.process_id, WageLog.spec_model_id)),
+    ] + union_queries()
+
+
+def union_queries():
+    """同样几条查询，来源换成跨归档线时的 wage_logs_all"""
+    day = wage_archive.union_source(DAY, DAY)
+    after_day = wage_archive.union_source(DAY, None)
+    month = wage_archive.union_source(MONTH_START, MONTH_END)
+    return [
+        ('GET /api/wage_logs?date= (UNION)', _wage_log_list_query(day)
+            .filter(day.c.date == DAY)
+            .order_by(day.c.date, day.c.id)),
+        ('GET /api/wage_logs?cursor= (UNION)', _wage_log_list_query(after_day)
+            .filter(or_(after_day.c.date > DAY, and_(after_day.c.date == DAY, after_day.c.id > 1000)))
+            .order_by(after_day.c.date, after_day.c.id)
+            .limit(500)),
+        ('GET /api/wage_logs/query 日期区间 (UNION)', _wage_log_list_query(month)
+            .filter(month.c.date >= MONTH_START, month.c.date <= MONTH_END)
+            .order_by(month.c.date, month.c.process_id, month.c.spec_model_id)),
+    ]
+
+
+def explain(query):
+    """返回 (是否全表扫描 wage_logs, 计划描述列表)"""
+    bind = db.session.get_bind()
+    sql = str(query.statement.compile(bind=bind, compile_kwargs={'literal_binds': True}))
+
+    if bind.dialect.name == 'sqlite':
+        rows = db.session.execute(text('EXPLAIN QUERY PLAN ' + sql)).all()
+        details = [row[3] for row in rows]
+        full_scan = any(SQLITE_FULL_SCAN.match(d) and 'INDEX' not in d for d in details)
+        return full_scan, details
+
+    rows = db.session.execute(text('EXPLAIN ' + sql)).mappings().all()
+    details = [f"{row['table']}: type={row['type']} key={row['key']} rows={row['rows']}" for row in rows]
+    full_scan = any(row['table'] in SCANNED_TABLES and row['type'] == 'ALL' for row in rows)
+    return full_scan, details
+
+
+def main():
+    if '--sqlite' in sys.argv:
+        app = create_app()
+        with app.app_context():
+            db.create_all()
+    else:
+        from app import app
+
+    checker = Checker()
+    with app.app_context():
+        for name, query in main_queries():
+            full_scan, details = explain(query)
+            checker.check(name, not full_scan)
+            for d in details:
+                print(f'       {d}')
+
+    checker.exit()
+
+
+if __name__ == '__main__':
+    main()
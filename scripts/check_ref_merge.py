@@ -0,0 +1,132 @@
+# scripts/check_ref_merge.py
+"""
+工序 / 规格型号合并与撤销的回归检查
+
+在内存 SQLite 里合并规格型号和工序（小块改写），检查：引用全部改到 target、汇总表同步；
+source 停用后工资记录不能再改到它；涉及已结账月份时拒绝合并 / 撤销且不做任何改动；
+合并后被归档的行撤销时也能改回；撤销后数据和汇总表与合并前完全相同（见 utils/ref_merge.py）。不符时以非 0 退出。
+
+用法: python scripts/check_ref_merge.py
+"""
+from check_support import Checker, create_app, seed, summary_rows
+
+from sqlalchemy import func, select
+
+from db_config import db
+from models import RefMerge, SpecModel, WageLog, WageLogArchive, Worker
+from routes.ref_merge import ref_merge_bp
+from routes.wagelog import wagelog_bp
+from utils import payroll, ref_data, ref_merge, wage_archive, wage_summary
+
+MONTH = '2025-03'
+CHUNK_SIZE = 7  # 故意取小，覆盖多批改写
+
+
+def _count(column, value):
+    return sum(
+        db.session.scalar(select(func.count()).select_from(model).where(getattr(model, column.key) == value))
+        for model in (WageLog, WageLogArchive)
+    )
+
+
+def _refs(process_id):
+    return (
+        db.session.scalar(select(func.count(Worker.id)).where(Worker.process_id == process_id)),
+        db.session.scalar(select(func.count(SpecModel.id)).where(SpecModel.process_id == process_id)),
+        _count(WageLog.process_id, process_id),
+    )
+
+
+def main():
+    app = create_app((wagelog_bp, '/api/wage_logs'), (ref_merge_bp, '/api/ref_merges'))
+    checker = Checker()
+
+    with app.app_context():
+        seed()
+        wage_summary.rebuild()
+        db.session.commit()
+        client = app.test_client()
+        original = summary_rows()
+        spec_logs = _count(WageLog.spec_model_id, 12)
+        merge_body = {'source_id': 12, 'target_id': 11}
+
+        resp = client.post('/api/ref_merges/spec_models', json=dict(merge_body, dry_run=True))
+        preview = resp.get_json()
+        checker.check(
+            'dry_run 只返回影响范围',
+            resp.status_code == 200 and preview['updated']['wage_logs'] == spec_logs
+            and preview['closed_months'] == [] and _count(WageLog.spec_model_id, 12) == spec_logs,
+            f'HTTP {resp.status_code}'
+        )
+        resp = client.post('/api/ref_merges/spec_models', json={'source_id': 12, 'target_id': 21})
+        checker.check('不同工序的规格型号不能合并', resp.status_code == 400, f'HTTP {resp.status_code}')
+
+        # 已结账月份：拒绝且不做任何改动
+        payroll.close(MONTH)
+        db.session.commit()
+        resp = client.post('/api/ref_merges/spec_models', json=merge_body)
+        body = resp.get_json()
+        checker.check(
+            '涉及已结账月份时拒绝合并',
+            resp.status_code == 409 and body.get('closed_months') == [MONTH],
+            f'HTTP {resp.status_code}，{body.get("closed_months")}'
+        )
+        checker.check(
+            '拒绝合并不做改动',
+            _count(WageLog.spec_model_id, 12) == spec_logs and db.session.get(SpecModel, 12).is_active
+            and summary_rows() == original and db.session.scalar(select(func.count(RefMerge.id))) == 0
+        )
+        payroll.reopen(MONTH)
+        db.session.commit()
+
+        resp = client.post('/api/ref_merges/spec_models', json=merge_body)
+        body = resp.get_json()
+        checker.check(
+            '合并规格型号',
+            resp.status_code == 200 and body['updated']['wage_logs'] == spec_logs
+            and _count(WageLog.spec_model_id, 12) == 0,
+            f'HTTP {resp.status_code}'
+        )
+        checker.summary_matches('合并后汇总表')
+        checker.check('source 停用', 12 in ref_data.get().disabled_spec_ids)
+        log_id = db.session.scalar(select(WageLog.id).where(WageLog.spec_model_id == 11).limit(1))
+        resp = client.put(f'/api/wage_logs/{log_id}', json={'spec_model_id': 12})
+        checker.check('工资记录不能改到已停用的规格型号', resp.status_code == 400, f'HTTP {resp.status_code}')
+        merge_id = body['merge']['id']
+
+        # 合并后该月结账、归档：撤销被拒绝；重开但不搬回，行留在归档表里也要能改回
+        payroll.close(MONTH)
+        db.session.commit()
+        wage_archive.archive_month(MONTH, CHUNK_SIZE)
+        resp = client.post(f'/api/ref_merges/{merge_id}/undo')
+        checker.check('涉及已结账月份时拒绝撤销', resp.status_code == 409, f'HTTP {resp.status_code}')
+        payroll.reopen(MONTH)
+        db.session.commit()
+
+        resp = client.post(f'/api/ref_merges/{merge_id}/undo')
+        restored = (resp.get_json() or {}).get('restored') or {}
+        checker.check(
+            '撤销改回归档表里的行',
+            resp.status_code == 200 and restored.get('wage_logs_archive', 0) > 0
+            and sum(restored.values()) == spec_logs and _count(WageLog.spec_model_id, 12) == spec_logs,
+            f'HTTP {resp.status_code}，{restored}'
+        )
+        checker.check('撤销后汇总表与合并前相同', summary_rows() == original)
+        checker.check('source 重新启用', 12 not in ref_data.get().disabled_spec_ids)
+        resp = client.post(f'/api/ref_merges/{merge_id}/undo')
+        checker.check('重复撤销返回 409', resp.status_code == 409, f'HTTP {resp.status_code}')
+
+        # 工序合并：工人、规格型号、工资记录（一部分在归档表）都改到 target
+        refs = _refs(2)
+        record, counts = ref_merge.merge(ref_merge.PROCESS, 2, 1, chunk_size=CHUNK_SIZE)
+        checker.check('合并工序', _refs(2) == (0, 0, 0), str(counts))
+        checker.summary_matches('合并工序后汇总表')
+        ref_merge.undo(record, chunk_size=CHUNK_SIZE)
+        checker.check('撤销工序合并', _refs(2) == refs, f'{_refs(2)} / {refs}')
+        checker.check('撤销工序合并后汇总表与合并前相同', summary_rows() == original)
+
+    checker.exit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+# scripts/check_support.py
+"""
+回归检查脚本（scripts/check_*.py）共用的部分：内存 SQLite 应用、基础数据、比对和结果输出
+
+检查脚本在内存 SQLite 里按模型建表，走接口或 utils 做一遍有状态的操作（增删改、导入、结账、归档……），
+再和直接从明细算出来的结果比对，任一项不符时以非 0 退出，可以直接挂在 CI 里。
+"""
+import sys
+import os
+from datetime import date, timedelta
+from decimal import Decimal
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from flask import Flask, g
+from sqlalchemy import func, select
+
+from db_config import db
+from models import Process, SpecModel, Worker, WageLog, WageDailySummary
+from utils import wage_archive
+
+SEED_START = date(2025, 3, 1)
+SEED_DAYS = 61  # 三月、四月两个整月
+
+CENT = Decimal('0.01')
+
+
+class StubUser:
+    id = 1
+    company_id = 1
+    username = 'check'
+    role_names = frozenset(['管理员'])
+
+
+def _stub_login():
+    g.current_user = StubUser()
+
+
+def create_app(*blueprints, load_user=None, **config):
+    """
+    blueprints: (blueprint, url_prefix) 列表；config: 覆盖的应用配置
+    load_user: before_request 钩子，默认每个请求都以管理员身份登录（StubUser）
+    """
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config.update(config)
+    db.init_app(app)
+    for blueprint, url_prefix in blueprints:
+        app.register_blueprint(blueprint, url_prefix=url_prefix)
+    app.before_request(load_user or _stub_login)
+    return app
+
+
+def spec_price(spec_model_id):
+    """seed() 里规格型号的单价：11、21 为 1.20，12、22 为 2.40"""
+    return Decimal('1.20') * (spec_model_id % 10)
+
+
+def log_row(worker_id, process_id, spec_model_id, day, quantity):
+    """一条完整的工资记录请求数据（接口 / 导入用），单价取 spec_price，工资 = 单价 × 数量"""
+    price = spec_price(spec_model_id)
+    return {
+        'worker_id': worker_id, 'process_id': process_id, 'spec_model_id': spec_model_id, 'date': day,
+        'actual_price': str(price), 'quantity': quantity, 'total_wage': str(price * quantity),
+        'actual_group_size': 1,
+    }
+
+
+def seed(n_logs=200, n_workers=10):
+    """
+    工序 1、2，各两个规格型号（11、12 属工序 1，21、22 属工序 2），n_workers 个工人，
+    n_logs 条工资记录铺在 SEED_START 起的 SEED_DAYS 天里；不建工资日汇总表，需要时调用 wage_summary.rebuild()
+    """
+    db.drop_all()
+    db.create_all()
+    for p in (1, 2):
+        db.session.add(Process(id=p, name=f'工序{p}'))
+        for k in (1, 2):
+            db.session.add(SpecModel(
+                id=p * 10 + k, name=f'规格{p}{k}', category='板', price=spec_price(p * 10 + k), process_id=p
+            ))
+    for w in range(1, n_workers + 1):
+        db.session.add(Worker(id=w, name=f'工人{w}', process_id=1 + w % 2, entry_date=date(2025, 1, 1)))
+    db.session.flush()
+
+    rows = []
+    for i in range(n_logs):
+        w = 1 + i % n_workers
+        p = 1 + w % 2
+        k = 1 + (i // n_workers) % 2
+        price = spec_price(p * 10 + k)
+        quantity = 10 + i % 7
+        rows.append({
+            'worker_id': w, 'process_id': p, 'spec_model_id': p * 10 + k,
+            'date': SEED_START + timedelta(days=i % SEED_DAYS),
+            'actual_price': price, 'quantity': quantity, 'total_wage': price * quantity,
+            'actual_group_size': 1, 'remark': '',
+        })
+    db.session.execute(WageLog.__table__.insert(), rows)
+    db.session.commit()
+
+
+def _normalize(rows):
+    return sorted(
+        (d, w, p, s, int(q or 0), Decimal(str(t or 0)).quantize(CENT), int(c))
+        for d, w, p, s, q, t, c in rows
+    )
+
+
+def summary_rows():
+    """工资日汇总表的全部行"""
+    t = WageDailySummary.__table__
+    return _normalize(db.session.execute(select(
+        t.c.date, t.c.worker_id, t.c.process_id, t.c.spec_model_id, t.c.quantity, t.c.total_wage, t.c.log_count
+    )))
+
+
+def expected_summary():
+    """直接从 wage_logs + 归档表按汇总键聚合，汇总表应与之完全相同"""
+    logs = wage_archive.wage_log_source()
+    return _normalize(db.session.execute(
+        select(
+            logs.c.date, logs.c.worker_id, logs.c.process_id, logs.c.spec_model_id,
+            func.sum(logs.c.quantity), func.sum(logs.c.total_wage), func.count(logs.c.id)
+        ).group_by(logs.c.date, logs.c.worker_id, logs.c.process_id, logs.c.spec_model_id)
+    ))
+
+
+class Checker:
+    def __init__(self):
+        self.failed = False
+
+    def check(self, name, ok, detail=''):
+        self.failed = self.failed or not ok
+        print(f"{'OK  ' if ok else 'FAIL'} {name}" + (f'：{detail}' if detail else ''))
+        return ok
+
+    def summary_matches(self, name):
+        actual, expected = summary_rows(), expected_summary()
+        detail = ''
+        if actual != expected:
+            diff = len(set(actual) ^ set(expected))
+            detail = f'汇总表 {len(actual)} 行，明细聚合 {len(expected)} 行，{diff} 行不一致'
+        return self.check(name, actual == expected, detail)
+
+    def exit(self):
+        sys.exit(1 if self.failed else 0)
@@ -0,0 +1,106 @@
+# scripts/check_token_cache.py
+"""
+登录 token 校验缓存的回归检查
+
+在内存 SQLite 里走真实的登录接口和 load_current_user（见 app.py、utils/token_cache.py），检查：
+缓存命中后请求（含按角色鉴权的接口）不再查 users 表；重新登录后旧 token 立即失效（本进程）；
+直接改角色后 invalidate_user 之后按新角色鉴权。不符时以非 0 退出。
+
+用法: python scripts/check_token_cache.py
+"""
+import time
+
+from check_support import Checker, create_app
+
+from sqlalchemy import delete, event
+from werkzeug.security import generate_password_hash
+
+from app import load_current_user
+from db_config import db
+from models import Company, Role, User, UserRole
+from routes.auth import auth_bp, SECRET_KEY
+from routes.process import process_bp
+from utils.token_cache import token_cache
+
+PASSWORD = 'check-password'
+PASSWORD_METHOD = 'pbkdf2:sha256:1000'  # 检查脚本里不需要真实强度
+ADMIN_URL = '/api/users/roles/assignable'  # 需要管理员角色
+
+
+def seed():
+    db.drop_all()
+    db.create_all()
+    db.session.add(Company(id=1, name='公司'))
+    db.session.add(Role(id=1, name='管理员'))
+    db.session.add(User(
+        id=1, username='check', company_id=1, password_hash=generate_password_hash(PASSWORD, PASSWORD_METHOD)
+    ))
+    db.session.flush()
+    db.session.add(UserRole(user_id=1, role_id=1))
+    db.session.commit()
+    token_cache.clear()
+
+
+def login(client):
+    return client.post('/api/users/', json={'username': 'check', 'password': PASSWORD}).get_json()['token']
+
+
+def request_with(client, token, url='/api/processes/'):
+    """返回 (HTTP 状态码, 这次请求是否查了 users 表)"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        resp = client.get(url, headers={'Authorization': f'Bearer {token}'})
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+    return resp.status_code, any('FROM users' in s for s in statements)
+
+
+def main():
+    app = create_app(
+        (auth_bp, '/api/users'), (process_bp, '/api/processes'),
+        load_user=load_current_user, SECRET_KEY=SECRET_KEY
+    )
+    checker = Checker()
+
+    with app.app_context():
+        seed()
+        client = app.test_client()
+
+        token = login(client)
+        status, queried = request_with(client, token)
+        checker.check('首次请求查 users 表', status == 200 and queried, f'HTTP {status}')
+        status, queried = request_with(client, token)
+        checker.check('缓存命中后不查 users 表', status == 200 and not queried, f'HTTP {status}')
+        status, queried = request_with(client, token, ADMIN_URL)
+        checker.check('按角色鉴权不查 users 表', status == 200 and not queried, f'HTTP {status}')
+
+        # JWT 的 iat / exp 精确到秒，同一秒内重新登录拿到的 token 相同
+        time.sleep(1.1)
+        new_token = login(client)
+        status, _ = request_with(client, token)
+        checker.check('重新登录后旧 token 失效', new_token != token and status == 401, f'HTTP {status}')
+        status, _ = request_with(client, new_token)
+        checker.check('新 token 可用', status == 200, f'HTTP {status}')
+
+        # 直接改角色：TTL 内仍按缓存的角色鉴权，invalidate_user 之后按新角色
+        db.session.execute(delete(UserRole).where(UserRole.user_id == 1))
+        db.session.commit()
+        status, _ = request_with(client, new_token, ADMIN_URL)
+        checker.check('改角色后 TTL 内沿用缓存', status == 200, f'HTTP {status}')
+        token_cache.invalidate_user(1)
+        status, queried = request_with(client, new_token, ADMIN_URL)
+        checker.check('invalidate_user 后按新角色鉴权', status == 403 and queried, f'HTTP {status}')
+
+        status, _ = request_with(client, 'not-a-token')
+        checker.check('无效 token 未登录', status == 401, f'HTTP {status}')
+
+    checker.exit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+# scripts/check_wage_archive.py
+"""
+工资记录归档 / 搬回的回归检查
+
+在内存 SQLite 里结账并归档一个月（小块搬动），检查：记录整月搬到归档表、没有重复也没有遗漏；
+跨归档线、只在归档表、只在 wage_logs 的查询以及按 id 查单条，结果都和归档前完全相同；
+汇总表不受影响；重开时整月搬回 wage_logs（见 utils/wage_archive.py）。不符时以非 0 退出。
+
+用法: python scripts/check_wage_archive.py
+"""
+from datetime import date
+
+from check_support import Checker, create_app, log_row, seed
+
+from sqlalchemy import func, select
+
+from db_config import db
+from models import WageLog, WageLogArchive
+from routes.payroll import payroll_bp
+from routes.wagelog import wagelog_bp
+from utils import payroll, wage_archive, wage_summary
+
+MONTH = '2025-03'
+CHUNK_SIZE = 7  # 故意取小，覆盖多块搬动
+
+QUERIES = [
+    ('跨归档线', '/api/wage_logs/query', {'start_date': '2025-03-01', 'end_date': '2025-04-30'}),
+    ('只在归档表', '/api/wage_logs/query', {'start_date': '2025-03-01', 'end_date': '2025-03-31'}),
+    ('只在 wage_logs', '/api/wage_logs/query', {'start_date': '2025-04-01', 'end_date': '2025-04-30'}),
+    ('工人 + 跨归档线', '/api/wage_logs/query', {'start_date': '2025-03-15', 'end_date': '2025-04-15', 'worker_id': 3}),
+    ('按日列表', '/api/wage_logs/', {'date': '2025-03-31'}),
+]
+
+
+def _results(client):
+    results = {}
+    for name, url, params in QUERIES:
+        resp = client.get(url, query_string=params)
+        body = resp.get_json() if resp.is_json else None
+        logs = body.get('wage_logs') if isinstance(body, dict) else body
+        results[name] = (resp.status_code, sorted((log['id'], log['total_wage']) for log in logs or []))
+    return results
+
+
+def _count(model, month):
+    month_start, month_end = payroll.month_range(month)
+    return db.session.scalar(
+        select(func.count(model.id)).where(model.date >= month_start, model.date <= month_end)
+    )
+
+
+def main():
+    app = create_app((wagelog_bp, '/api/wage_logs'), (payroll_bp, '/api/payroll'))
+    checker = Checker()
+
+    with app.app_context():
+        seed()
+        wage_summary.rebuild()
+        payroll.close(MONTH)
+        db.session.commit()
+        client = app.test_client()
+
+        before = _results(client)
+        march_id = db.session.scalar(select(WageLog.id).where(WageLog.date == date(2025, 3, 1)).limit(1))
+        single = client.get(f'/api/wage_logs/{march_id}').get_json()
+        month_total = _count(WageLog, MONTH)
+        checker.check(
+            '可归档月份', wage_archive.archivable_months(0, date(2025, 5, 1)) == [MONTH],
+            str(wage_archive.archivable_months(0, date(2025, 5, 1)))
+        )
+
+        moved = wage_archive.archive_month(MONTH, CHUNK_SIZE)
+        checker.check(
+            '整月搬到归档表',
+            moved == month_total and _count(WageLog, MONTH) == 0 and _count(WageLogArchive, MONTH) == month_total,
+            f'搬动 {moved}，wage_logs {_count(WageLog, MONTH)}，归档表 {_count(WageLogArchive, MONTH)}'
+        )
+        checker.check('再次归档不搬动', wage_archive.archive_month(MONTH, CHUNK_SIZE) == 0)
+        checker.check('归档后不再列为可归档', wage_archive.archivable_months(0, date(2025, 5, 1)) == [])
+
+        after = _results(client)
+        for name, _, _ in QUERIES:
+            checker.check(f'归档后查询结果不变（{name}）', after[name] == before[name], f'HTTP {after[name][0]}')
+        checker.summary_matches('归档后汇总表')
+        resp = client.get(f'/api/wage_logs/{march_id}')
+        archived = resp.get_json() or {}
+        checker.check(
+            '按 id 查到归档的记录，内容不变',
+            resp.status_code == 200 and archived.get('archived') is True and dict(archived, archived=False) == single,
+            f'HTTP {resp.status_code}'
+        )
+
+        resp = client.post(f'/api/payroll/periods/{MONTH}/reopen')
+        restored = (resp.get_json() or {}).get('restored')
+        checker.check(
+            '重开时整月搬回',
+            restored == month_total and _count(WageLog, MONTH) == month_total and _count(WageLogArchive, MONTH) == 0,
+            f'HTTP {resp.status_code}，搬回 {restored}'
+        )
+        checker.check('搬回后查询结果不变', _results(client) == before)
+        checker.summary_matches('搬回后汇总表')
+
+        resp = client.post('/api/wage_logs/', json=log_row(1, 2, 21, f'{MONTH}-15', 5))
+        checker.check('搬回后可以新增', resp.status_code == 201, f'HTTP {resp.status_code}')
+
+        try:
+            wage_archive.archive_month(MONTH, CHUNK_SIZE)
+            refused = False
+        except ValueError:
+            refused = True
+        checker.check('未结账月份不能归档', refused)
+
+    checker.exit()
+
+
+if __name__ == '__main__':
+    main()
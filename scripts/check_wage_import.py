@@ -0,0 +1,163 @@
+# scripts/check_wage_import.py
+"""
+工资记录批量导入 / 流式导入的回归检查
+
+在内存 SQLite 里调用 batch_import 和 import_stream（CSV / NDJSON），检查：不合法的行按行号列在
+rejected 中、其余照常写入；分批提交模式中途失败时返回已提交的位置，修正后从断点重新提交不重复、不遗漏
+（见 utils/wage_import.py）；
+每一步工资日汇总表都和明细一致。
+不符时以非 0 退出。
+
+用法: python scripts/check_wage_import.py
+"""
+import json
+from datetime import date, timedelta
+
+from check_support import Checker, create_app, log_row, seed, spec_price
+
+from sqlalchemy import func, select
+
+from db_config import db
+from models import WageLog
+from routes.wagelog import wagelog_bp
+from utils import wage_summary
+
+ROWS = 2500      # 超过一批（1000 行），分批提交才有断点
+BAD_INDEX = 1500
+# 能通过行校验、写库时才失败的数量（超出整数范围），用来模拟导入中途出错
+OVERFLOW = 10 ** 20
+
+
+def _rows(start):
+    return [
+        log_row(1 + i % 10, 1, 11, (start + timedelta(days=i % 28)).strftime('%Y-%m-%d'), 1 + i % 9)
+        for i in range(ROWS)
+    ]
+
+
+def _set_quantity(row, quantity):
+    row['quantity'] = quantity
+    row['total_wage'] = str(spec_price(row['spec_model_id']) * quantity)
+
+
+def _count_since(start):
+    return db.session.scalar(select(func.count(WageLog.id)).where(WageLog.date >= start))
+
+
+def check_rejects(client, checker):
+    missing = log_row(1, 1, 11, '2025-04-02', 3)
+    del missing['quantity']
+    rows = [
+        log_row(1, 1, 11, '2025-04-02', 3),
+        missing,
+        log_row(999, 1, 11, '2025-04-02', 3),
+        log_row(1, 1, 11, '2025/04/02', 3),
+        log_row(1, 1, 99, '2025-04-02', 3),
+        log_row(2, 2, 21, '2025-04-03', 4),
+    ]
+    before = db.session.scalar(select(func.count(WageLog.id)))
+    report = client.post('/api/wage_logs/batch_import', json=rows).get_json()
+    lines = [r['line'] for r in report['rejected']]
+    checker.check(
+        '不合法的行按行号拒绝、其余写入',
+        report['success'] and report['inserted'] == 2 and lines == [1, 2, 3, 4]
+        and db.session.scalar(select(func.count(WageLog.id))) == before + 2,
+        f"写入 {report['inserted']}，拒绝行 {lines}"
+    )
+    checker.summary_matches('拒绝部分行后汇总表')
+
+
+def check_batch_resume(client, checker):
+    start = date(2025, 6, 1)
+    rows = _rows(start)
+    _set_quantity(rows[BAD_INDEX], OVERFLOW)
+
+    resp = client.post('/api/wage_logs/batch_import', query_string={'atomic': 1}, json=rows)
+    checker.check(
+        '整批模式失败时全部回滚', resp.status_code == 500 and _count_since(start) == 0,
+        f'HTTP {resp.status_code}，已写入 {_count_since(start)}'
+    )
+
+    resp = client.post('/api/wage_logs/batch_import', query_string={'atomic': 0}, json=rows)
+    report = resp.get_json()
+    committed = report['committed']
+    checker.check(
+        '分批模式失败时返回断点',
+        resp.status_code == 500 and 0 < committed <= BAD_INDEX
+        and report['inserted'] == committed == _count_since(start),
+        f"HTTP {resp.status_code}，committed {committed}，已写入 {_count_since(start)}"
+    )
+
+    _set_quantity(rows[BAD_INDEX], 1)
+    resp = client.post('/api/wage_logs/batch_import', query_string={'atomic': 0, 'offset': committed}, json=rows)
+    checker.check(
+        '修正后从断点继续，不重复不遗漏',
+        resp.status_code == 200 and _count_since(start) == ROWS,
+        f'HTTP {resp.status_code}，共写入 {_count_since(start)} / {ROWS}'
+    )
+    checker.summary_matches('批量导入续传后汇总表')
+
+
+def _csv(rows):
+    fields = list(rows[0])
+    lines = [','.join(fields)] + [','.join(str(row.get(f, '')) for f in fields) for row in rows]
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def _ndjson(rows):
+    return ''.join(json.dumps(row) + '\n' for row in rows).encode('utf-8')
+
+
+def check_stream_resume(client, checker, fmt, start):
+    """文件行号：CSV 表头是第 1 行，数据从第 2 行开始；NDJSON 从第 1 行开始"""
+    encode = _csv if fmt == 'csv' else _ndjson
+    first_line = 2 if fmt == 'csv' else 1
+    rows = _rows(start)
+    rows[1]['quantity'] = ''
+    _set_quantity(rows[BAD_INDEX], OVERFLOW)
+    params = {'format': fmt, 'batch_size': 100}
+
+    resp = client.post('/api/wage_logs/import_stream', query_string=params, data=encode(rows))
+    report = resp.get_json()
+    committed_line = report['committed_line']
+    rejected = [r['line'] for r in report['rejected']]
+    checker.check(
+        f'{fmt} 流式导入失败时返回断点',
+        resp.status_code == 500 and rejected == [first_line + 1]
+        and 0 < committed_line < first_line + BAD_INDEX
+        and report['inserted'] == _count_since(start) == committed_line - first_line + 1 - len(rejected),
+        f"HTTP {resp.status_code}，committed_line {committed_line}，已写入 {_count_since(start)}"
+    )
+
+    _set_quantity(rows[BAD_INDEX], 1)
+    resp = client.post(
+        '/api/wage_logs/import_stream', query_string=dict(params, skip=committed_line), data=encode(rows)
+    )
+    checker.check(
+        f'{fmt} 修正后从断点继续，不重复不遗漏',
+        resp.status_code == 200 and _count_since(start) == ROWS - 1,
+        f'HTTP {resp.status_code}，共写入 {_count_since(start)} / {ROWS - 1}'
+    )
+    checker.summary_matches(f'{fmt} 流式导入续传后汇总表')
+
+
+def main():
+    app = create_app((wagelog_bp, '/api/wage_logs'))
+    checker = Checker()
+
+    with app.app_context():
+        seed()
+        wage_summary.rebuild()
+        db.session.commit()
+        client = app.test_client()
+
+        check_rejects(client, checker)
+        check_batch_resume(client, checker)
+        check_stream_resume(client, checker, 'csv', date(2025, 7, 1))
+        check_stream_resume(client, checker, 'ndjson', date(2025, 8, 1))
+
+    checker.exit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+# scripts/check_wage_summary.py
+"""
+工资日汇总表增量维护的回归检查
+
+在内存 SQLite 里通过接口新增 / 修改 / 删除 / 批量导入工资记录，每一步之后汇总表都要和
+直接从明细聚合的结果完全相同（见 utils/wage_summary.py）；只改备注时不重算工资。不符时以非 0 退出。
+
+用法: python scripts/check_wage_summary.py
+"""
+from datetime import date
+from decimal import Decimal
+
+from check_support import Checker, create_app, log_row, seed
+
+from sqlalchemy import select
+
+from db_config import db
+from models import WageLog, WageDailySummary
+from routes.wagelog import wagelog_bp
+from utils import wage_summary
+
+
+def main():
+    app = create_app((wagelog_bp, '/api/wage_logs'))
+    checker = Checker()
+
+    with app.app_context():
+        seed()
+        wage_summary.rebuild()
+        db.session.commit()
+        checker.summary_matches('rebuild 后')
+        client = app.test_client()
+
+        resp = client.post('/api/wage_logs/', json=log_row(1, 2, 22, '2025-03-05', 7))
+        checker.check('新增工资记录', resp.status_code == 201, f'HTTP {resp.status_code}')
+        checker.summary_matches('新增后')
+
+        # 改规格、数量和日期：旧格子减、新格子加
+        log_id = db.session.scalar(select(WageLog.id).where(WageLog.spec_model_id == 11).limit(1))
+        resp = client.put(f'/api/wage_logs/{log_id}', json={
+            'spec_model_id': 12, 'quantity': 3, 'date': '2025-04-30'
+        })
+        checker.check('修改工资记录', resp.status_code == 200, f'HTTP {resp.status_code}')
+        checker.summary_matches('修改后')
+
+        # 只改备注不重算工资：历史金额（这里人为改成与单价 × 数量不符）和汇总表都不变
+        legacy = db.session.get(WageLog, log_id + 1)
+        legacy.total_wage = Decimal('99.99')
+        db.session.commit()
+        wage_summary.rebuild()
+        db.session.commit()
+        resp = client.put(f'/api/wage_logs/{legacy.id}', json={'remark': '补备注'})
+        db.session.expire_all()
+        legacy = db.session.get(WageLog, legacy.id)
+        checker.check(
+            '只改备注不改工资', resp.status_code == 200 and legacy.total_wage == Decimal('99.99'),
+            f'HTTP {resp.status_code}，total_wage {legacy.total_wage}'
+        )
+        checker.summary_matches('只改备注后')
+
+        # 删掉一格里的最后一条，这一格应从汇总表里消失
+        resp = client.post('/api/wage_logs/', json=log_row(2, 1, 11, '2025-04-20', 5))
+        new_id = resp.get_json()['id']
+        resp = client.delete(f'/api/wage_logs/{new_id}')
+        checker.check('删除工资记录', resp.status_code == 200, f'HTTP {resp.status_code}')
+        checker.summary_matches('删除后')
+        empty = db.session.scalar(select(WageDailySummary.date).where(WageDailySummary.log_count <= 0).limit(1))
+        checker.check('汇总表没有条数为 0 的行', empty is None)
+
+        resp = client.post('/api/wage_logs/batch_import', json=[
+            log_row(3, 2, 21, '2025-03-10', 4),
+            log_row(3, 2, 21, '2025-03-10', 6),
+            log_row(999, 2, 21, '2025-03-10', 6),
+        ])
+        report = resp.get_json()
+        checker.check(
+            '批量导入', resp.status_code == 200 and report['inserted'] == 2 and report['rejected_count'] == 1,
+            f"HTTP {resp.status_code}，写入 {report.get('inserted')}，拒绝 {report.get('rejected_count')}"
+        )
+        checker.summary_matches('批量导入后')
+
+        # 按区间重算不应影响区间外的格子
+        wage_summary.rebuild(date(2025, 4, 1), date(2025, 4, 30))
+        db.session.commit()
+        checker.summary_matches('按区间 rebuild 后')
+
+    checker.exit()
+
+
+if __name__ == '__main__':
+    main()
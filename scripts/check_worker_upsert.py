@@ -0,0 +1,86 @@
+# scripts/check_worker_upsert.py
+"""
+工人批量新增 / 更新的回归检查
+
+在内存 SQLite 里调用 bulk_upsert 接口，检查：新增、更新、不变、跳过、拒绝各自归类正确；
+同名工人的差异逐字段列在 conflicts 中；overwrite=0 时不改已有工人；按日期查在职名单和 ETag
+随写入刷新（见 utils/worker_upsert.py、utils/roster_index.py）。不符时以非 0 退出。
+
+用法: python scripts/check_worker_upsert.py
+"""
+from datetime import date
+
+from check_support import Checker, create_app, seed
+
+from sqlalchemy import select
+
+from db_config import db
+from models import Worker
+from routes.worker import worker_bp
+
+ROWS = [
+    {'name': '工人1', 'group': 'C组'},                     # 已有，group 有变化
+    {'name': '工人2', 'process_id': 1},                    # 已有，没有变化（工人2 本来就在工序 1）
+    {'name': '新人甲', 'process': '工序2', 'entry_date': '2025-05-01'},
+    {'name': '新人乙'},                                    # 新工人没给工序
+    {'name': '新人甲', 'process_id': 1},                   # 与第 2 行重名
+    {'name': '新人丙', 'process': '不存在的工序'},
+    {'name': '新人丁', 'process_id': 1, 'entry_date': '2025/05/01'},
+]
+
+
+def _names(client, on_date):
+    resp = client.get('/api/workers/', query_string={'date': on_date})
+    return resp.headers.get('ETag'), {w['name'] for w in resp.get_json()['workers']}
+
+
+def main():
+    app = create_app((worker_bp, '/api/workers'))
+    checker = Checker()
+
+    with app.app_context():
+        seed()
+        client = app.test_client()
+        etag, before = _names(client, '2025-05-02')
+
+        resp = client.post('/api/workers/bulk_upsert', query_string={'overwrite': 0}, json=ROWS)
+        report = resp.get_json()
+        rejected = sorted(r['line'] for r in report['rejected'])
+        checker.check(
+            'overwrite=0 归类',
+            resp.status_code == 200 and report['inserted'] == ['新人甲'] and report['updated'] == []
+            and report['unchanged'] == ['工人2'] and report['skipped'] == ['工人1'] and rejected == [3, 4, 5, 6],
+            f"HTTP {resp.status_code}，拒绝行 {rejected}"
+        )
+        conflicts = {c['name']: c['changes'] for c in report['conflicts']}
+        checker.check(
+            '冲突逐字段列出旧值 / 新值',
+            conflicts == {'工人1': {'group': {'old': None, 'new': 'C组'}}}, str(conflicts)
+        )
+        worker = db.session.scalar(select(Worker).where(Worker.name == '工人1'))
+        checker.check('overwrite=0 不改已有工人', worker.group is None)
+        new = db.session.scalar(select(Worker).where(Worker.name == '新人甲'))
+        checker.check(
+            '新工人按工序名解析、状态默认在职',
+            new is not None and new.process_id == 2 and new.status == '在职' and new.entry_date == date(2025, 5, 1)
+        )
+
+        new_etag, after = _names(client, '2025-05-02')
+        checker.check('在职名单和 ETag 随写入刷新', after == before | {'新人甲'} and new_etag != etag)
+
+        resp = client.post('/api/workers/bulk_upsert', query_string={'overwrite': 1}, json=ROWS[:3])
+        report = resp.get_json()
+        db.session.expire_all()
+        worker = db.session.scalar(select(Worker).where(Worker.name == '工人1'))
+        checker.check(
+            'overwrite=1 更新已有工人',
+            report['updated'] == ['工人1'] and report['unchanged'] == ['工人2', '新人甲']
+            and worker.group == 'C组' and [c['name'] for c in report['conflicts']] == ['工人1'],
+            f"更新 {report['updated']}，不变 {report['unchanged']}"
+        )
+
+    checker.exit()
+
+
+if __name__ == '__main__':
+    main()
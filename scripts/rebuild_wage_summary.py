@@ -0,0 +1,32 @@
+# scripts/rebuild_wage_summary.py
+import sys
+import os
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app import app
+from db_config import db
+from utils import wage_summary
+
+
+def rebuild_wage_summary(start=None, end=None):
+    with app.app_context():
+        count = wage_summary.rebuild(start, end)
+        db.session.commit()
+        scope = f'{start or "最早"} ~ {end or "最新"}'
+        print(f"✅ 工资日汇总重建完成（{scope}），共 {count} 行")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (1, 3):
+        print("用法: python scripts/rebuild_wage_summary.py [开始日期 结束日期]")
+        print("示例: python scripts/rebuild_wage_summary.py 2025-01-01 2025-12-31")
+        print("不带参数时重建全部数据")
+    else:
+        start = end = None
+        if len(sys.argv) == 3:
+            start = datetime.strptime(sys.argv[1], '%Y-%m-%d').date()
+            end = datetime.strptime(sys.argv[2], '%Y-%m-%d').date()
+
+        rebuild_wage_summary(start, end)
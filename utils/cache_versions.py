@@ -0,0 +1,64 @@
+"""
+跨进程缓存版本号（cache_versions 表）
+
+进程内缓存（utils/local_cache.py）之间没有通知机制：哪个进程改了数据，就在同一个事务里把
+对应名字的版本号加 1；各进程定期按主键查一次版本号，发现变化就重新加载。
+按名字做版本号失效的缓存用 VersionedCache，写入方只需调用它的 changed() / refresh()。
+"""
+from datetime import datetime
+
+from sqlalchemy import select, update
+
+from db_config import db
+from models import CacheVersion
+from utils.local_cache import LocalCache
+
+# 工序、规格型号及单价（utils/ref_data.py、utils/spec_prices.py）
+REFERENCE = 'reference'
+# 库存规格分类及规格值（utils/spec_tree.py）
+INVENTORY_SPEC = 'inventory_spec'
+# 工人及其工序名（utils/roster_index.py、工人列表 ETag）
+ROSTER = 'roster'
+
+
+def get_version(name):
+    return db.session.scalar(select(CacheVersion.version).where(CacheVersion.name == name))
+
+
+def bump(name):
+    """版本号加 1（不提交，和数据改动同一事务）"""
+    result = db.session.execute(
+        update(CacheVersion)
+        .where(CacheVersion.name == name)
+        .values(version=CacheVersion.version + 1, updated_at=datetime.utcnow())
+    )
+    if result.rowcount == 0:
+        db.session.add(CacheVersion(name=name, version=1, updated_at=datetime.utcnow()))
+
+
+def reference_version():
+    return get_version(REFERENCE)
+
+
+class VersionedCache(LocalCache):
+    """
+    以 cache_versions 中 name 行的版本号判断是否过期的进程内缓存（其余参数同 LocalCache）
+
+    写入缓存数据的一方：
+    - changed(): 写入后、提交前调用，版本号加 1（和数据改动同一事务），
+      其他进程最迟 check_interval 秒后重新加载
+    - refresh(): 提交后调用，本进程立即失效
+    """
+
+    def __init__(self, name, loader, ttl=300, check_interval=5):
+        self.name = name
+        super().__init__(loader, ttl=ttl, version=self.current_version, check_interval=check_interval)
+
+    def current_version(self):
+        return get_version(self.name)
+
+    def changed(self):
+        bump(self.name)
+
+    def refresh(self):
+        self.invalidate()
@@ -21,18 +21,23 @@ def roles_required(*required_roles):
     使用示例:
         @roles_required('管理员', '会计')
     """
+    required = frozenset(required_roles)
+
     def decorator(f):
         @wraps(f)
         @login_required  # 先确保用户已登录
         def wrapper(*args, **kwargs):
             user = g.current_user
-            role_names = [role.name for role in getattr(user, 'roles', [])]
+            # 登录时已解析好的角色集合（见 utils/token_cache.CurrentUser），不再每次关联查询 user_roles
+            role_names = getattr(user, 'role_names', None)
+            if role_names is None:
+                role_names = frozenset(role.name for role in getattr(user, 'roles', []))
             # print(f"用户角色: {role_names}")  # 可以打印调试
 
             # 检查是否有权限
-            if not any(r in role_names for r in required_roles):
+            if required.isdisjoint(role_names):
                 return jsonify({'code': 403, 'msg': '权限不足'}), 403
 
             return f(*args, **kwargs)
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
@@ -0,0 +1,57 @@
+"""
+条件 GET（ETag / If-None-Match）和响应压缩
+
+前端轮询的列表接口先用一条很便宜的查询（行数、最大更新时间、版本号等）算出 ETag，
+与请求头 If-None-Match 一致时直接返回 304，不查明细也不序列化。
+车间 Wi-Fi 信号差，较大的 JSON 响应在客户端支持时用 gzip 压缩后再发送。
+"""
+import gzip
+import hashlib
+
+from flask import request, make_response
+
+GZIP_MIN_SIZE = 1024
+GZIP_ETAG_SUFFIX = '-gz'
+
+
+def make_etag(*parts):
+    """把决定内容的各个值拼起来取摘要"""
+    raw = '|'.join('' if p is None else str(p) for p in parts)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def not_modified(etag):
+    """请求带的 If-None-Match 与 etag（或其 gzip 版本）一致时返回 304 响应，否则返回 None"""
+    for candidate in (etag, etag + GZIP_ETAG_SUFFIX):
+        if request.if_none_match.contains(candidate):
+            response = make_response('', 304)
+            response.set_etag(candidate)
+            return response
+    return None
+
+
+def with_etag(response, etag, max_age=0):
+    """给响应加上 ETag；max_age=0 表示每次都要带 If-None-Match 回来确认"""
+    response = make_response(response)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = f'private, max-age={max_age}, must-revalidate'
+    return response
+
+
+def gzip_response(response, level=6):
+    """客户端 Accept-Encoding 支持 gzip 且响应体较大时压缩；压缩后的 ETag 加后缀，与未压缩版本区分"""
+    response = make_response(response)
+    response.vary.add('Accept-Encoding')
+    if 'gzip' not in request.accept_encodings or response.direct_passthrough \
+            or response.status_code != 200 or 'Content-Encoding' in response.headers:
+        return response
+
+    data = response.get_data()
+    if len(data) < GZIP_MIN_SIZE:
+        return response
+    response.set_data(gzip.compress(data, compresslevel=level))
+    response.headers['Content-Encoding'] = 'gzip'
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(etag + GZIP_ETAG_SUFFIX, weak)
+    return response
@@ -0,0 +1,59 @@
+"""
+进程内只读缓存
+
+缓存一个“整体加载”的值（参考数据、索引结构等）：第一次访问时调用 loader 加载，
+之后直接返回内存里的结果，直到超过 ttl 秒或本进程调用了 invalidate()。
+
+多进程部署时，别的进程只能等 ttl 过期，所以 ttl 就是跨进程的最大延迟。
+传了 version（返回当前版本号的函数，见 utils/cache_versions.py）时，每隔 check_interval 秒
+比对一次版本号，别的进程改了数据并递增版本号后，最迟 check_interval 秒就会重新加载。
+"""
+import threading
+import time
+
+
+class LocalCache:
+    def __init__(self, loader, ttl=300, version=None, check_interval=5):
+        self.loader = loader
+        self.ttl = ttl
+        self.version = version
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        # (加载时间, 值, 加载时的版本号, 上次比对版本号的时间)，整体替换，读的时候不用加锁
+        self._entry = None
+        self._generation = 0  # 每次 invalidate 加 1，加载期间被失效的结果不写回
+
+    def _fresh(self, entry, now):
+        return entry is not None and now - entry[0] < self.ttl
+
+    def _checked(self, entry, now):
+        return self.version is None or now - entry[3] < self.check_interval
+
+    def get(self):
+        entry = self._entry
+        now = time.monotonic()
+        if self._fresh(entry, now) and self._checked(entry, now):
+            return entry[1]
+
+        with self._lock:
+            entry = self._entry
+            now = time.monotonic()
+            if self._fresh(entry, now):
+                if self._checked(entry, now):
+                    return entry[1]
+                current = self.version()
+                if current == entry[2]:
+                    self._entry = (entry[0], entry[1], entry[2], now)
+                    return entry[1]
+            else:
+                current = self.version() if self.version is not None else None
+
+            generation = self._generation
+            entry = (now, self.loader(), current, now)
+            if generation == self._generation:
+                self._entry = entry
+            return entry[1]
+
+    def invalidate(self):
+        self._generation += 1
+        self._entry = None
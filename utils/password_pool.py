@@ -0,0 +1,70 @@
+"""
+登录密码校验线程池
+
+pbkdf2 校验很吃 CPU，早班集中登录时会把所有 WSGI worker 线程都占住，连带普通的 token 请求也要排队。
+这里把密码哈希放到一个独立的、有上限的线程池里跑（hashlib.pbkdf2_hmac 计算时会释放 GIL）：
+
+- LOGIN_HASH_WORKERS: 同时进行的哈希计算数
+- LOGIN_HASH_QUEUE:   允许排队等待的登录数，超过直接拒绝（接口返回 429）
+- LOGIN_HASH_TIMEOUT: 单次等待结果的最长秒数，超时同样按繁忙处理
+
+压测见 scripts/bench_login_pool.py
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from flask import current_app
+
+
+class PasswordPoolBusy(Exception):
+    """线程池已满或等待超时"""
+
+
+class PasswordPool:
+    def __init__(self, workers, queue_size=0, timeout=10):
+        self.workers = workers
+        self.timeout = timeout
+        # 正在计算 + 排队中的任务总数上限
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pwhash')
+
+    def run(self, fn, *args):
+        """在线程池中执行 fn(*args) 并等待结果，池满时立即抛 PasswordPoolBusy"""
+        if not self._slots.acquire(blocking=False):
+            raise PasswordPoolBusy()
+
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise PasswordPoolBusy()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_password_pool():
+    """按当前 app 配置懒加载进程级单例"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                config = current_app.config
+                workers = config.get('LOGIN_HASH_WORKERS') or os.cpu_count() or 2
+                _pool = PasswordPool(
+                    workers=workers,
+                    queue_size=config.get('LOGIN_HASH_QUEUE', workers * 4),
+                    timeout=config.get('LOGIN_HASH_TIMEOUT', 10),
+                )
+    return _pool
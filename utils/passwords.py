@@ -0,0 +1,109 @@
+"""
+密码哈希强度配置与自动校准
+
+原来 set_password 写死 pbkdf2:sha256 + Werkzeug 默认迭代次数（60 万次），
+在不同机器上单次校验耗时差别很大，也没法在“登录吞吐”和“哈希强度”之间调节。
+
+- PASSWORD_HASH_ITERATIONS: 固定迭代次数，默认 600000；设为 'auto' 时按本机速度校准（需显式开启）
+- PASSWORD_HASH_TARGET_MS:  自动校准的目标单次校验耗时（毫秒）
+- PASSWORD_HASH_MIN_ITERATIONS / PASSWORD_HASH_MAX_ITERATIONS: 校准结果的上下限
+- PASSWORD_REHASH_TOLERANCE: 已存哈希的迭代次数与当前目标相差超过该比例时，登录成功后透明重算
+
+这样调整参数后不需要让用户重置密码，老哈希会在各自下次登录时逐步换成新参数。
+
+'auto' 在每个进程里各自校准：多台机器或负载不同的进程会得到不同的迭代次数，相差超过容差时
+会互相把对方生成的哈希当成过时的反复重算。多进程 / 多机部署请用固定值
+（可以先在目标机器上跑一次 calibrate_iterations() 得到建议值再写进配置）。
+"""
+import hashlib
+import threading
+import time
+
+from flask import current_app, has_app_context
+from werkzeug.security import generate_password_hash
+
+HASH_METHOD = 'pbkdf2:sha256'
+
+DEFAULTS = {
+    'PASSWORD_HASH_ITERATIONS': 600000,
+    'PASSWORD_HASH_TARGET_MS': 250,
+    'PASSWORD_HASH_MIN_ITERATIONS': 100000,
+    'PASSWORD_HASH_MAX_ITERATIONS': 2000000,
+    'PASSWORD_REHASH_TOLERANCE': 0.2,
+}
+
+_calibrated = {}
+_calibrate_lock = threading.Lock()
+
+
+def _config(key):
+    if has_app_context():
+        return current_app.config.get(key, DEFAULTS[key])
+    return DEFAULTS[key]
+
+
+def calibrate_iterations(target_ms, min_iterations, max_iterations, sample_iterations=20000):
+    """测本机 pbkdf2-sha256 的速度，换算出耗时约为 target_ms 的迭代次数（按 1 万取整）"""
+    best = None
+    for _ in range(3):
+        t0 = time.perf_counter()
+        hashlib.pbkdf2_hmac('sha256', b'calibrate', b'0123456789abcdef', sample_iterations)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+
+    per_iteration_ms = best * 1000 / sample_iterations
+    iterations = int(target_ms / per_iteration_ms) // 10000 * 10000
+    return max(min_iterations, min(max_iterations, iterations))
+
+
+def current_hash_iterations():
+    """当前应使用的迭代次数；auto 模式下每个进程只校准一次"""
+    iterations = _config('PASSWORD_HASH_ITERATIONS')
+    if iterations != 'auto':
+        return int(iterations)
+
+    key = (
+        _config('PASSWORD_HASH_TARGET_MS'),
+        _config('PASSWORD_HASH_MIN_ITERATIONS'),
+        _config('PASSWORD_HASH_MAX_ITERATIONS'),
+    )
+    if key not in _calibrated:
+        with _calibrate_lock:
+            if key not in _calibrated:
+                _calibrated[key] = calibrate_iterations(*key)
+    return _calibrated[key]
+
+
+def hash_password(password, iterations=None):
+    """
+    生成密码哈希
+    iterations 为空时按当前配置取值；在线程池里调用时请先在请求线程里取好再传进来
+    """
+    if iterations is None:
+        iterations = current_hash_iterations()
+    return generate_password_hash(password, method=f'{HASH_METHOD}:{iterations}')
+
+
+def parse_hash_params(pw_hash):
+    """
+    解析 Werkzeug 哈希串 'pbkdf2:sha256:600000$salt$hash'
+    返回 (method, iterations)，无法识别时 iterations 为 None
+    """
+    method = pw_hash.split('$', 1)[0]
+    parts = method.split(':')
+    if len(parts) == 3 and parts[2].isdigit():
+        return ':'.join(parts[:2]), int(parts[2])
+    return ':'.join(parts[:2]), None
+
+
+def needs_rehash(pw_hash, iterations=None):
+    """已存哈希的算法或迭代次数与当前配置不符（超出容差）时返回 True"""
+    if iterations is None:
+        iterations = current_hash_iterations()
+
+    method, stored = parse_hash_params(pw_hash)
+    if method != HASH_METHOD or stored is None:
+        return True
+
+    tolerance = _config('PASSWORD_REHASH_TOLERANCE')
+    return abs(stored - iterations) > iterations * tolerance
@@ -0,0 +1,270 @@
+"""
+工资结账
+
+结账（close）时从工资日汇总表按 工人 × 工序 × 规格型号 汇总当月工资，一次写入工资单快照表
+（payslip_snapshots / payslip_snapshot_lines），之后查询已结账月份的工资单、月度汇总
+都直接读快照，不再聚合工资记录。
+
+已结账月份的工资记录不允许新增 / 修改 / 删除 / 导入 / 调价（ensure_open 抛 PeriodClosed，接口返回 409）；
+需要调整时先重开（reopen，删除快照），改完再重新结账。
+"""
+from collections import defaultdict
+from datetime import date, datetime
+import calendar
+
+from sqlalchemy import delete, func, insert, select
+
+from db_config import db
+from models import (
+    WageDailySummary, Worker, Process, SpecModel,
+    PayrollPeriod, PayslipSnapshot, PayslipSnapshotLine,
+)
+
+STATUS_CLOSED = '已结账'
+STATUS_REOPENED = '已重开'
+
+
+class PeriodClosed(Exception):
+    def __init__(self, months):
+        self.months = sorted(months)
+        super().__init__(f"工资月份已结账: {', '.join(self.months)}，请先重开")
+
+
+def month_of(d):
+    return d.strftime('%Y-%m')
+
+
+def month_range(month):
+    """'YYYY-MM' -> (当月第一天, 当月最后一天)，格式不对抛 ValueError"""
+    month_start = datetime.strptime(month, '%Y-%m').date()
+    last_day = calendar.monthrange(month_start.year, month_start.month)[1]
+    return month_start, date(month_start.year, month_start.month, last_day)
+
+
+def closed_months():
+    """全部已结账月份（一年最多十二个，整体查出来给批量导入逐行比对）"""
+    return set(db.session.scalars(
+        select(PayrollPeriod.month).where(PayrollPeriod.status == STATUS_CLOSED)
+    ))
+
+
+def get_closed_period(month):
+    return PayrollPeriod.query.filter_by(month=month, status=STATUS_CLOSED).first()
+
+
+def ensure_open(*dates):
+    """任一日期所在月份已结账时抛 PeriodClosed"""
+    months = {month_of(d) for d in dates if d is not None}
+    if not months:
+        return
+    closed = set(db.session.scalars(
+        select(PayrollPeriod.month).where(
+            PayrollPeriod.month.in_(months),
+            PayrollPeriod.status == STATUS_CLOSED,
+        )
+    ))
+    if closed:
+        raise PeriodClosed(closed)
+
+
+def ensure_range_open(start, end):
+    """日期区间（两端可为空，表示不限）内有已结账月份时抛 PeriodClosed"""
+    conditions = [PayrollPeriod.status == STATUS_CLOSED]
+    if start is not None:
+        conditions.append(PayrollPeriod.month >= month_of(start))
+    if end is not None:
+        conditions.append(PayrollPeriod.month <= month_of(end))
+    closed = set(db.session.scalars(select(PayrollPeriod.month).where(*conditions)))
+    if closed:
+        raise PeriodClosed(closed)
+
+
+def _live_lines(month_start, month_end):
+    """从工资日汇总表按 工人 × 工序 × 规格型号 汇总一个月"""
+    return db.session.execute(
+        select(
+            WageDailySummary.worker_id,
+            Worker.name.label('worker_name'),
+            WageDailySummary.process_id,
+            Process.name.label('process_name'),
+            WageDailySummary.spec_model_id,
+            SpecModel.name.label('spec_model_name'),
+            func.sum(WageDailySummary.quantity).label('quantity'),
+            func.sum(WageDailySummary.total_wage).label('total_wage'),
+            func.sum(WageDailySummary.log_count).label('log_count'),
+        )
+        .outerjoin(Worker, Worker.id == WageDailySummary.worker_id)
+        .outerjoin(Process, Process.id == WageDailySummary.process_id)
+        .outerjoin(SpecModel, SpecModel.id == WageDailySummary.spec_model_id)
+        .where(WageDailySummary.date >= month_start, WageDailySummary.date <= month_end)
+        .group_by(
+            WageDailySummary.worker_id, Worker.name,
+            WageDailySummary.process_id, Process.name,
+            WageDailySummary.spec_model_id, SpecModel.name,
+        )
+        .order_by(WageDailySummary.worker_id, WageDailySummary.process_id, WageDailySummary.spec_model_id)
+    ).mappings().all()
+
+
+def close(month, user_id=None):
+    """结账：生成工资单快照，返回 PayrollPeriod（不提交）"""
+    month_start, month_end = month_range(month)
+
+    period = PayrollPeriod.query.filter_by(month=month).first()
+    if period is not None and period.status == STATUS_CLOSED:
+        raise PeriodClosed([month])
+    if period is None:
+        period = PayrollPeriod(month=month)
+        db.session.add(period)
+    period.status = STATUS_CLOSED
+    period.closed_at = datetime.utcnow()
+    period.closed_by = user_id
+    db.session.flush()
+
+    lines = [dict(line, period_id=period.id) for line in _live_lines(month_start, month_end)]
+
+    payslips = {}
+    for line in lines:
+        slip = payslips.get(line['worker_id'])
+        if slip is None:
+            slip = payslips[line['worker_id']] = {
+                'period_id': period.id,
+                'worker_id': line['worker_id'],
+                'worker_name': line['worker_name'],
+                'quantity': 0,
+                'total_wage': 0,
+                'log_count': 0,
+            }
+        slip['quantity'] += int(line['quantity'])
+        slip['total_wage'] += line['total_wage']
+        slip['log_count'] += int(line['log_count'])
+
+    if lines:
+        db.session.execute(
+            insert(PayslipSnapshotLine.__table__),
+            [{k: v for k, v in line.items() if k != 'worker_name'} for line in lines]
+        )
+        db.session.execute(insert(PayslipSnapshot.__table__), list(payslips.values()))
+
+    period.worker_count = len(payslips)
+    period.log_count = sum(s['log_count'] for s in payslips.values())
+    period.total_quantity = sum(s['quantity'] for s in payslips.values())
+    period.total_wage = sum((s['total_wage'] for s in payslips.values()), 0)
+    return period
+
+
+def reopen(month, user_id=None):
+    """重开：删除快照，返回 PayrollPeriod；该月未结账时返回 None（不提交）"""
+    period = get_closed_period(month)
+    if period is None:
+        return None
+    db.session.execute(delete(PayslipSnapshotLine).where(PayslipSnapshotLine.period_id == period.id))
+    db.session.execute(delete(PayslipSnapshot).where(PayslipSnapshot.period_id == period.id))
+    period.status = STATUS_REOPENED
+    period.reopened_at = datetime.utcnow()
+    period.reopened_by = user_id
+    return period
+
+
+def period_to_dict(period):
+    return {
+        'month': period.month,
+        'status': period.status,
+        'worker_count': period.worker_count,
+        'log_count': period.log_count,
+        'total_quantity': int(period.total_quantity or 0),
+        'total_wage': float(period.total_wage or 0),
+        'closed_at': period.closed_at.strftime('%Y-%m-%d %H:%M:%S') if period.closed_at else None,
+        'reopened_at': period.reopened_at.strftime('%Y-%m-%d %H:%M:%S') if period.reopened_at else None,
+    }
+
+
+def _line_to_dict(line):
+    return {
+        'process_id': line['process_id'],
+        'process': line['process_name'],
+        'spec_model_id': line['spec_model_id'],
+        'spec_model': line['spec_model_name'],
+        'quantity': int(line['quantity'] or 0),
+        'total_wage': float(line['total_wage'] or 0),
+        'log_count': int(line['log_count'] or 0),
+    }
+
+
+def payslips(month, worker_id=None):
+    """
+    工资单（每个工人一张，含工序 / 规格型号明细）
+    已结账月份读快照，未结账月份从工资日汇总表现算；返回 (是否已结账, 工资单列表)
+    """
+    period = get_closed_period(month)
+    if period is not None:
+        slip_query = PayslipSnapshot.query.filter_by(period_id=period.id)
+        line_query = select(PayslipSnapshotLine.__table__).where(PayslipSnapshotLine.period_id == period.id)
+        if worker_id:
+            slip_query = slip_query.filter_by(worker_id=worker_id)
+            line_query = line_query.where(PayslipSnapshotLine.worker_id == worker_id)
+
+        lines = defaultdict(list)
+        for line in db.session.execute(
+            line_query.order_by(PayslipSnapshotLine.process_id, PayslipSnapshotLine.spec_model_id)
+        ).mappings():
+            lines[line['worker_id']].append(_line_to_dict(line))
+
+        return True, [
+            {
+                'worker_id': s.worker_id,
+                'worker': s.worker_name,
+                'quantity': int(s.quantity),
+                'total_wage': float(s.total_wage),
+                'log_count': s.log_count,
+                'lines': lines[s.worker_id],
+            } for s in slip_query.order_by(PayslipSnapshot.worker_id)
+        ]
+
+    month_start, month_end = month_range(month)
+    result = {}
+    for line in _live_lines(month_start, month_end):
+        if worker_id and line['worker_id'] != worker_id:
+            continue
+        slip = result.get(line['worker_id'])
+        if slip is None:
+            slip = result[line['worker_id']] = {
+                'worker_id': line['worker_id'],
+                'worker': line['worker_name'],
+                'quantity': 0,
+                'total_wage': 0.0,
+                'log_count': 0,
+                'lines': [],
+            }
+        item = _line_to_dict(line)
+        slip['quantity'] += item['quantity']
+        slip['total_wage'] += item['total_wage']
+        slip['log_count'] += item['log_count']
+        slip['lines'].append(item)
+    return False, list(result.values())
+
+
+def monthly_summary(period, by, worker_id=None, process_id=None):
+    """已结账月份的月度汇总（按工人 / 工序），从快照明细聚合"""
+    if by == 'worker':
+        group_cols = (PayslipSnapshotLine.worker_id, PayslipSnapshot.worker_name)
+    else:
+        group_cols = (PayslipSnapshotLine.process_id, PayslipSnapshotLine.process_name)
+
+    query = (
+        select(
+            group_cols[0].label('id'),
+            group_cols[1].label('name'),
+            func.sum(PayslipSnapshotLine.quantity).label('quantity'),
+            func.sum(PayslipSnapshotLine.total_wage).label('total_wage'),
+            func.sum(PayslipSnapshotLine.log_count).label('log_count'),
+        )
+        .join(PayslipSnapshot, (PayslipSnapshot.period_id == PayslipSnapshotLine.period_id)
+              & (PayslipSnapshot.worker_id == PayslipSnapshotLine.worker_id))
+        .where(PayslipSnapshotLine.period_id == period.id)
+    )
+    if worker_id:
+        query = query.where(PayslipSnapshotLine.worker_id == worker_id)
+    if process_id:
+        query = query.where(PayslipSnapshotLine.process_id == process_id)
+    return db.session.execute(query.group_by(*group_cols).order_by(group_cols[0])).all()
@@ -0,0 +1,85 @@
+"""
+工序 / 规格型号参考数据缓存
+
+工序、规格型号一个月才改几次，但工序列表、规格列表、按工序取规格这几个接口每次都查库，
+工资记录列表还要 JOIN 两张表取名称。这里把它们整体读进内存：
+
+- processes: 工序列表（不含已停用的，all_processes 含停用）
+- spec_models: 规格型号列表（带工序名；不含已停用的，all_spec_models 含停用）
+- specs_by_process: 工序 id -> 该工序下未停用的规格型号
+- process_names / spec_names: id -> 名称（含停用，历史工资记录要显示）
+- spec_prices: 规格型号 id -> 当前单价
+- disabled_process_ids / disabled_spec_ids: 已停用的 id，新录入的工资记录不能再用
+
+process / spec_model 相关接口写入时在同一事务里递增 cache_versions 中 reference 的版本号，
+各进程每 REF_CACHE_CHECK_INTERVAL 秒按主键查一次版本号，变化了才重新加载。
+"""
+from sqlalchemy import select
+
+from db_config import db
+from models import Process, SpecModel
+from utils import cache_versions
+
+REF_CACHE_CHECK_INTERVAL = 5
+REF_CACHE_TTL = 3600
+
+
+class RefData:
+    def __init__(self, processes, spec_models, version=None):
+        """version: 加载时 cache_versions 中 reference 的版本号"""
+        self.version = version
+        process_names = {p.id: p.name for p in processes}
+
+        self.all_processes = [
+            {'id': p.id, 'name': p.name, 'description': p.description, 'is_active': p.is_active}
+            for p in processes
+        ]
+        self.all_spec_models = [
+            {
+                'id': s.id,
+                'name': s.name,
+                'category': s.category,
+                'process_id': s.process_id,
+                'process_name': process_names.get(s.process_id),
+                'price': s.price,
+                'is_active': s.is_active
+            } for s in spec_models
+        ]
+        self.processes = [p for p in self.all_processes if p['is_active']]
+        self.spec_models = [s for s in self.all_spec_models if s['is_active']]
+        self.specs_by_process = {}
+        for s in spec_models:
+            if s.is_active:
+                self.specs_by_process.setdefault(s.process_id, []).append(s.to_dict())
+        self.disabled_process_ids = {p.id for p in processes if not p.is_active}
+        self.disabled_spec_ids = {s.id for s in spec_models if not s.is_active}
+
+        self.process_names = process_names
+        self.spec_names = {s.id: s.name for s in spec_models}
+        self.spec_prices = {s.id: s.price for s in spec_models}
+
+
+def _load():
+    version = cache_versions.reference_version()
+    processes = db.session.scalars(select(Process).order_by(Process.id)).all()
+    spec_models = db.session.scalars(select(SpecModel).order_by(SpecModel.process_id, SpecModel.id)).all()
+    return RefData(processes, spec_models, version)
+
+
+ref_cache = cache_versions.VersionedCache(
+    cache_versions.REFERENCE,
+    _load,
+    ttl=REF_CACHE_TTL,
+    check_interval=REF_CACHE_CHECK_INTERVAL
+)
+changed = ref_cache.changed
+refresh = ref_cache.refresh
+
+
+def get(version=None):
+    """传入刚查到的版本号时，与缓存加载时的版本不一致就立即重新加载（用于生成 ETag 的接口）"""
+    data = ref_cache.get()
+    if version is not None and data.version != version:
+        ref_cache.invalidate()
+        data = ref_cache.get()
+    return data
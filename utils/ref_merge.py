@@ -0,0 +1,273 @@
+"""
+工序 / 规格型号合并
+
+同一工序下重复建的规格型号（或重复的工序）合并到保留的那一个（target）：
+1. 写合并记录（状态“合并中”），停用 source（is_active=false），递增参考数据版本号，先提交
+2. 逐表把引用 source 的行改指向 target，按 id 游标分批，每批在一个事务里：
+   - 把这批行 id 记入 ref_merge_rows（INSERT ... SELECT）
+   - 按汇总键统计这批行的数量、工资、条数，旧键减、新键加，同步到工资日汇总表
+   - 一条 UPDATE ... WHERE id IN (...) AND 列 = source
+   每批单独提交，不长时间锁表
+3. 全部改完后状态改为“已合并”
+
+撤销（undo）按 ref_merge_rows 记下的行 id 分批改回 source，同样同步汇总表，最后重新启用 source。
+工资记录的 id 在 wage_logs 和归档表之间搬动时不变，合并后被归档 / 搬回的行仍要改回：
+撤销时两张工资表都按两张表名下记的全部行 id 匹配。
+中途失败时合并记录停在“合并中 / 撤销中”，再次执行同一操作会从剩下的行接着做（改过的行不再匹配条件）。
+
+规格型号只能合并到同一工序下的规格型号；工序合并时 source 下的工人、规格型号、工资记录都改到 target。
+合并只改引用、不改数量和金额，归档表一并处理。
+要改的工资记录有落在已结账月份的，合并 / 撤销都拒绝（抛 payroll.PeriodClosed，列出月份）：
+改了之后这些月份的汇总、明细就和结账快照对不上了，需要时先重开这些月份。
+preview 不做改动，返回各表要改的行数和涉及的已结账月份，供 dry_run 先看。
+"""
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import func, insert, literal, select, update
+
+from db_config import db
+from models import Process, RefMerge, RefMergeRow, SpecModel, WageLog, WageLogArchive, Worker
+from utils import payroll, ref_data, ref_usage, roster_index, wage_summary
+
+SPEC_MODEL = 'spec_model'
+PROCESS = 'process'
+
+STATUS_MERGING = '合并中'
+STATUS_MERGED = '已合并'
+STATUS_UNDOING = '撤销中'
+STATUS_UNDONE = '已撤销'
+
+DEFAULT_CHUNK_SIZE = 5000
+
+MODELS = {SPEC_MODEL: SpecModel, PROCESS: Process}
+
+# 同一批工资记录（id 相同）可能在这两张表之间搬动
+LOG_TABLES = ('wage_logs', 'wage_logs_archive')
+
+# 汇总键里各列的位置，见 wage_summary.KEY_FIELDS
+KEY_INDEX = {'process_id': 2, 'spec_model_id': 3}
+
+
+class MergeError(Exception):
+    pass
+
+
+def _tables(kind):
+    """合并要改的表：[(表名, 表, 列, 是否计入工资日汇总表)]"""
+    if kind == SPEC_MODEL:
+        return [
+            ('wage_logs', WageLog.__table__, 'spec_model_id', True),
+            ('wage_logs_archive', WageLogArchive.__table__, 'spec_model_id', True),
+        ]
+    return [
+        ('workers', Worker.__table__, 'process_id', False),
+        ('spec_models', SpecModel.__table__, 'process_id', False),
+        ('wage_logs', WageLog.__table__, 'process_id', True),
+        ('wage_logs_archive', WageLogArchive.__table__, 'process_id', True),
+    ]
+
+
+def _recorded_ids(record, name):
+    """合并时记下的行 id；工资表两张表名下的都算"""
+    names = LOG_TABLES if name in LOG_TABLES else (name,)
+    return select(RefMergeRow.row_id).where(
+        RefMergeRow.merge_id == record.id, RefMergeRow.table_name.in_(names)
+    )
+
+
+def closed_months_affected(kind, ref_id, record=None):
+    """引用 ref_id 的工资记录（撤销时只看合并记下的行）落在哪些已结账月份，每月每表一次探测"""
+    months = set()
+    for month in sorted(payroll.closed_months()):
+        month_start, month_end = payroll.month_range(month)
+        for name, table, column, with_summary in _tables(kind):
+            if not with_summary:
+                continue
+            query = select(table.c.id).where(
+                table.c[column] == ref_id, table.c.date >= month_start, table.c.date <= month_end
+            )
+            if record is not None:
+                query = query.where(table.c.id.in_(_recorded_ids(record, name)))
+            if db.session.scalar(query.limit(1)) is not None:
+                months.add(month)
+                break
+    return months
+
+
+def _summary_deltas(table, column, conditions, to_id):
+    """这批行在汇总表上的增减量：原汇总键减掉，改列后的汇总键加上"""
+    deltas = defaultdict(lambda: [0, Decimal('0'), 0])
+    for row in db.session.execute(
+        select(
+            table.c.date, table.c.worker_id, table.c.process_id, table.c.spec_model_id,
+            func.sum(table.c.quantity), func.sum(table.c.total_wage), func.count(table.c.id)
+        )
+        .where(*conditions)
+        .group_by(table.c.date, table.c.worker_id, table.c.process_id, table.c.spec_model_id)
+    ):
+        old_key = tuple(row[:4])
+        new_key = list(old_key)
+        new_key[KEY_INDEX[column]] = to_id
+        quantity, total_wage, count = int(row[4] or 0), Decimal(str(row[5] or 0)), row[6]
+        for key, sign in ((old_key, -1), (tuple(new_key), 1)):
+            delta = deltas[key]
+            delta[0] += sign * quantity
+            delta[1] += sign * total_wage
+            delta[2] += sign * count
+    return deltas
+
+
+def _remap(record, name, table, column, from_id, to_id, with_summary, chunk_size, undo=False):
+    """把一张表里 column = from_id 的行分批改成 to_id 并逐批提交，返回改动行数"""
+    col = table.c[column]
+    changed = 0
+    last_id = 0
+    while True:
+        if undo:
+            # 撤销只改合并时记下的行，合并后归档 / 搬回过的行按另一张表名下的 id 也能找到
+            id_query = _recorded_ids(record, name).where(RefMergeRow.row_id > last_id).order_by(RefMergeRow.row_id)
+        else:
+            id_query = select(table.c.id).where(col == from_id, table.c.id > last_id).order_by(table.c.id)
+        ids = list(db.session.scalars(id_query.limit(chunk_size)))
+        if not ids:
+            break
+        last_id = ids[-1]
+
+        conditions = (table.c.id.in_(ids), col == from_id)
+        if not undo:
+            db.session.execute(
+                insert(RefMergeRow).from_select(
+                    ['merge_id', 'table_name', 'row_id'],
+                    select(literal(record.id), literal(name), table.c.id).where(*conditions)
+                )
+            )
+        if with_summary:
+            wage_summary.apply_deltas(_summary_deltas(table, column, conditions, to_id))
+        result = db.session.execute(
+            update(table).where(*conditions).values({column: to_id, 'updated_at': datetime.utcnow()})
+        )
+        if not undo:
+            record.row_count += result.rowcount
+        db.session.commit()
+        changed += result.rowcount
+    return changed
+
+
+def _changed(kind):
+    """提交前调用：工序合并改了工人的工序，工人名单版本号也要递增"""
+    ref_data.changed()
+    if kind == PROCESS:
+        roster_index.changed()
+
+
+def _finish(kind):
+    ref_data.refresh()
+    if kind == PROCESS:
+        roster_index.refresh()
+
+
+def _load(kind, source_id, target_id):
+    model = MODELS[kind]
+    source = db.session.get(model, source_id)
+    target = db.session.get(model, target_id)
+    if source is None or target is None:
+        raise MergeError('要合并的工序 / 规格型号不存在')
+    if source_id == target_id:
+        raise MergeError('不能合并到自身')
+    if not target.is_active:
+        raise MergeError('不能合并到已停用的工序 / 规格型号')
+    if kind == SPEC_MODEL and source.process_id != target.process_id:
+        raise MergeError('只能合并同一工序下的规格型号')
+    return source, target
+
+
+def preview(kind, source_id, target_id):
+    """不做改动：各表要改的行数（最多数到 USAGE_COUNT_LIMIT）和涉及的已结账月份"""
+    _load(kind, source_id, target_id)
+    usage = ref_usage.spec_model_usage(source_id) if kind == SPEC_MODEL else ref_usage.process_usage(source_id)
+    return {'updated': usage, 'closed_months': sorted(closed_months_affected(kind, source_id))}
+
+
+def merge(kind, source_id, target_id, user_id=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """把 source 合并到 target，返回 (合并记录, {表名: 改动行数})；中途会多次提交"""
+    source, target = _load(kind, source_id, target_id)
+    closed = closed_months_affected(kind, source_id)
+    if closed:
+        raise payroll.PeriodClosed(closed)
+
+    # 同一对之前没做完的合并接着做
+    record = RefMerge.query.filter_by(
+        kind=kind, source_id=source_id, target_id=target_id, status=STATUS_MERGING
+    ).first()
+    if record is None:
+        record = RefMerge(
+            kind=kind, source_id=source_id, target_id=target_id,
+            source_name=source.name, target_name=target.name,
+            status=STATUS_MERGING, row_count=0, merged_by=user_id
+        )
+        db.session.add(record)
+    # 先停用，避免合并过程中继续录入 source
+    source.is_active = False
+    ref_data.changed()
+    db.session.commit()
+    _finish(kind)
+
+    counts = {}
+    for name, table, column, with_summary in _tables(kind):
+        counts[name] = _remap(record, name, table, column, source_id, target_id, with_summary, chunk_size)
+
+    record.status = STATUS_MERGED
+    record.merged_at = datetime.utcnow()
+    _changed(kind)
+    db.session.commit()
+    _finish(kind)
+    return record, counts
+
+
+def undo(record, user_id=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """撤销合并：记下的行改回 source 并重新启用 source，返回 {表名: 改回行数}"""
+    if record.status == STATUS_UNDONE:
+        raise MergeError('合并已撤销')
+    source = db.session.get(MODELS[record.kind], record.source_id)
+    if source is None:
+        raise MergeError('被合并的工序 / 规格型号已删除，无法撤销')
+    closed = closed_months_affected(record.kind, record.target_id, record)
+    if closed:
+        raise payroll.PeriodClosed(closed)
+
+    record.status = STATUS_UNDOING
+    db.session.commit()
+
+    counts = {}
+    for name, table, column, with_summary in reversed(_tables(record.kind)):
+        counts[name] = _remap(
+            record, name, table, column, record.target_id, record.source_id, with_summary, chunk_size, undo=True
+        )
+
+    source.is_active = True
+    record.status = STATUS_UNDONE
+    record.undone_at = datetime.utcnow()
+    record.undone_by = user_id
+    _changed(record.kind)
+    db.session.commit()
+    _finish(record.kind)
+    return counts
+
+
+def merge_to_dict(record):
+    return {
+        'id': record.id,
+        'kind': record.kind,
+        'source_id': record.source_id,
+        'source_name': record.source_name,
+        'target_id': record.target_id,
+        'target_name': record.target_name,
+        'status': record.status,
+        'row_count': record.row_count,
+        'merged_at': record.merged_at.strftime('%Y-%m-%d %H:%M:%S') if record.merged_at else None,
+        'merged_by': record.merged_by,
+        'undone_at': record.undone_at.strftime('%Y-%m-%d %H:%M:%S') if record.undone_at else None,
+        'undone_by': record.undone_by,
+    }
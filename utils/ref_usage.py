@@ -0,0 +1,48 @@
+"""
+工序 / 规格型号的引用检查
+
+删除前要知道还有哪些数据引用它。直接 db.session.delete() 时 SQLAlchemy 会把 workers、spec_models、
+wage_logs 等关系整个加载进来处理外键，常用规格型号一次能读出几万条工资记录，最后还是因为外键失败。
+
+这里每张表一条走索引的探测查询：SELECT COUNT(*) FROM (SELECT 1 ... WHERE 外键 = ? LIMIT n)，
+找到第一行就说明被引用（等同 EXISTS），最多数到 USAGE_COUNT_LIMIT 行就停，返回各表引用数。
+
+不单独检查的表：
+- wage_daily_summary：由 wage_logs / wage_logs_archive 汇总而来，有汇总行就一定有工资记录
+- spec_model_prices：规格型号自己的单价历史，随规格型号一起删除
+- payslip_snapshot_lines：结账快照里存的是名称，删除后工资单照样能看
+"""
+from sqlalchemy import select, func, literal
+
+from db_config import db
+from models import Worker, SpecModel, WageLog, WageLogArchive
+
+# 引用数最多数到这么多；返回值等于它时表示“至少这么多”
+USAGE_COUNT_LIMIT = 10000
+
+
+def _probe(column, value, limit=USAGE_COUNT_LIMIT):
+    rows = select(literal(1)).where(column == value).limit(limit).subquery()
+    return db.session.scalar(select(func.count()).select_from(rows))
+
+
+def process_usage(process_id):
+    """工序被引用的情况：{表名: 引用行数}"""
+    return {
+        'workers': _probe(Worker.process_id, process_id),
+        'spec_models': _probe(SpecModel.process_id, process_id),
+        'wage_logs': _probe(WageLog.process_id, process_id),
+        'wage_logs_archive': _probe(WageLogArchive.process_id, process_id),
+    }
+
+
+def spec_model_usage(spec_model_id):
+    """规格型号被引用的情况：{表名: 引用行数}"""
+    return {
+        'wage_logs': _probe(WageLog.spec_model_id, spec_model_id),
+        'wage_logs_archive': _probe(WageLogArchive.spec_model_id, spec_model_id),
+    }
+
+
+def in_use(usage):
+    return any(usage.values())
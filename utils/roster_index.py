@@ -0,0 +1,148 @@
+"""
+工人在职区间索引
+
+录入工资时每打开一个日期都要查“这一天在职的工人”。原来每次都按
+entry_date <= d AND (leave_date IS NULL OR leave_date >= d) 扫 workers 表，再逐个懒加载工序。
+
+这里一次查询把全部工人（带工序名）读进内存，按入职日期排好序：
+- active_on(d): 二分找到入职日期 <= d 的前缀，再去掉已离职的，不查库
+- headcount(start, end, by): 区间内每天的在职人数（可按班组 / 工序分组），
+  每个工人的在职区间在差分数组上记一次 +1 / -1，最后一次累加得到每天人数，O(工人数 + 天数)
+
+版本号存在 cache_versions 的 roster 行：工人新增 / 修改 / 删除 / 批量导入、工序改名 / 删除 / 合并时，
+在同一事务里调用 changed() 递增版本号，提交后调用 refresh() 让本进程立即失效；
+其他进程每 ROSTER_INDEX_CHECK_INTERVAL 秒比对一次版本号，调用方带上 roster_version() 时不一致会立即重新加载。
+（不用 COUNT / MAX(updated_at) 推算版本：updated_at 只精确到秒，同一秒内的两次修改看不出变化）
+未填入职日期的工人不算在任何一天的在职名单里（与原来的 SQL 条件一致）。
+"""
+from bisect import bisect_right
+from itertools import accumulate
+
+from sqlalchemy import select
+
+from db_config import db
+from models import Worker, Process
+from utils import cache_versions
+
+ROSTER_INDEX_CHECK_INTERVAL = 5
+ROSTER_INDEX_TTL = 3600
+
+GROUP_KEYS = ('group', 'process_id')
+
+
+def worker_to_dict(worker, process_name=None):
+    """与工人列表接口的返回格式一致"""
+    return {
+        'id': worker.id,
+        'name': worker.name,
+        'id_card': worker.id_card,
+        'remark': worker.remark,
+        'group': worker.group,
+        'entry_date': worker.entry_date.strftime('%Y-%m-%d') if worker.entry_date else None,
+        'leave_date': worker.leave_date.strftime('%Y-%m-%d') if worker.leave_date else None,
+        'status': worker.status,
+        'process': {
+            'id': worker.process_id,
+            'name': process_name
+        } if worker.process_id is not None and process_name is not None else None
+    }
+
+
+def roster_version():
+    """工人名单的版本号（cache_versions 中 roster 行），按主键查一次"""
+    return cache_versions.get_version(cache_versions.ROSTER)
+
+
+class RosterIndex:
+    def __init__(self, rows, version=None):
+        """rows: (Worker, 工序名) 列表；version: 加载时的 roster_version()"""
+        self.version = version
+        dated = sorted(
+            ((worker, process_name) for worker, process_name in rows if worker.entry_date is not None),
+            key=lambda item: (item[0].entry_date, item[0].id)
+        )
+        self._entries = [worker.entry_date for worker, _ in dated]
+        self._leaves = [worker.leave_date for worker, _ in dated]
+        self._items = [worker_to_dict(worker, process_name) for worker, process_name in dated]
+        self._keys = {
+            'group': [worker.group or '' for worker, _ in dated],
+            'process_id': [worker.process_id for worker, _ in dated],
+        }
+        self.size = len(dated)
+
+    def active_on(self, on_date):
+        """on_date 当天在职的工人（列表接口格式），按 id 排序"""
+        end = bisect_right(self._entries, on_date)
+        items = [
+            item for item, leave in zip(self._items[:end], self._leaves[:end])
+            if leave is None or leave >= on_date
+        ]
+        items.sort(key=lambda item: item['id'])
+        return items
+
+    def headcount(self, start, end, by=None):
+        """
+        start ~ end（含两端）每天的在职人数
+        by=None 返回 {None: [人数, ...]}；by='group' / 'process_id' 返回 {分组: [人数, ...]}
+        """
+        if by is not None and by not in GROUP_KEYS:
+            raise ValueError(f'by 只能是 {", ".join(GROUP_KEYS)}')
+        days = (end - start).days + 1
+        if days <= 0:
+            return {}
+
+        keys = self._keys[by] if by else [None] * self.size
+        # 入职日期晚于 end 的工人不影响区间内的人数
+        stop = bisect_right(self._entries, end)
+
+        diffs = {}
+        for i in range(stop):
+            leave = self._leaves[i]
+            if leave is not None and leave < start:
+                continue
+            diff = diffs.get(keys[i])
+            if diff is None:
+                diff = diffs[keys[i]] = [0] * (days + 1)
+            first = max((self._entries[i] - start).days, 0)
+            last = days - 1 if leave is None else min((leave - start).days, days - 1)
+            if first > last:
+                continue
+            diff[first] += 1
+            diff[last + 1] -= 1
+
+        return {key: list(accumulate(diff[:days])) for key, diff in diffs.items()}
+
+
+def _load_index():
+    version = roster_version()
+    rows = db.session.execute(
+        select(Worker, Process.name).outerjoin(Process, Process.id == Worker.process_id)
+    ).all()
+    return RosterIndex(rows, version)
+
+
+roster_index = cache_versions.VersionedCache(
+    cache_versions.ROSTER,
+    _load_index,
+    ttl=ROSTER_INDEX_TTL,
+    check_interval=ROSTER_INDEX_CHECK_INTERVAL
+)
+changed = roster_index.changed
+refresh = roster_index.refresh
+
+
+def current(version=None):
+    """取索引；传入刚查到的 roster_version() 时，与索引加载时的版本不一致就重新加载"""
+    index = roster_index.get()
+    if version is not None and index.version != version:
+        roster_index.invalidate()
+        index = roster_index.get()
+    return index
+
+
+def active_on(on_date, version=None):
+    return current(version).active_on(on_date)
+
+
+def headcount(start, end, by=None, version=None):
+    return current(version).headcount(start, end, by)
@@ -0,0 +1,110 @@
+"""
+规格型号历史单价
+
+SpecModel.price 只是“当前单价”，改价后历史工资日期对应的单价就丢了。
+spec_model_prices 按生效区间保存每次调价，这里提供：
+
+- record_price(): 新增 / 修改某日起生效的单价，并重新推算该规格各区间的 effective_to
+- price_at(): 查询“规格 X 在日期 D 的单价”
+
+price_at 走进程内的区间索引：一次查询读出全部历史单价，按规格分组、按生效日期排好序，
+查询时二分查找（O(log n)），批量导入几千行也不用逐行查库。
+写入后本进程立即失效；其他进程通过 cache_versions 的 reference 版本号发现变化（与 utils/ref_data.py 相同）。
+"""
+from bisect import bisect_right
+from datetime import date, timedelta
+
+from sqlalchemy import select
+
+from db_config import db
+from models import SpecModelPrice
+from utils import cache_versions
+from utils.local_cache import LocalCache
+
+PRICE_INDEX_TTL = 3600
+PRICE_INDEX_CHECK_INTERVAL = 5
+
+# 生效日期为空（最早以来）时按这个日期排序
+_EARLIEST = date.min
+
+
+class PriceIndex:
+    """spec_model_id -> 按生效日期排序的 (起始日期列表, [(截止日期, 单价)])"""
+
+    def __init__(self, rows):
+        grouped = {}
+        for spec_model_id, price, effective_from, effective_to in rows:
+            grouped.setdefault(spec_model_id, []).append(
+                (effective_from or _EARLIEST, effective_to, price)
+            )
+
+        self._index = {}
+        for spec_model_id, items in grouped.items():
+            items.sort(key=lambda item: item[0])
+            self._index[spec_model_id] = (
+                [item[0] for item in items],
+                [(item[1], item[2]) for item in items],
+            )
+
+    def price_at(self, spec_model_id, on_date):
+        """on_date 当天生效的单价，没有覆盖该日期的记录时返回 None"""
+        entry = self._index.get(spec_model_id)
+        if entry is None:
+            return None
+        starts, items = entry
+        i = bisect_right(starts, on_date) - 1
+        if i < 0:
+            return None
+        effective_to, price = items[i]
+        if effective_to is not None and on_date > effective_to:
+            return None
+        return price
+
+
+def _load_index():
+    rows = db.session.execute(
+        select(
+            SpecModelPrice.spec_model_id,
+            SpecModelPrice.price,
+            SpecModelPrice.effective_from,
+            SpecModelPrice.effective_to,
+        )
+    ).all()
+    return PriceIndex(rows)
+
+
+price_index = LocalCache(
+    _load_index,
+    ttl=PRICE_INDEX_TTL,
+    version=cache_versions.reference_version,
+    check_interval=PRICE_INDEX_CHECK_INTERVAL
+)
+
+
+def price_at(spec_model_id, on_date):
+    return price_index.get().price_at(spec_model_id, on_date)
+
+
+def record_price(spec_model_id, price, effective_from=None, remark=None):
+    """
+    记录从 effective_from（为空表示最早以来）起生效的单价；同一生效日期已有记录则覆盖单价。
+    之后按生效日期重排该规格的全部记录，effective_to 取下一条的生效日期前一天。
+    不提交，由调用方提交后记录才对其他请求可见；调用方还需递增 reference 版本号（ref_data.changed()）
+    """
+    items = SpecModelPrice.query.filter_by(spec_model_id=spec_model_id).all()
+
+    record = next((p for p in items if p.effective_from == effective_from), None)
+    if record is None:
+        record = SpecModelPrice(spec_model_id=spec_model_id, effective_from=effective_from)
+        db.session.add(record)
+        items.append(record)
+    record.price = price
+    if remark is not None:
+        record.remark = remark
+
+    items.sort(key=lambda p: p.effective_from or _EARLIEST)
+    for current, following in zip(items, items[1:] + [None]):
+        current.effective_to = following.effective_from - timedelta(days=1) if following else None
+
+    price_index.invalidate()
+    return record
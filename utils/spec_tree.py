@@ -0,0 +1,56 @@
+"""
+库存规格树缓存（/api/inventory/spec/list）
+
+每个库存页面都要取一次规格分类 -> 规格值的树，原来先查分类、再逐个分类查规格值（N+1）。
+这里用一条 LEFT JOIN 查询整体读进内存，ETag 由版本号决定：
+规格分类 / 规格值的新增、修改、停用接口在同一事务里递增 cache_versions 中 inventory_spec 的版本号，
+各进程每 SPEC_TREE_CHECK_INTERVAL 秒按主键查一次版本号，其余请求不查库。
+"""
+from sqlalchemy import and_, select
+
+from db_config import db
+from exModels.inventory import SpecCategory, SpecOption
+from utils import cache_versions, http_cache
+
+SPEC_TREE_CHECK_INTERVAL = 5
+SPEC_TREE_TTL = 3600
+
+
+class SpecTree:
+    def __init__(self, rows, version=None):
+        """rows: (分类 id, 编码, 名称, 规格值 id, 规格值)，按分类、规格值排好序；没有规格值的分类规格值 id 为空"""
+        self.version = version
+        self.etag = http_cache.make_etag('inventory_spec_tree', version)
+        self.categories = []
+        current = None
+        for category_id, code, name, option_id, value in rows:
+            if current is None or current['id'] != category_id:
+                current = {'id': category_id, 'code': code, 'name': name, 'options': []}
+                self.categories.append(current)
+            if option_id is not None:
+                current['options'].append({'id': option_id, 'value': value})
+
+
+def _load():
+    version = spec_tree_cache.current_version()
+    rows = db.session.execute(
+        select(SpecCategory.id, SpecCategory.code, SpecCategory.name, SpecOption.id, SpecOption.value)
+        .outerjoin(SpecOption, and_(SpecOption.category_id == SpecCategory.id, SpecOption.is_active.is_(True)))
+        .where(SpecCategory.is_active.is_(True))
+        .order_by(SpecCategory.sort_order, SpecCategory.id, SpecOption.sort_order, SpecOption.id)
+    ).all()
+    return SpecTree(rows, version)
+
+
+spec_tree_cache = cache_versions.VersionedCache(
+    cache_versions.INVENTORY_SPEC,
+    _load,
+    ttl=SPEC_TREE_TTL,
+    check_interval=SPEC_TREE_CHECK_INTERVAL
+)
+changed = spec_tree_cache.changed
+refresh = spec_tree_cache.refresh
+
+
+def get():
+    return spec_tree_cache.get()
@@ -0,0 +1,131 @@
+"""
+登录 token 校验缓存（进程内）
+
+load_current_user 每个请求都要 decode JWT + 查 users 表比对 last_login_token（顶号校验），
+轮询接口下这一次查询占了大部分数据库往返。这里把“token 摘要 -> 已校验的用户信息”缓存在进程内：
+
+- key 为 token 的 sha256 摘要，不在内存里保存原始 token
+- 过期时间取 min(token 的 exp, 当前时间 + TOKEN_CACHE_TTL)
+- auth.login 轮换 last_login_token 时按 user_id 失效该用户的全部缓存
+- 缓存里带着用户的角色集合（role_names）。目前没有修改已有用户角色的接口（只有审核通过时给新用户分配角色，
+  新用户不会有缓存）；直接改 user_roles 表后，本进程最多 TOKEN_CACHE_TTL 秒后才按新角色鉴权。
+  以后新增改角色的接口，提交后要调用 token_cache.invalidate_user(user_id)
+
+注意：多进程部署时，其他 worker 进程的缓存只能等 TTL 过期，
+所以 TOKEN_CACHE_TTL 就是“被顶号后旧 token 最多还能用多久”，不宜设太大。
+"""
+import hashlib
+import threading
+import time
+
+from flask import current_app
+
+DEFAULT_TTL = 60          # 秒
+DEFAULT_MAX_ENTRIES = 10000
+
+
+class CurrentUser:
+    """
+    放到 g.current_user 上的轻量用户对象
+    常用字段（id / username / company_id / role_names）直接来自缓存，
+    role_names 是 frozenset，roles_required 直接拿来判断权限，
+    访问其他属性时才回表加载完整的 User（懒加载，每个请求最多一次）
+    """
+
+    def __init__(self, user_id, username, company_id, role_names, user=None):
+        self.id = user_id
+        self.username = username
+        self.company_id = company_id
+        self.role_names = frozenset(role_names)
+        self._user = user
+
+    def _load_user(self):
+        if self._user is None:
+            from db_config import db
+            from models import User
+            self._user = db.session.get(User, self.id)
+        return self._user
+
+    def __getattr__(self, name):
+        # 只有实例上没有的属性才会走到这里
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self._load_user(), name)
+
+    def __repr__(self):
+        return f'<CurrentUser {self.id} {self.username}>'
+
+
+class TokenCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}      # digest -> (expires_at, CurrentUser 构造参数)
+        self._by_user = {}      # user_id -> set(digest)
+
+    @staticmethod
+    def digest(token):
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    def get(self, token):
+        key = self.digest(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, fields = entry
+            if expires_at <= now:
+                self._discard(key, fields[0])
+                return None
+        return CurrentUser(*fields)
+
+    def set(self, token, user, role_names, exp=None):
+        ttl = current_app.config.get('TOKEN_CACHE_TTL', DEFAULT_TTL)
+        if not ttl:
+            return
+        max_entries = current_app.config.get('TOKEN_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES)
+
+        now = time.time()
+        expires_at = now + ttl
+        if exp is not None:
+            expires_at = min(expires_at, exp)
+        if expires_at <= now:
+            return
+
+        key = self.digest(token)
+        fields = (user.id, user.username, user.company_id, frozenset(role_names))
+        with self._lock:
+            if len(self._entries) >= max_entries:
+                self._evict_expired(now)
+                if len(self._entries) >= max_entries:
+                    # 仍然满了就整体清空，宁可多查几次库也不让内存无限增长
+                    self._entries.clear()
+                    self._by_user.clear()
+            self._entries[key] = (expires_at, fields)
+            self._by_user.setdefault(user.id, set()).add(key)
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for key in self._by_user.pop(user_id, ()):
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+    def _discard(self, key, user_id):
+        self._entries.pop(key, None)
+        keys = self._by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[user_id]
+
+    def _evict_expired(self, now):
+        expired = [(k, v[1][0]) for k, v in self._entries.items() if v[0] <= now]
+        for key, user_id in expired:
+            self._discard(key, user_id)
+
+
+token_cache = TokenCache()
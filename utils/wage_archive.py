@@ -0,0 +1,150 @@
+"""
+工资记录冷热分层（归档）
+
+wage_logs 只保留近期数据；已结账且早于 WAGE_ARCHIVE_HORIZON_MONTHS 个月前的月份整月搬到
+wage_logs_archive（同样的字段和 id、同样的索引）。每次搬 WAGE_ARCHIVE_CHUNK_SIZE 行：
+INSERT INTO 归档表 SELECT ... WHERE id IN (...) 再 DELETE，同一个事务里提交，任何时刻
+一条记录只在一张表里。重开已归档的月份时整月搬回 wage_logs（restore_month）。
+
+查询侧用 wage_log_source(start, end) 按日期区间选表（相当于手工的分区裁剪）：
+- 归档表最大日期 < start：只查 wage_logs（日常查询都是这种，和归档前一样快）
+- wage_logs 最小日期 > end：只查归档表
+- 否则两张表 UNION ALL，日期区间写进每个分支的 WHERE（不依赖 MySQL 把外层条件下推进派生表，
+  8.0.22 之前的版本不下推，会把两张表整表物化），每个分支各自走 date 索引
+两个边界都是索引上的 MIN / MAX，各一次索引查找。
+
+没有用 MySQL 原生分区：分区表不支持外键，且主键必须包含分区列，和 wage_logs 现有结构冲突。
+"""
+from datetime import date
+
+from flask import current_app
+from sqlalchemy import delete, func, insert, select, union_all
+
+from db_config import db
+from models import WageLog, WageLogArchive
+from utils import payroll
+
+DEFAULT_HORIZON_MONTHS = 12
+DEFAULT_CHUNK_SIZE = 5000
+
+live_table = WageLog.__table__
+archive_table = WageLogArchive.__table__
+
+COLUMNS = [c.name for c in live_table.columns]
+
+
+def archived_through():
+    """归档表里最大的日期，没有归档数据时为 None"""
+    return db.session.scalar(select(func.max(archive_table.c.date)))
+
+
+def live_since():
+    """wage_logs 里最小的日期，表为空时为 None"""
+    return db.session.scalar(select(func.min(live_table.c.date)))
+
+
+def wage_log_source(start=None, end=None):
+    """
+    返回覆盖 [start, end]（两端可为空）的工资记录来源，列与 wage_logs 相同：
+    wage_logs 表本身、归档表，或两者 UNION ALL 的子查询（子查询已按 [start, end] 过滤）
+    调用方仍按自己的条件过滤，对单表来源来说这就是全部过滤条件
+    """
+    archive_max = archived_through()
+    if archive_max is None or (start is not None and start > archive_max):
+        return live_table
+
+    live_min = live_since()
+    if live_min is None or (end is not None and end < live_min):
+        return archive_table
+
+    return union_source(start, end)
+
+
+def union_source(start=None, end=None):
+    """wage_logs 与归档表 UNION ALL 的子查询（wage_logs_all），[start, end] 写在每个分支里"""
+    return union_all(
+        _branch(live_table, start, end),
+        _branch(archive_table, start, end),
+    ).subquery('wage_logs_all')
+
+
+def _branch(table, start, end):
+    query = select(*[table.c[name] for name in COLUMNS])
+    if start is not None:
+        query = query.where(table.c.date >= start)
+    if end is not None:
+        query = query.where(table.c.date <= end)
+    return query
+
+
+def horizon_cutoff(horizon_months=None, today=None):
+    """早于这个月份（YYYY-MM，不含）的月份可以归档"""
+    if horizon_months is None:
+        horizon_months = current_app.config.get('WAGE_ARCHIVE_HORIZON_MONTHS', DEFAULT_HORIZON_MONTHS)
+    today = today or date.today()
+    index = today.year * 12 + today.month - 1 - int(horizon_months)
+    return f'{index // 12:04d}-{index % 12 + 1:02d}'
+
+
+def archivable_months(horizon_months=None, today=None):
+    """已结账、早于归档线、wage_logs 里还有数据的月份，从早到晚"""
+    cutoff = horizon_cutoff(horizon_months, today)
+    months = []
+    for month in sorted(payroll.closed_months()):
+        if month >= cutoff:
+            break
+        month_start, month_end = payroll.month_range(month)
+        if db.session.scalar(
+            select(live_table.c.id)
+            .where(live_table.c.date >= month_start, live_table.c.date <= month_end)
+            .limit(1)
+        ) is not None:
+            months.append(month)
+    return months
+
+
+def _move(source, target, month, chunk_size, commit):
+    """按 id 分块把一个月的记录从 source 搬到 target，返回搬动行数"""
+    month_start, month_end = payroll.month_range(month)
+    moved = 0
+    last_id = 0
+    while True:
+        ids = list(db.session.scalars(
+            select(source.c.id)
+            .where(source.c.date >= month_start, source.c.date <= month_end, source.c.id > last_id)
+            .order_by(source.c.id)
+            .limit(chunk_size)
+        ))
+        if not ids:
+            break
+        last_id = ids[-1]
+
+        db.session.execute(
+            insert(target).from_select(
+                COLUMNS,
+                select(*[source.c[name] for name in COLUMNS]).where(source.c.id.in_(ids))
+            )
+        )
+        db.session.execute(delete(source).where(source.c.id.in_(ids)))
+        if commit:
+            db.session.commit()
+        moved += len(ids)
+    return moved
+
+
+def _chunk_size(chunk_size):
+    if chunk_size is None:
+        chunk_size = current_app.config.get('WAGE_ARCHIVE_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+    return max(int(chunk_size), 1)
+
+
+def archive_month(month, chunk_size=None):
+    """把一个已结账月份搬到归档表，每块提交一次；未结账时抛 ValueError"""
+    if payroll.get_closed_period(month) is None:
+        raise ValueError(f'{month} 未结账，不能归档')
+    return _move(live_table, archive_table, month, _chunk_size(chunk_size), commit=True)
+
+
+def restore_month(month, chunk_size=None, commit=True):
+    """把一个月从归档表搬回 wage_logs；commit=False 时由调用方统一提交"""
+    return _move(archive_table, live_table, month, _chunk_size(chunk_size), commit=commit)
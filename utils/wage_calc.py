@@ -0,0 +1,119 @@
+"""
+工资计算引擎
+
+工资 = 单价 × 数量 ÷ 实际组人数，按分四舍五入（ROUND_HALF_UP）。
+以前 total_wage 由前端算好传上来，服务端直接入库；现在由服务端按整批统一计算，
+并和前端传来的值比对，不一致的行标记出来。
+
+为了没有浮点误差，单价先换算成“分”（整数，同一批里相同单价只换算一次），再逐行做整数乘除，
+最后才转回 Decimal。项目不依赖 numpy，这里是纯 Python 的逐行循环而不是向量化计算；
+5 万行在普通机器上一两百毫秒，见 scripts/bench_wage_calc.py。
+
+WAGE_TOTAL_POLICY 控制前端工资与服务端计算结果不一致时的处理：
+- server（默认）: 以服务端计算结果入库，并在返回中列出不一致的行（单条新增 / 修改返回 wage_mismatch），
+  同时记一条 warning 日志
+- flag:   保留前端传来的值，只在返回中列出不一致的行
+- reject: 拒绝不一致的行
+"""
+from decimal import Decimal, ROUND_HALF_UP
+
+from flask import current_app, has_app_context
+
+POLICIES = ('server', 'flag', 'reject')
+DEFAULT_POLICY = 'server'
+DEFAULT_TOLERANCE = Decimal('0.01')
+
+
+def to_cents(value):
+    """金额转成整数分（按分四舍五入）；float 先转字符串，避免二进制误差"""
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value))
+    return int((value * 100).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def _div_half_up(numerator, denominator):
+    """整数除法，按绝对值四舍五入"""
+    q, r = divmod(abs(numerator), denominator)
+    if r * 2 >= denominator:
+        q += 1
+    return q if numerator >= 0 else -q
+
+
+def compute_total_cents(price_cents, quantities, group_sizes):
+    """整批计算工资（单位：分），三个列表等长"""
+    return [
+        _div_half_up(p * q, g)
+        for p, q, g in zip(price_cents, quantities, group_sizes)
+    ]
+
+
+def cents_to_decimal(cents):
+    return Decimal(cents).scaleb(-2)
+
+
+def wage_policy():
+    if has_app_context():
+        policy = current_app.config.get('WAGE_TOTAL_POLICY', DEFAULT_POLICY)
+        tolerance = Decimal(str(current_app.config.get('WAGE_TOTAL_TOLERANCE', DEFAULT_TOLERANCE)))
+        return policy, tolerance
+    return DEFAULT_POLICY, DEFAULT_TOLERANCE
+
+
+def reconcile(rows, policy=None, tolerance=None):
+    """
+    整批计算并校验工资
+    rows: dict 列表，需有 actual_price / quantity / actual_group_size，total_wage 可为 None（前端未传）
+    按策略就地改写 total_wage，返回 (不一致的行下标列表, 应拒绝的行下标集合)
+
+    不一致明细: {'index', 'client_total', 'server_total'}
+    """
+    if policy is None or tolerance is None:
+        default_policy, default_tolerance = wage_policy()
+        policy = policy or default_policy
+        tolerance = default_tolerance if tolerance is None else tolerance
+    if policy not in POLICIES:
+        raise ValueError(f'WAGE_TOTAL_POLICY 只能是 {", ".join(POLICIES)}')
+    tolerance_cents = to_cents(tolerance)
+
+    # 同一批里单价通常只有几种，换算结果复用
+    price_cents = {}
+    for r in rows:
+        p = r['actual_price']
+        if p not in price_cents:
+            price_cents[p] = to_cents(p)
+
+    totals = compute_total_cents(
+        [price_cents[r['actual_price']] for r in rows],
+        [r['quantity'] for r in rows],
+        [r['actual_group_size'] for r in rows],
+    )
+
+    mismatches = []
+    rejected = set()
+    for i, (row, server_cents) in enumerate(zip(rows, totals)):
+        client = row.get('total_wage')
+        if client is None:
+            row['total_wage'] = cents_to_decimal(server_cents)
+            continue
+
+        if abs(to_cents(client) - server_cents) > tolerance_cents:
+            server = cents_to_decimal(server_cents)
+            mismatches.append({
+                'index': i,
+                'client_total': float(client),
+                'server_total': float(server)
+            })
+            if policy == 'reject':
+                rejected.add(i)
+                continue
+            if policy == 'flag':
+                continue
+
+        if policy == 'server':
+            row['total_wage'] = cents_to_decimal(server_cents)
+
+    if policy == 'server' and mismatches and has_app_context():
+        current_app.logger.warning(
+            '工资与服务端计算结果不一致，已按服务端结果入库: %d 行，首行 %s', len(mismatches), mismatches[0]
+        )
+    return mismatches, rejected
@@ -0,0 +1,106 @@
+"""
+工资记录导出（CSV / Excel）
+
+查询结果按工人分组排序，用服务端游标（yield_per）逐批取出，边取边写：
+每个工人的记录写完立即补一行“小计”，最后一行为“合计”。整个导出过程中内存里只有当前这一批记录。
+
+- CSV: 直接按块流式返回，带 UTF-8 BOM，Excel 双击打开不乱码
+- XLSX: 需要 openpyxl（已列入 requirements.txt；没装时接口返回 400 提示改用 CSV）。用 write_only 模式逐行写到临时文件，写完再分块发送，
+  不会把整张表放进内存
+"""
+import csv
+import io
+import os
+import tempfile
+from decimal import Decimal
+
+HEADER = ['日期', '工人', '工序', '规格型号', '单价', '数量', '实际组人数', '工资', '备注']
+
+FETCH_SIZE = 1000
+SEND_SIZE = 64 * 1024
+
+
+def iter_export_rows(rows, ref):
+    """
+    把按 worker_id 排好序的查询结果转成表格行，每个工人结束时插入小计行，最后插入合计行
+    ref: 参考数据（utils/ref_data.py），工序名、规格名从这里取
+    """
+    current_worker = None
+    current_name = None
+    sub_quantity, sub_wage = 0, Decimal('0')
+    total_quantity, total_wage = 0, Decimal('0')
+
+    for row in rows:
+        if current_worker is not None and row.worker_id != current_worker:
+            yield ['', f'{current_name} 小计', '', '', '', sub_quantity, '', sub_wage, '']
+            sub_quantity, sub_wage = 0, Decimal('0')
+
+        current_worker, current_name = row.worker_id, row.worker
+        sub_quantity += row.quantity
+        sub_wage += row.total_wage
+        total_quantity += row.quantity
+        total_wage += row.total_wage
+
+        yield [
+            row.date.strftime('%Y-%m-%d'),
+            row.worker,
+            ref.process_names.get(row.process_id),
+            ref.spec_names.get(row.spec_model_id),
+            row.actual_price,
+            row.quantity,
+            row.actual_group_size,
+            row.total_wage,
+            row.remark or '',
+        ]
+
+    if current_worker is not None:
+        yield ['', f'{current_name} 小计', '', '', '', sub_quantity, '', sub_wage, '']
+    yield ['', '合计', '', '', '', total_quantity, '', total_wage, '']
+
+
+def stream_csv(query, ref):
+    """生成 CSV 文本块"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    buffer.write('﻿')
+    writer.writerow(HEADER)
+    for i, line in enumerate(iter_export_rows(query.yield_per(FETCH_SIZE), ref), start=1):
+        writer.writerow(line)
+        if i % FETCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+    yield buffer.getvalue()
+
+
+def xlsx_available():
+    try:
+        import openpyxl  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def stream_xlsx(query, ref):
+    """写 write_only 工作簿到临时文件，再分块读出发送，发送完删除临时文件"""
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('工资明细')
+    ws.append(HEADER)
+    for line in iter_export_rows(query.yield_per(FETCH_SIZE), ref):
+        ws.append([float(v) if isinstance(v, Decimal) else v for v in line])
+
+    fd, path = tempfile.mkstemp(suffix='.xlsx')
+    os.close(fd)
+    try:
+        wb.save(path)
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(SEND_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        os.remove(path)
@@ -0,0 +1,245 @@
+"""
+工资记录批量导入引擎
+
+原来的 batch_import 每行构造一个 WageLog ORM 对象、逐行 strptime、bulk_save_objects 后每 500 行提交一次，
+缺字段的行直接丢掉也不告诉前端。这里改成：
+
+1. 开始前一次性把 工人 id 和已结账月份读进内存集合（工序 / 规格型号取自参考数据缓存），外键校验在内存里完成
+2. 每行校验通过后转成普通 dict，攒够一批用 Core insert() 走 executemany 写入
+3. 每批写入前整批计算工资（utils/wage_calc.py），与前端传来的 total_wage 不一致的行单独列出
+4. 被拒绝的行记录行号和原因，随结果一起返回
+
+JSON 批量导入和流式导入（CSV / NDJSON）共用这一套校验和写入逻辑。
+流式导入按固定大小分块读取请求体，边解析边写入，内存占用与文件大小无关，见 iter_csv_rows / iter_ndjson_rows。
+"""
+import csv
+import io
+import json
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import insert, select
+
+from db_config import db
+from models import WageLog, Worker
+from utils import spec_prices, payroll, ref_data
+from utils import wage_calc, wage_summary
+
+# actual_price 不传时取规格型号单价；total_wage 由服务端计算（见 utils/wage_calc.py）
+REQUIRED_FIELDS = ('worker_id', 'process_id', 'spec_model_id', 'date', 'quantity')
+
+DEFAULT_BATCH_SIZE = 1000
+STREAM_READ_SIZE = 64 * 1024  # 流式导入每次从请求体读取的字节数
+MAX_REPORTED_ERRORS = 1000   # 返回的拒绝明细条数上限，防止坏文件把错误列表撑得和文件一样大
+
+
+class RowError(ValueError):
+    """单行数据不合法，message 即返回给前端的拒绝原因"""
+
+
+def _to_int(row, field):
+    value = row.get(field)
+    try:
+        if isinstance(value, str):
+            value = value.strip()
+        result = int(value)
+    except (TypeError, ValueError):
+        raise RowError(f'{field} 必须是整数')
+    if isinstance(value, float) and value != result:
+        raise RowError(f'{field} 必须是整数')
+    return result
+
+
+def _to_decimal(row, field):
+    value = row.get(field)
+    try:
+        # float 先转字符串，避免 Decimal(0.1) 这种二进制误差
+        result = Decimal(str(value).strip())
+    except (InvalidOperation, TypeError, ValueError):
+        raise RowError(f'{field} 必须是数字')
+    if not result.is_finite():
+        raise RowError(f'{field} 必须是数字')
+    return result
+
+
+def _to_date(row, field):
+    value = row.get(field)
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value).strip())
+    except ValueError:
+        raise RowError(f'{field} 日期格式错误，应为 YYYY-MM-DD')
+
+
+class WageImporter:
+    """
+    用法:
+        importer = WageImporter()
+        for line_no, row in rows:
+            importer.add(row, line_no)
+        importer.flush()
+        db.session.commit()
+
+    add() 攒满 batch_size 行时自动 flush()；是否提交由调用方决定（整体一个事务或分批提交）
+    """
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, max_errors=MAX_REPORTED_ERRORS):
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self.worker_ids = set(db.session.scalars(select(Worker.id)))
+        # 工序 / 规格型号取自参考数据缓存（utils/ref_data.py）
+        ref = ref_data.get()
+        self.process_ids = ref.process_names.keys()
+        self.spec_prices = ref.spec_prices
+        self.disabled_process_ids = ref.disabled_process_ids
+        self.disabled_spec_ids = ref.disabled_spec_ids
+        self.price_index = spec_prices.price_index.get()
+        self.closed_months = payroll.closed_months()
+
+        self.pending = []
+        self.pending_lines = []
+        self.mismatches = []
+        self.mismatch_count = 0
+        self.inserted = 0
+        self.rejected = []
+        self.rejected_count = 0
+
+    def validate(self, row):
+        """校验并转换一行，返回可直接插入 wage_logs 的 dict，不合法时抛 RowError"""
+        if not isinstance(row, dict):
+            raise RowError('数据格式错误，需为对象')
+
+        missing = [f for f in REQUIRED_FIELDS if row.get(f) in (None, '')]
+        if missing:
+            raise RowError('缺少字段: ' + ', '.join(missing))
+
+        values = {
+            'worker_id': _to_int(row, 'worker_id'),
+            'process_id': _to_int(row, 'process_id'),
+            'spec_model_id': _to_int(row, 'spec_model_id'),
+            'date': _to_date(row, 'date'),
+            'actual_price': None,
+            'quantity': _to_int(row, 'quantity'),
+            'total_wage': None,
+            'actual_group_size': 1,
+            'remark': str(row.get('remark') or '')[:100],
+        }
+        if row.get('actual_group_size') not in (None, ''):
+            values['actual_group_size'] = _to_int(row, 'actual_group_size')
+        if row.get('total_wage') not in (None, ''):
+            values['total_wage'] = _to_decimal(row, 'total_wage')
+
+        if self.closed_months and payroll.month_of(values['date']) in self.closed_months:
+            raise RowError(f"工资月份已结账: {payroll.month_of(values['date'])}")
+        if values['actual_group_size'] < 1:
+            raise RowError('actual_group_size 必须大于 0')
+        if values['worker_id'] not in self.worker_ids:
+            raise RowError(f"工人不存在: {values['worker_id']}")
+        if values['process_id'] not in self.process_ids:
+            raise RowError(f"工序不存在: {values['process_id']}")
+        if values['spec_model_id'] not in self.spec_prices:
+            raise RowError(f"规格型号不存在: {values['spec_model_id']}")
+        if values['process_id'] in self.disabled_process_ids:
+            raise RowError(f"工序已停用: {values['process_id']}")
+        if values['spec_model_id'] in self.disabled_spec_ids:
+            raise RowError(f"规格型号已停用: {values['spec_model_id']}")
+
+        if row.get('actual_price') not in (None, ''):
+            values['actual_price'] = _to_decimal(row, 'actual_price')
+        else:
+            # 按工资日期取当时的单价，没有历史单价时用规格型号当前单价
+            price = self.price_index.price_at(values['spec_model_id'], values['date'])
+            values['actual_price'] = price if price is not None else self.spec_prices[values['spec_model_id']]
+
+        return values
+
+    def add(self, row, line_no):
+        try:
+            if isinstance(row, RowError):
+                raise row
+            values = self.validate(row)
+        except RowError as e:
+            self.reject(line_no, str(e))
+            return False
+
+        self.pending.append(values)
+        self.pending_lines.append(line_no)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+        return True
+
+    def reject(self, line_no, reason):
+        self.rejected_count += 1
+        if len(self.rejected) < self.max_errors:
+            self.rejected.append({'line': line_no, 'reason': reason})
+
+    def flush(self):
+        """整批计算工资后一次 executemany 写入，并累加到工资日汇总表（不提交）"""
+        if not self.pending:
+            return 0
+
+        mismatches, rejected = wage_calc.reconcile(self.pending)
+        for m in mismatches:
+            self.mismatch_count += 1
+            if len(self.mismatches) < self.max_errors:
+                self.mismatches.append({
+                    'line': self.pending_lines[m['index']],
+                    'client_total': m['client_total'],
+                    'server_total': m['server_total']
+                })
+        if rejected:
+            for i in sorted(rejected):
+                self.reject(self.pending_lines[i], '工资与服务端计算结果不一致')
+            self.pending = [v for i, v in enumerate(self.pending) if i not in rejected]
+
+        count = len(self.pending)
+        if count:
+            db.session.execute(insert(WageLog.__table__), self.pending)
+            wage_summary.add_logs(self.pending)
+            self.inserted += count
+        self.pending = []
+        self.pending_lines = []
+        return count
+
+    def report(self):
+        return {
+            'inserted': self.inserted,
+            'rejected_count': self.rejected_count,
+            'rejected': self.rejected,
+            'wage_mismatch_count': self.mismatch_count,
+            'wage_mismatches': self.mismatches,
+        }
+
+
+def _text_stream(raw):
+    """把请求体包装成按 STREAM_READ_SIZE 分块读取的文本流（兼容 Excel 导出带 BOM 的 UTF-8）"""
+    return io.TextIOWrapper(
+        io.BufferedReader(raw, buffer_size=STREAM_READ_SIZE),
+        encoding='utf-8-sig',
+        newline=''
+    )
+
+
+def iter_csv_rows(raw):
+    """
+    逐行解析 CSV，第一行为表头（字段名同 JSON 导入）
+    产出 (行号, dict)；行号为文件中的物理行号，表头是第 1 行
+    """
+    reader = csv.DictReader(_text_stream(raw))
+    for row in reader:
+        # 多出来的列 DictReader 会放在 None 键下，忽略
+        row.pop(None, None)
+        yield reader.line_num, row
+
+
+def iter_ndjson_rows(raw):
+    """逐行解析 NDJSON（每行一个 JSON 对象），产出 (行号, dict 或 RowError)，空行跳过"""
+    for line_no, line in enumerate(_text_stream(raw), start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except ValueError:
+            yield line_no, RowError('JSON 格式错误')
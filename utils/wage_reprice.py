@@ -0,0 +1,149 @@
+"""
+规格型号调价后的工资记录批量重算
+
+把某个规格型号在日期区间内的工资记录改成新单价，并按新单价重算工资：
+- 先用一条聚合查询统计受影响的行数和调价前后的工资差额（按工人汇总），dry_run 只返回这个预览
+- 实际执行时按 id 游标分批，每批一条 UPDATE ... WHERE id IN (...)，每批单独提交，
+  避免长时间锁住 wage_logs；同一批内把工资差额同步到工资日汇总表
+
+某一批失败时，之前的批次已经提交（已是新单价），抛出 RepriceInterrupted 带上已更新行数和最后提交的 id；
+已改过的行单价已等于新单价，不再匹配条件，用同样的参数重新执行即可从剩下的行接着改。
+
+工资计算口径与 utils/wage_calc.py 一致：ROUND(单价 × 数量 ÷ 实际组人数, 2)
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from sqlalchemy import func, select, update
+
+from db_config import db
+from models import WageLog, Worker
+from utils import wage_summary
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+class RepriceInterrupted(Exception):
+    """分批改价中途失败：updated 为已提交的行数，last_id 为最后一批已提交的最大 id（没有则为 0）"""
+
+    def __init__(self, updated, last_id, error):
+        super().__init__(str(error))
+        self.updated = updated
+        self.last_id = last_id
+        self.error = error
+
+
+def _new_total(price):
+    return func.round(price * WageLog.quantity / WageLog.actual_group_size, 2)
+
+
+def _conditions(spec_model_id, start, end, price):
+    conditions = [
+        WageLog.spec_model_id == spec_model_id,
+        WageLog.actual_price != price,
+    ]
+    if start is not None:
+        conditions.append(WageLog.date >= start)
+    if end is not None:
+        conditions.append(WageLog.date <= end)
+    return conditions
+
+
+def preview(spec_model_id, start, end, price):
+    """按工人汇总受影响行数、原工资、新工资"""
+    new_total = _new_total(price)
+    rows = db.session.execute(
+        select(
+            WageLog.worker_id,
+            Worker.name,
+            func.count(WageLog.id),
+            func.sum(WageLog.total_wage),
+            func.sum(new_total),
+        )
+        .outerjoin(Worker, Worker.id == WageLog.worker_id)
+        .where(*_conditions(spec_model_id, start, end, price))
+        .group_by(WageLog.worker_id, Worker.name)
+        .order_by(WageLog.worker_id)
+    ).all()
+
+    workers = []
+    affected = 0
+    old_sum = Decimal('0')
+    new_sum = Decimal('0')
+    for worker_id, name, count, old_total, new_total_sum in rows:
+        old_total = Decimal(str(old_total or 0))
+        new_total_sum = Decimal(str(new_total_sum or 0))
+        affected += count
+        old_sum += old_total
+        new_sum += new_total_sum
+        workers.append({
+            'worker_id': worker_id,
+            'worker': name,
+            'affected': count,
+            'old_total_wage': float(old_total),
+            'new_total_wage': float(new_total_sum),
+            'delta': float(new_total_sum - old_total)
+        })
+
+    return {
+        'affected': affected,
+        'old_total_wage': float(old_sum),
+        'new_total_wage': float(new_sum),
+        'delta': float(new_sum - old_sum),
+        'workers': workers
+    }
+
+
+def apply(spec_model_id, start, end, price, batch_size=DEFAULT_BATCH_SIZE):
+    """分批改价并提交，返回实际更新的行数；中途失败时抛 RepriceInterrupted"""
+    conditions = _conditions(spec_model_id, start, end, price)
+    new_total = _new_total(price)
+    updated = 0
+    last_id = 0
+
+    while True:
+        try:
+            result = _apply_batch(conditions, new_total, price, last_id, batch_size)
+        except Exception as e:
+            db.session.rollback()
+            raise RepriceInterrupted(updated, last_id, e) from e
+        if result is None:
+            break
+        last_id, rowcount = result
+        updated += rowcount
+
+    return updated
+
+
+def _apply_batch(conditions, new_total, price, last_id, batch_size):
+    """改一批并提交，返回 (这批最大 id, 更新行数)；没有剩余行时返回 None"""
+    ids = list(db.session.scalars(
+        select(WageLog.id)
+        .where(*conditions, WageLog.id > last_id)
+        .order_by(WageLog.id)
+        .limit(batch_size)
+    ))
+    if not ids:
+        return None
+
+    # 这一批对汇总表各格子的工资增减量（数量和条数不变）
+    deltas = defaultdict(lambda: [0, Decimal('0'), 0])
+    for key_date, worker_id, process_id, spec_id, delta in db.session.execute(
+        select(
+            WageLog.date, WageLog.worker_id, WageLog.process_id, WageLog.spec_model_id,
+            func.sum(new_total - WageLog.total_wage)
+        )
+        .where(WageLog.id.in_(ids))
+        .group_by(WageLog.date, WageLog.worker_id, WageLog.process_id, WageLog.spec_model_id)
+    ):
+        deltas[(key_date, worker_id, process_id, spec_id)][1] += Decimal(str(delta or 0))
+
+    result = db.session.execute(
+        update(WageLog)
+        .where(WageLog.id.in_(ids))
+        .values(actual_price=price, total_wage=new_total)
+        .execution_options(synchronize_session=False)
+    )
+    wage_summary.apply_deltas(deltas)
+    db.session.commit()
+    return ids[-1], result.rowcount
@@ -0,0 +1,141 @@
+"""
+工资日汇总表（wage_daily_summary）维护
+
+每条工资记录写入 / 修改 / 删除时，把它对 (date, worker_id, process_id, spec_model_id) 这一格的
+数量、工资、条数的增减量累加到汇总表上（INSERT ... ON DUPLICATE KEY UPDATE x = x + 增量），
+和工资记录在同一个事务里提交。月度统计只读汇总表，不再扫描 wage_logs 明细。
+
+汇总表与明细不一致时（历史数据回填、手工改库等），用 rebuild() 按日期区间重算，
+命令行入口见 scripts/rebuild_wage_summary.py
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from sqlalchemy import delete, func, insert, select
+
+from db_config import db
+from models import WageDailySummary
+from utils import wage_archive
+
+KEY_FIELDS = ('date', 'worker_id', 'process_id', 'spec_model_id')
+
+summary_table = WageDailySummary.__table__
+
+
+def _get(row, field):
+    return row[field] if isinstance(row, dict) else getattr(row, field)
+
+
+def collect(rows, sign=1, deltas=None):
+    """
+    把工资记录（dict 或 WageLog 对象）按汇总键累加成增量
+    sign=1 为新增，-1 为删除；返回 {key: [quantity, total_wage, log_count]}
+    """
+    if deltas is None:
+        deltas = defaultdict(lambda: [0, Decimal('0'), 0])
+    for row in rows:
+        key = (
+            _get(row, 'date'),
+            int(_get(row, 'worker_id')),
+            int(_get(row, 'process_id')),
+            int(_get(row, 'spec_model_id')),
+        )
+        delta = deltas[key]
+        delta[0] += sign * int(_get(row, 'quantity'))
+        delta[1] += sign * Decimal(str(_get(row, 'total_wage')))
+        delta[2] += sign
+    return deltas
+
+
+def _upsert_increment():
+    """按汇总键插入，已存在则在原值上累加"""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'mysql':
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+        stmt = mysql_insert(summary_table)
+        return stmt.on_duplicate_key_update(
+            quantity=summary_table.c.quantity + stmt.inserted.quantity,
+            total_wage=summary_table.c.total_wage + stmt.inserted.total_wage,
+            log_count=summary_table.c.log_count + stmt.inserted.log_count,
+        )
+
+    # 本地 / 检查脚本用的 SQLite
+    from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+    stmt = sqlite_insert(summary_table)
+    return stmt.on_conflict_do_update(
+        index_elements=list(KEY_FIELDS),
+        set_={
+            'quantity': summary_table.c.quantity + stmt.excluded.quantity,
+            'total_wage': summary_table.c.total_wage + stmt.excluded.total_wage,
+            'log_count': summary_table.c.log_count + stmt.excluded.log_count,
+        }
+    )
+
+
+def apply_deltas(deltas):
+    """把 collect() 得到的增量写进汇总表（不提交，和调用方的工资记录改动同一事务）"""
+    values = [
+        dict(zip(KEY_FIELDS, key), quantity=q, total_wage=w, log_count=c)
+        for key, (q, w, c) in deltas.items()
+        if q or w or c
+    ]
+    if not values:
+        return
+
+    db.session.execute(_upsert_increment(), values)
+
+    # 条数减到 0 的格子删掉，避免汇总表里堆积空行
+    dates = {v['date'] for v in values if v['log_count'] < 0}
+    if dates:
+        db.session.execute(
+            delete(summary_table)
+            .where(summary_table.c.date.in_(dates))
+            .where(summary_table.c.log_count <= 0)
+        )
+
+
+def add_logs(rows):
+    apply_deltas(collect(rows, 1))
+
+
+def remove_logs(rows):
+    apply_deltas(collect(rows, -1))
+
+
+def rebuild(start=None, end=None):
+    """
+    按日期区间（含两端，不传为全部）用明细重算汇总表，返回重算后的汇总行数
+    一条 DELETE + 一条 INSERT ... SELECT ... GROUP BY，在数据库里完成；区间内有归档数据时一并统计
+    """
+    logs = wage_archive.wage_log_source(start, end)
+    conditions = []
+    summary_conditions = []
+    if start is not None:
+        conditions.append(logs.c.date >= start)
+        summary_conditions.append(summary_table.c.date >= start)
+    if end is not None:
+        conditions.append(logs.c.date <= end)
+        summary_conditions.append(summary_table.c.date <= end)
+
+    db.session.execute(delete(summary_table).where(*summary_conditions))
+
+    aggregated = (
+        select(
+            logs.c.date,
+            logs.c.worker_id,
+            logs.c.process_id,
+            logs.c.spec_model_id,
+            func.sum(logs.c.quantity),
+            func.sum(logs.c.total_wage),
+            func.count(logs.c.id),
+        )
+        .where(*conditions)
+        .group_by(logs.c.date, logs.c.worker_id, logs.c.process_id, logs.c.spec_model_id)
+    )
+    result = db.session.execute(
+        insert(summary_table).from_select(
+            list(KEY_FIELDS) + ['quantity', 'total_wage', 'log_count'],
+            aggregated
+        )
+    )
+    return result.rowcount
@@ -0,0 +1,160 @@
+"""
+工人批量新增 / 更新（按姓名）
+
+每季度集中招工时一次提交几百个工人：
+1. 工序一次全部读进内存，行里的 process_id 或 process（工序名）都在内存里解析
+2. 已存在的同名工人一次 IN 查询读出，用来区分新增 / 更新，并列出会被覆盖的字段（conflicts）
+3. 所有合法行拼成一条多行 INSERT ... ON DUPLICATE KEY UPDATE（以 workers.name 唯一键判重）
+
+行里没给的字段：新工人取默认值（入职日期今天、状态在职），已有工人保留原值。
+"""
+from datetime import date, datetime
+
+from sqlalchemy import select
+
+from db_config import db
+from models import Worker, Process
+
+FIELDS = ('name', 'id_card', 'remark', 'group', 'entry_date', 'leave_date', 'status', 'process_id')
+DATE_FIELDS = ('entry_date', 'leave_date')
+MAX_ROWS = 2000
+
+worker_table = Worker.__table__
+
+
+class RowError(Exception):
+    pass
+
+
+def _process_map():
+    """工序 id 和工序名都映射到 id"""
+    mapping = {}
+    for process_id, name in db.session.execute(select(Process.id, Process.name)):
+        mapping[process_id] = process_id
+        mapping[str(process_id)] = process_id
+        mapping[name] = process_id
+    return mapping
+
+
+def _to_date(row, field):
+    value = row.get(field)
+    if value in (None, ''):
+        return None
+    try:
+        return datetime.strptime(str(value), '%Y-%m-%d').date()
+    except ValueError:
+        raise RowError(f'{field} 格式错误，应为 YYYY-MM-DD')
+
+
+def _parse(row, processes):
+    """只返回行里给出的字段"""
+    if not isinstance(row, dict):
+        raise RowError('数据格式错误，需为对象')
+    name = str(row.get('name') or '').strip()
+    if not name:
+        raise RowError('姓名不能为空')
+
+    values = {'name': name}
+    process_key = row.get('process_id')
+    if process_key in (None, ''):
+        process_key = row.get('process')
+    if process_key not in (None, ''):
+        if process_key not in processes:
+            raise RowError(f'工序不存在: {process_key}')
+        values['process_id'] = processes[process_key]
+
+    for field in ('id_card', 'remark', 'group', 'status'):
+        if field in row:
+            values[field] = row[field]
+    for field in DATE_FIELDS:
+        if field in row:
+            values[field] = _to_date(row, field)
+    return values
+
+
+def _upsert_statement(rows):
+    dialect = db.session.get_bind().dialect.name
+    update_fields = [f for f in FIELDS if f != 'name'] + ['updated_at']
+    if dialect == 'mysql':
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+        stmt = mysql_insert(worker_table).values(rows)
+        return stmt.on_duplicate_key_update({f: stmt.inserted[f] for f in update_fields})
+
+    # 本地 / 检查脚本用的 SQLite
+    from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+    stmt = sqlite_insert(worker_table).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=['name'],
+        set_={f: stmt.excluded[f] for f in update_fields}
+    )
+
+
+def bulk_upsert(rows, overwrite=True):
+    """
+    rows: dict 列表；overwrite=False 时已存在的工人不修改
+    返回报告 {inserted, updated, unchanged, skipped, rejected, conflicts}（不提交）
+    """
+    processes = _process_map()
+    report = {'inserted': [], 'updated': [], 'unchanged': [], 'skipped': [], 'rejected': [], 'conflicts': []}
+
+    parsed = {}
+    for line, row in enumerate(rows):
+        try:
+            values = _parse(row, processes)
+        except RowError as e:
+            report['rejected'].append({'line': line, 'reason': str(e)})
+            continue
+        if values['name'] in parsed:
+            first_line = parsed[values['name']][0]
+            report['rejected'].append({'line': line, 'reason': f'姓名与第 {first_line} 行重复'})
+            continue
+        parsed[values['name']] = (line, values)
+
+    existing = {}
+    if parsed:
+        for worker in db.session.scalars(select(Worker).where(Worker.name.in_(list(parsed)))):
+            existing[worker.name] = worker
+
+    today = date.today()
+    now = datetime.utcnow()
+    values_list = []
+    for name, (line, values) in parsed.items():
+        worker = existing.get(name)
+        if worker is None:
+            if 'process_id' not in values:
+                report['rejected'].append({'line': line, 'reason': '新工人必须指定工序'})
+                continue
+            full = {f: values.get(f) for f in FIELDS}
+            full['entry_date'] = full['entry_date'] or today
+            full['status'] = full['status'] or '在职'
+            report['inserted'].append(name)
+        else:
+            changes = {
+                f: {'old': _json_value(getattr(worker, f)), 'new': _json_value(v)}
+                for f, v in values.items()
+                if f != 'name' and getattr(worker, f) != v
+            }
+            if not changes:
+                report['unchanged'].append(name)
+                continue
+            if not overwrite:
+                report['skipped'].append(name)
+                report['conflicts'].append({'line': line, 'id': worker.id, 'name': name, 'changes': changes})
+                continue
+            full = {f: getattr(worker, f) for f in FIELDS}
+            full.update(values)
+            report['updated'].append(name)
+            report['conflicts'].append({'line': line, 'id': worker.id, 'name': name, 'changes': changes})
+        full['created_at'] = worker.created_at if worker is not None else now
+        full['updated_at'] = now
+        values_list.append(full)
+
+    if values_list:
+        db.session.execute(_upsert_statement(values_list))
+    return report
+
+
+def _json_value(value):
+    if isinstance(value, date):
+        return value.strftime('%Y-%m-%d')
+    return value